@@ -0,0 +1,227 @@
+"""
+CuisineCraft Price Analytics Module
+Per-ingredient price history from precomputed daily and weekly aggregates.
+
+Receipt prices are rolled up per (ingredient, day, shop) and per
+(ingredient, week, shop) into PriceDaily and PriceWeekly when receipts are
+imported. Trend, window and cheapest-shop queries read those aggregates with
+SQLite window functions, so their cost depends on the number of days an
+ingredient was bought rather than on the size of the receipt history.
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from tkinter_gui.logger import logger
+
+PERIOD_DAILY = "daily"
+PERIOD_WEEKLY = "weekly"
+
+# Aggregate table and period column per granularity
+_PERIOD_TABLES = {
+    PERIOD_DAILY: ("PriceDaily", "day"),
+    PERIOD_WEEKLY: ("PriceWeekly", "week_start"),
+}
+
+# SQL expression mapping a receipt date to the period it belongs to (weeks start on Monday)
+_PERIOD_EXPRESSIONS = {
+    PERIOD_DAILY: "date(r.price_date)",
+    PERIOD_WEEKLY: "date(r.price_date, 'weekday 0', '-6 days')",
+}
+
+
+@dataclass
+class PriceSummary:
+    """Price statistics of an ingredient over a window"""
+    purchases: int
+    min_price: Optional[float]
+    avg_price: Optional[float]
+    max_price: Optional[float]
+
+
+@dataclass
+class TrendPoint:
+    """Aggregated prices of an ingredient in one day or week"""
+    period: str
+    purchases: int
+    avg_price: float
+    min_price: float
+    max_price: float
+    moving_avg: float
+    change: Optional[float]  # relative to the previous period
+
+
+@dataclass
+class ShopPrice:
+    """Average price of an ingredient at one shop"""
+    rank: int
+    shop: str
+    purchases: int
+    avg_price: float
+    min_price: float
+    last_seen: str
+
+
+def create_aggregate_tables(cursor: sqlite3.Cursor) -> None:
+    """Create the aggregate tables, keyed so one ingredient's history is a range scan"""
+    for table, period_column in _PERIOD_TABLES.values():
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                ingredient_key TEXT NOT NULL,
+                {period_column} TEXT NOT NULL,
+                shop TEXT NOT NULL,
+                n INTEGER NOT NULL,
+                total REAL NOT NULL,
+                min_price REAL NOT NULL,
+                max_price REAL NOT NULL,
+                PRIMARY KEY (ingredient_key, {period_column}, shop)
+            ) WITHOUT ROWID
+        """)
+
+
+def _aggregate_into(cursor: sqlite3.Cursor, period: str, where: str, params: tuple) -> None:
+    """Fold linked receipt prices matching where into one aggregate table"""
+    table, period_column = _PERIOD_TABLES[period]
+    cursor.execute(f"""
+        INSERT INTO {table}
+            (ingredient_key, {period_column}, shop, n, total, min_price, max_price)
+        SELECT
+            l.ingredient_key,
+            {_PERIOD_EXPRESSIONS[period]} AS period,
+            COALESCE(r.shop, ''),
+            COUNT(*),
+            SUM(r.price),
+            MIN(r.price),
+            MAX(r.price)
+        FROM ReceiptIngredientLinks l
+        INNER JOIN ReceiptItems r ON r.id = l.receipt_item_id
+        WHERE l.ingredient_key != '' AND period IS NOT NULL AND {where}
+        GROUP BY l.ingredient_key, period, COALESCE(r.shop, '')
+        ON CONFLICT (ingredient_key, {period_column}, shop) DO UPDATE SET
+            n = n + excluded.n,
+            total = total + excluded.total,
+            min_price = MIN(min_price, excluded.min_price),
+            max_price = MAX(max_price, excluded.max_price)
+    """, params)
+
+
+def add_receipt_items(cursor: sqlite3.Cursor, first_item_id: int) -> None:
+    """Fold receipt items with id >= first_item_id (a freshly inserted batch) into the aggregates"""
+    for period in _PERIOD_TABLES:
+        _aggregate_into(cursor, period, "r.id >= ?", (first_item_id,))
+
+
+def rebuild_aggregates(cursor: sqlite3.Cursor,
+                       ingredient_keys: Optional[Iterable[str]] = None) -> None:
+    """
+    Recompute the aggregates of the given ingredients, or of all ingredients.
+    Needed whenever links change, since MIN/MAX cannot be subtracted again.
+    """
+    keys = None if ingredient_keys is None else sorted(set(ingredient_keys))
+    if keys == []:
+        return
+    for period, (table, _) in _PERIOD_TABLES.items():
+        if keys is None:
+            cursor.execute(f"DELETE FROM {table}")
+            _aggregate_into(cursor, period, "1 = 1", ())
+            continue
+        for key in keys:
+            cursor.execute(f"DELETE FROM {table} WHERE ingredient_key = ?", (key,))
+            _aggregate_into(cursor, period, "l.ingredient_key = ?", (key,))
+
+
+def _since_clause(period_column: str, days: Optional[int]) -> tuple:
+    """SQL condition and parameters restricting a period column to the last days"""
+    if days is None:
+        return "", ()
+    return f"AND {period_column} >= date('now', ?)", (f"-{int(days)} days",)
+
+
+class PriceAnalytics:
+    """Read-only price history queries over the aggregate tables"""
+
+    def __init__(self, db):
+        self.cursor = db.cursor
+
+    def summary(self, ingredient_key: str, days: Optional[int] = None) -> PriceSummary:
+        """Min/avg/max price of an ingredient over the last days (None = all history)"""
+        since, params = _since_clause("day", days)
+        row = self.cursor.execute(f"""
+            SELECT SUM(n), MIN(min_price), SUM(total) / SUM(n), MAX(max_price)
+            FROM PriceDaily
+            WHERE ingredient_key = ? {since}
+        """, (ingredient_key, *params)).fetchone()
+        return PriceSummary(row[0] or 0, row[1], row[2], row[3])
+
+    def trend(self, ingredient_key: str, period: str = PERIOD_WEEKLY,
+              days: Optional[int] = None, smoothing: int = 4) -> List[TrendPoint]:
+        """
+        Price per period with a moving average over the last smoothing periods
+        and the change against the previous period.
+        """
+        table, period_column = _PERIOD_TABLES[period]
+        since, params = _since_clause(period_column, days)
+        rows = self.cursor.execute(f"""
+            WITH per_period AS (
+                SELECT
+                    {period_column} AS period,
+                    SUM(n) AS n,
+                    SUM(total) AS total,
+                    MIN(min_price) AS min_price,
+                    MAX(max_price) AS max_price
+                FROM {table}
+                WHERE ingredient_key = ? {since}
+                GROUP BY {period_column}
+            )
+            SELECT
+                period,
+                n,
+                total / n AS avg_price,
+                min_price,
+                max_price,
+                SUM(total) OVER w / SUM(n) OVER w AS moving_avg,
+                LAG(total / n) OVER (ORDER BY period) AS previous_avg
+            FROM per_period
+            WINDOW w AS (ORDER BY period ROWS BETWEEN ? PRECEDING AND CURRENT ROW)
+            ORDER BY period
+        """, (ingredient_key, *params, max(smoothing, 1) - 1)).fetchall()
+        return [
+            TrendPoint(
+                period=period,
+                purchases=n,
+                avg_price=avg_price,
+                min_price=min_price,
+                max_price=max_price,
+                moving_avg=moving_avg,
+                change=(avg_price - previous) / previous if previous else None,
+            )
+            for period, n, avg_price, min_price, max_price, moving_avg, previous in rows
+        ]
+
+    def cheapest_shops(self, ingredient_key: str, days: Optional[int] = None) -> List[ShopPrice]:
+        """Shops ranked by their average price for an ingredient within the window"""
+        since, params = _since_clause("day", days)
+        rows = self.cursor.execute(f"""
+            SELECT
+                RANK() OVER (ORDER BY SUM(total) / SUM(n)) AS rank,
+                shop,
+                SUM(n),
+                SUM(total) / SUM(n),
+                MIN(min_price),
+                MAX(day)
+            FROM PriceDaily
+            WHERE ingredient_key = ? {since}
+            GROUP BY shop
+            ORDER BY rank, shop
+        """, (ingredient_key, *params)).fetchall()
+        return [ShopPrice(*row) for row in rows]
+
+    def ingredient_keys(self) -> List[str]:
+        """Ingredients with any recorded price history"""
+        self.cursor.execute(
+            "SELECT DISTINCT ingredient_key FROM PriceWeekly ORDER BY ingredient_key"
+        )
+        keys = [row[0] for row in self.cursor.fetchall()]
+        logger.debug(f"Found price history for {len(keys)} ingredients.")
+        return keys
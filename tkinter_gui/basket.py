@@ -0,0 +1,131 @@
+"""
+CuisineCraft Basket Optimizer
+Cheapest split of a shopping list across at most N shops.
+
+Prices form an items x shops matrix (``inf`` where a shop has no price).
+Buying every item at the cheapest of the chosen shops, the cost of a shop set
+is a column-wise minimum, and adding a shop never makes the basket more
+expensive, so only sets of exactly N shops need to be considered. When there
+are few enough of those they are all evaluated in vectorized chunks (exact);
+otherwise a greedy start is improved by swapping shops in and out until no
+swap helps or the time budget runs out.
+"""
+
+import itertools
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Largest number of shop combinations evaluated exhaustively
+EXACT_COMBINATION_LIMIT = 50_000
+CHUNK_SIZE = 4096
+
+
+@dataclass
+class BasketPlan:
+    """Where to buy each item of a shopping list"""
+    shops: Tuple[str, ...]
+    total: float
+    assignments: Dict[str, List[int]] = field(default_factory=dict)  # shop -> item indexes
+    prices: List[Optional[float]] = field(default_factory=list)  # per item, None if unpriced
+    unpriced: List[int] = field(default_factory=list)  # items not sold at any chosen shop
+    exact: bool = True  # False if the split is heuristic or the time budget ran out
+
+
+def _score(matrix: np.ndarray, columns: Sequence[int]) -> Tuple[int, float]:
+    """(number of items without a price, total price) when shopping at columns"""
+    best = matrix[:, list(columns)].min(axis=1)
+    finite = np.isfinite(best)
+    return int((~finite).sum()), float(best[finite].sum())
+
+
+def _exact(matrix: np.ndarray, size: int, deadline: float) -> Tuple[Tuple[int, ...], bool]:
+    """Evaluate every combination of size shops, chunk by chunk"""
+    combos = itertools.combinations(range(matrix.shape[1]), size)
+    best_columns, best_score = None, None
+    while True:
+        chunk = np.array(list(itertools.islice(combos, CHUNK_SIZE)), dtype=np.int64)
+        if not len(chunk):
+            return best_columns, True
+        # items x combos x size -> cheapest price per item for each combination
+        cheapest = matrix[:, chunk].min(axis=2)
+        finite = np.isfinite(cheapest)
+        missing = (~finite).sum(axis=0)
+        totals = np.where(finite, cheapest, 0.0).sum(axis=0)
+        index = np.lexsort((totals, missing))[0]
+        score = (int(missing[index]), float(totals[index]))
+        if best_score is None or score < best_score:
+            best_columns, best_score = tuple(int(c) for c in chunk[index]), score
+        if time.perf_counter() > deadline:
+            return best_columns, False
+
+
+def _local_search(matrix: np.ndarray, size: int, deadline: float) -> Tuple[int, ...]:
+    """Greedy construction followed by first-improvement shop swaps"""
+    n_shops = matrix.shape[1]
+    chosen: List[int] = []
+    while len(chosen) < size:
+        candidates = [c for c in range(n_shops) if c not in chosen]
+        chosen.append(min(candidates, key=lambda c: _score(matrix, chosen + [c])))
+    score = _score(matrix, chosen)
+
+    improved = True
+    while improved:
+        improved = False
+        for position, outside in itertools.product(range(size), range(n_shops)):
+            if time.perf_counter() > deadline:
+                return tuple(sorted(chosen))
+            if outside in chosen:
+                continue
+            trial = chosen[:position] + [outside] + chosen[position + 1:]
+            trial_score = _score(matrix, trial)
+            if trial_score < score:
+                chosen, score, improved = trial, trial_score, True
+    return tuple(sorted(chosen))
+
+
+def optimize_basket(item_prices: Sequence[Dict[str, float]], max_shops: int,
+                    time_budget: float = 0.25) -> BasketPlan:
+    """
+    Choose at most max_shops shops minimizing first the number of items that
+    cannot be bought and then the total price. item_prices holds a
+    {shop: price} dict per shopping list item.
+    """
+    shops = sorted({shop for prices in item_prices for shop in prices})
+    n_items = len(item_prices)
+    if not shops or max_shops < 1:
+        return BasketPlan(shops=(), total=0.0, prices=[None] * n_items,
+                          unpriced=list(range(n_items)))
+
+    matrix = np.full((n_items, len(shops)), np.inf)
+    shop_columns = {shop: column for column, shop in enumerate(shops)}
+    for row, prices in enumerate(item_prices):
+        for shop, price in prices.items():
+            matrix[row, shop_columns[shop]] = min(matrix[row, shop_columns[shop]], price)
+
+    deadline = time.perf_counter() + time_budget
+    size = min(max_shops, len(shops))
+    if math.comb(len(shops), size) <= EXACT_COMBINATION_LIMIT:
+        columns, exact = _exact(matrix, size, deadline)
+    else:
+        columns, exact = _local_search(matrix, size, deadline), False
+
+    # Buy each item at the cheapest chosen shop; shops left without items are dropped
+    sub_matrix = matrix[:, list(columns)]
+    choice = sub_matrix.argmin(axis=1)
+    plan = BasketPlan(shops=(), total=0.0, exact=exact)
+    for row in range(n_items):
+        price = sub_matrix[row, choice[row]]
+        if not np.isfinite(price):
+            plan.prices.append(None)
+            plan.unpriced.append(row)
+            continue
+        shop = shops[columns[choice[row]]]
+        plan.assignments.setdefault(shop, []).append(row)
+        plan.prices.append(float(price))
+        plan.total += float(price)
+    plan.shops = tuple(shop for shop in shops if shop in plan.assignments)
+    return plan
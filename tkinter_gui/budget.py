@@ -0,0 +1,124 @@
+"""
+CuisineCraft Budget Menu Module
+Week menu selection that minimizes the estimated shopping cost.
+
+Shared ingredients are bought once, so the cost of a menu is the summed price
+of the distinct ingredients its recipes use. A sampled candidate pool becomes a
+recipes x ingredients usage matrix; for the current menu the ingredient counts
+are kept as a vector, and the cost of swapping one menu recipe for every
+candidate at once is a single matrix-vector product over the ingredients the
+rest of the menu does not already buy. A best-improvement swap search with
+random restarts runs until the time budget is spent.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+POOL_SIZE = 400
+MENU_SIZE = 7
+
+
+@dataclass
+class BudgetMenu:
+    """Cheapest menu found and how it was scored"""
+    recipe_ids: List[int]
+    total: float  # estimated cost of the distinct ingredients
+    shared: List[str] = field(default_factory=list)  # ingredient keys used by several recipes
+    evaluated: int = 0  # candidate menus scored
+
+
+class BudgetOptimizer:
+    """Local search over the usage matrix of a candidate pool"""
+
+    def __init__(self, vectors: Dict[int, Iterable[str]], prices: Dict[str, float],
+                 default_price: float, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+        self.recipe_ids = [recipe_id for recipe_id, keys in vectors.items() if keys]
+        self.keys = sorted({key for keys in vectors.values() for key in keys})
+        columns = {key: column for column, key in enumerate(self.keys)}
+        self.usage = np.zeros((len(self.recipe_ids), len(self.keys)), dtype=np.float64)
+        for row, recipe_id in enumerate(self.recipe_ids):
+            self.usage[row, [columns[key] for key in vectors[recipe_id]]] = 1.0
+        self.prices = np.array([prices.get(key, default_price) for key in self.keys])
+        self.evaluated = 0
+
+    def _cost(self, counts: np.ndarray) -> float:
+        return float(self.prices[counts > 0].sum())
+
+    def _improve(self, menu: List[int]) -> Tuple[List[int], float]:
+        """Apply the best single swap until none lowers the cost"""
+        counts = self.usage[menu].sum(axis=0)
+        cost = self._cost(counts)
+        while True:
+            best_cost, best_swap = cost, None
+            in_menu = np.zeros(len(self.recipe_ids), dtype=bool)
+            in_menu[menu] = True
+            for position, row in enumerate(menu):
+                rest = counts - self.usage[row]
+                # Every candidate only pays for ingredients the rest does not buy
+                fresh = np.where(rest > 0, 0.0, self.prices)
+                swap_costs = self._cost(rest) + self.usage @ fresh
+                swap_costs[in_menu] = np.inf
+                self.evaluated += len(swap_costs)
+                candidate = int(swap_costs.argmin())
+                if swap_costs[candidate] < best_cost - 1e-9:
+                    best_cost, best_swap = float(swap_costs[candidate]), (position, candidate)
+            if best_swap is None:
+                return menu, cost
+            position, candidate = best_swap
+            counts += self.usage[candidate] - self.usage[menu[position]]
+            menu[position] = candidate
+            cost = best_cost
+
+    def optimize(self, size: int = MENU_SIZE, time_budget: float = 0.5) -> Optional[BudgetMenu]:
+        """Cheapest menu of size recipes found within the time budget"""
+        if len(self.recipe_ids) < size:
+            return None
+        deadline = time.perf_counter() + time_budget
+        best_menu, best_cost = None, np.inf
+        while best_menu is None or time.perf_counter() < deadline:
+            start = self.rng.sample(range(len(self.recipe_ids)), size)
+            menu, cost = self._improve(start)
+            if cost < best_cost:
+                best_menu, best_cost = list(menu), cost
+
+        counts = self.usage[best_menu].sum(axis=0)
+        return BudgetMenu(
+            recipe_ids=[self.recipe_ids[row] for row in best_menu],
+            total=best_cost,
+            shared=[self.keys[column] for column in np.flatnonzero(counts > 1)],
+            evaluated=self.evaluated,
+        )
+
+
+def plan_budget_menu(db, estimator=None, exclude_ids: Sequence[int] = (),
+                     pool_size: int = POOL_SIZE, time_budget: float = 0.5,
+                     rng: Optional[random.Random] = None) -> Optional[BudgetMenu]:
+    """
+    Sample a candidate pool and pick the cheapest week menu from it.
+    Ingredients without a receipt price use the estimator (a PriceEstimator)
+    when given, otherwise the median known price.
+    """
+    rng = rng or random.Random()
+    pool = db.sample_recipe_ids(pool_size, exclude_ids=exclude_ids, rng=rng)
+    if len(pool) < MENU_SIZE:
+        pool += db.sample_recipe_ids(MENU_SIZE - len(pool), exclude_ids=pool, rng=rng)
+    vectors: Dict[int, List[str]] = {}
+    for recipe_id, ingredient_key in db.get_recipe_ingredient_keys(pool):
+        vectors.setdefault(recipe_id, []).append(ingredient_key)
+
+    keys = sorted({key for keys in vectors.values() for key in keys})
+    prices = {key: price for key, (price, _) in db.get_latest_prices(keys).items()
+              if price is not None}
+    missing = [key for key in keys if key not in prices]
+    if estimator is not None and missing:
+        estimator.refresh(db)
+        prices.update({key: estimate.price for key, estimate in estimator.estimate(missing).items()
+                       if estimate is not None})
+    default_price = float(np.median(list(prices.values()))) if prices else 1.0
+
+    return BudgetOptimizer(vectors, prices, default_price, rng).optimize(time_budget=time_budget)
@@ -2,6 +2,10 @@
 CuisineCraft Configuration Module
 Centralizes all key settings for consistent, maintainable project-wide configuration management.
 Loads settings from a .env file if present.
+
+This is the only module reading .env; everything else imports its settings
+from here, so the file is parsed once per process. Importing it has no side
+effects on disk: the export directory is created when an export first needs it.
 """
 
 import os
@@ -42,6 +46,12 @@ CSV_DELIMITER: Final[str] = os.getenv("CSV_DELIMITER", ",")
 # Date format for exports
 EXPORT_DATE_FORMAT: Final[str] = os.getenv("EXPORT_DATE_FORMAT", "%Y-%m-%d")
 
-# Ensure export directory exists
-os.makedirs(EXPORT_DIR, exist_ok=True)
+# Recipes served within this many days are left out of generated menus
+RECENT_MENU_DAYS: Final[int] = int(os.getenv("RECENT_MENU_DAYS", "21"))
+
+
+def ensure_export_dir() -> str:
+    """Create the export directory if needed and return its path"""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    return EXPORT_DIR
 
@@ -3,20 +3,36 @@ CuisineCraft Database Handler
 Manages SQLite database operations for recipes and ingredients
 """
 
+from __future__ import annotations
+
+import random
 import sqlite3
-import pandas as pd
+import threading
 from tkinter_gui.logger import logger  # Use the async logger
 import datetime
-from typing import List
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
 from tkinter_gui.models import Recipe, Ingredient, ReceiptItem, WeekMenuEntry
-from dotenv import load_dotenv
 from tkinter_gui.config import DB_PATH
+from tkinter_gui.utils import normalize_key, search_tokens
+from tkinter_gui.pricing import AhoCorasick, link_receipt_items
+from tkinter_gui import analytics
+from tkinter_gui.units import to_canonical, to_canonical_frame
+
+if TYPE_CHECKING:
+    import pandas as pd
 
-load_dotenv() # Load environment variables from .env file
+# Bumped whenever migrate_schema() learns a new step (stored in PRAGMA user_version)
+SCHEMA_VERSION = 9
+# Deepest component nesting followed when expanding recipes (guards against bad data)
+MAX_COMPONENT_DEPTH = 16
 
 class DatabaseHandler:
     """Handles all database operations"""
     DB_PATH = DB_PATH  # Use centralized config
+    # Automaton over all ingredient keys per database file, shared by every handler
+    # in the process and dropped when insert_ingredients commits new keys
+    _automata: Dict[str, AhoCorasick] = {}
+    _automata_lock = threading.Lock()
 
     def __init__(self):
         self.conn = None
@@ -36,7 +52,10 @@ class DatabaseHandler:
                     keuken_origine TEXT,
                     locatie_bestand TEXT,
                     url TEXT,
-                    gezondheidsgraad INTEGER
+                    gezondheidsgraad INTEGER,
+                    recept_naam_key TEXT,
+                    keuken_origine_key TEXT,
+                    waardering INTEGER
                 )
             """)
             self.cursor.execute("""
@@ -49,6 +68,9 @@ class DatabaseHandler:
                     prijs REAL,
                     winkel TEXT,
                     datum_prijs INTEGER,
+                    ingredient_key TEXT,
+                    hoeveelheid_canon REAL,
+                    eenheid_canon TEXT,
                     FOREIGN KEY (ID_maaltijden) REFERENCES maaltijden(ID)
                 )
             """)
@@ -64,21 +86,231 @@ class DatabaseHandler:
                     receipt_image_path TEXT
                 )
             """)
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ReceiptIngredientLinks (
+                    receipt_item_id INTEGER NOT NULL,
+                    ingredient_key TEXT NOT NULL,
+                    is_manual INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (receipt_item_id, ingredient_key),
+                    FOREIGN KEY (receipt_item_id) REFERENCES ReceiptItems(id)
+                )
+            """)
+            analytics.create_aggregate_tables(self.cursor)
             self.cursor.execute("""
                 CREATE TABLE IF NOT EXISTS WeekMenu (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     day TEXT NOT NULL,
                     recipe_id INTEGER NOT NULL,
                     created_at INTEGER NOT NULL,
+                    week_start TEXT,
+                    version INTEGER,
                     FOREIGN KEY (recipe_id) REFERENCES maaltijden(ID)
                 )
             """)
+            # Recipes used as components of other recipes (stocks, sauces, doughs)
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS RecipeComponents (
+                    parent_id INTEGER NOT NULL,
+                    child_id INTEGER NOT NULL,
+                    factor REAL NOT NULL DEFAULT 1.0,
+                    PRIMARY KEY (parent_id, child_id),
+                    FOREIGN KEY (parent_id) REFERENCES maaltijden(ID),
+                    FOREIGN KEY (child_id) REFERENCES maaltijden(ID)
+                )
+            """)
+            # Memoized ingredient vectors of composite recipes, components expanded
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS RecipeExpansion (
+                    recipe_id INTEGER NOT NULL,
+                    ingredient TEXT NOT NULL,
+                    ingredient_key TEXT,
+                    eenheid_canon TEXT,
+                    amount REAL
+                )
+            """)
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS RecipeExpansionState (
+                    recipe_id INTEGER PRIMARY KEY
+                )
+            """)
+            # Last date each recipe was served (or planned), maintained on every menu save
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS RecipeRecency (
+                    recipe_id INTEGER PRIMARY KEY,
+                    last_served INTEGER NOT NULL
+                )
+            """)
+            # Words of recipe names, cuisines and ingredients; search matches word
+            # prefixes as ranges on the primary key
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS SearchTokens (
+                    token TEXT NOT NULL,
+                    recipe_id INTEGER NOT NULL,
+                    PRIMARY KEY (token, recipe_id)
+                ) WITHOUT ROWID
+            """)
             self.conn.commit()
             logger.info("All tables created or already exist.")
+            self.migrate_schema()
+            self.create_indexes()
         except sqlite3.Error as e:
             logger.error(f"Failed to create one or more tables: {str(e)}")
             raise
 
+    def create_indexes(self):
+        """Create indexes if they don't exist"""
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ingredienten_maaltijd ON Ingredienten(ID_maaltijden)"
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ingredienten_key ON Ingredienten(ingredient_key)"
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_receipt_links_key ON ReceiptIngredientLinks(ingredient_key)"
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_week_menu_week ON WeekMenu(week_start, version)"
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_recipe_recency_served ON RecipeRecency(last_served)"
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_recipe_components_child ON RecipeComponents(child_id)"
+        )
+        # One memoized line per recipe, ingredient and unit, so concurrent expansions
+        # of the same recipe cannot duplicate rows
+        self.cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_recipe_expansion_line
+            ON RecipeExpansion(recipe_id, ingredient, IFNULL(eenheid_canon, ''))
+        """)
+        self.conn.commit()
+
+    def _ensure_column(self, table: str, column: str, definition: str):
+        """Add a column to an existing table if it is missing"""
+        columns = {row[1] for row in self.cursor.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            logger.info(f"Adding column {column} to table {table}.")
+            self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def migrate_schema(self):
+        """Upgrade databases created by older versions to SCHEMA_VERSION"""
+        version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        try:
+            logger.info(f"Migrating database schema from version {version} to {SCHEMA_VERSION}.")
+            if version < 1:
+                self._migrate_search_keys()
+            if version < 2:
+                self._relink_receipt_items()
+            if version < 3:
+                analytics.rebuild_aggregates(self.cursor)
+            if version < 4:
+                self._migrate_canonical_units()
+            if version < 6:
+                self._migrate_week_menu_versions()  # also backfills RecipeRecency (v5)
+            if version < 7:
+                self._ensure_column("maaltijden", "waardering", "INTEGER")  # rating 1-5
+            if version < 8:
+                self._reset_expansions()
+            if version < 9:
+                self._migrate_search_tokens()
+            self.cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.conn.commit()
+            self._forget_ingredient_automaton()  # migrations may rewrite ingredient keys
+        except sqlite3.Error as e:
+            logger.error(f"Failed to migrate database schema: {str(e)}")
+            self.conn.rollback()
+            raise
+
+    def _migrate_search_keys(self):
+        """Add and backfill the normalized search key columns"""
+        self._ensure_column("maaltijden", "recept_naam_key", "TEXT")
+        self._ensure_column("maaltijden", "keuken_origine_key", "TEXT")
+        self._ensure_column("Ingredienten", "ingredient_key", "TEXT")
+
+        rows = self.cursor.execute(
+            "SELECT rowid, recept_naam, keuken_origine FROM maaltijden"
+        ).fetchall()
+        self.cursor.executemany(
+            "UPDATE maaltijden SET recept_naam_key = ?, keuken_origine_key = ? WHERE rowid = ?",
+            [(normalize_key(name), normalize_key(cuisine), rowid) for rowid, name, cuisine in rows],
+        )
+        rows = self.cursor.execute("SELECT rowid, ingredient FROM Ingredienten").fetchall()
+        self.cursor.executemany(
+            "UPDATE Ingredienten SET ingredient_key = ? WHERE rowid = ?",
+            [(normalize_key(name), rowid) for rowid, name in rows],
+        )
+
+    def _migrate_canonical_units(self):
+        """Add and backfill the canonical amount/unit columns"""
+        import pandas as pd
+
+        self._ensure_column("Ingredienten", "hoeveelheid_canon", "REAL")
+        self._ensure_column("Ingredienten", "eenheid_canon", "TEXT")
+
+        # Aliased: with an INTEGER PRIMARY KEY column SQLite reports rowid under that name
+        df = pd.read_sql_query(
+            "SELECT rowid AS rid, hoeveelheid, eenheid FROM Ingredienten", self.conn
+        )
+        amounts, units = to_canonical_frame(df["hoeveelheid"], df["eenheid"])
+        self.cursor.executemany(
+            "UPDATE Ingredienten SET hoeveelheid_canon = ?, eenheid_canon = ? WHERE rowid = ?",
+            zip(amounts.tolist(), units.tolist(), df["rid"].tolist()),
+        )
+
+    def _migrate_search_tokens(self):
+        """Backfill the search token table, replacing the unused LIKE-era key indexes"""
+        self.cursor.execute("DROP INDEX IF EXISTS idx_maaltijden_naam_key")
+        self.cursor.execute("DROP INDEX IF EXISTS idx_maaltijden_keuken_key")
+        self.cursor.execute("DELETE FROM SearchTokens")
+        self._index_search_tokens(
+            (recipe_id, f"{name} {cuisine}")
+            for recipe_id, name, cuisine in self.cursor.execute(
+                "SELECT ID, recept_naam, keuken_origine FROM maaltijden"
+            ).fetchall()
+        )
+        self._index_search_tokens(
+            self.cursor.execute("SELECT ID_maaltijden, ingredient FROM Ingredienten").fetchall()
+        )
+
+    def _index_search_tokens(self, rows: Iterable[tuple]):
+        """Index the words of (recipe ID, text) rows for search"""
+        self.cursor.executemany(
+            "INSERT OR IGNORE INTO SearchTokens (token, recipe_id) VALUES (?, ?)",
+            [
+                (token, recipe_id)
+                for recipe_id, text in rows if recipe_id is not None
+                for token in search_tokens(text)
+            ],
+        )
+
+    def _reset_expansions(self):
+        """Drop the expansion memo (possibly holding duplicates) before it gets its unique key"""
+        self.cursor.execute("DROP INDEX IF EXISTS idx_recipe_expansion_recipe")
+        self.cursor.execute("DELETE FROM RecipeExpansion")
+        self.cursor.execute("DELETE FROM RecipeExpansionState")
+
+    def _migrate_week_menu_versions(self):
+        """Key saved week menus by week start date, one version per save"""
+        self._ensure_column("WeekMenu", "week_start", "TEXT")
+        self._ensure_column("WeekMenu", "version", "INTEGER")
+        self.cursor.execute("DROP INDEX IF EXISTS idx_week_menu_created")
+        # Monday on or before the save date
+        self.cursor.execute("""
+            UPDATE WeekMenu
+            SET week_start = date(created_at, 'unixepoch', 'localtime', 'weekday 0', '-6 days')
+            WHERE week_start IS NULL
+        """)
+        self.cursor.execute("""
+            UPDATE WeekMenu SET version = (
+                SELECT COUNT(DISTINCT w.created_at) FROM WeekMenu w
+                WHERE w.week_start = WeekMenu.week_start AND w.created_at <= WeekMenu.created_at
+            )
+            WHERE version IS NULL
+        """)
+        self._refresh_recency()
+
     def connect(self):
         """Establish database connection"""
         try:
@@ -112,13 +344,16 @@ class DatabaseHandler:
             self.cursor.execute("""
                 INSERT INTO maaltijden 
                 (recept_naam, aantal_personen, bereidingstijd, keuken_origine, 
-                locatie_bestand, url, gezondheidsgraad)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                locatie_bestand, url, gezondheidsgraad,
+                recept_naam_key, keuken_origine_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (recipe.name, recipe.persons, recipe.cooking_time, 
                   recipe.cuisine_origin, recipe.file_location, 
-                  recipe.url, recipe.health_grade))
-            self.conn.commit()
+                  recipe.url, recipe.health_grade,
+                  normalize_key(recipe.name), normalize_key(recipe.cuisine_origin)))
             last_id = self.cursor.lastrowid
+            self._index_search_tokens([(last_id, f"{recipe.name} {recipe.cuisine_origin}")])
+            self.conn.commit()
             logger.info(f"Recipe '{recipe.name}' inserted with ID: {last_id}")
             return last_id
         except sqlite3.Error as e:
@@ -130,13 +365,14 @@ class DatabaseHandler:
         """Insert ingredients for a recipe"""
         try:
             logger.info(f"Inserting {len(ingredients)} ingredients for recipe ID: {recipe_id}")
+            new_keys = set()
             for ingredient in ingredients:
                 if not ingredient.amount or not ingredient.name:
                     logger.warning(f"Skipping ingredient with no amount or name for recipe ID: {recipe_id}")
                     continue
                 
-                # Convert amount to integer to match database schema
-                amount_int = int(ingredient.amount)
+                amount = float(ingredient.amount)
+                canonical_amount, canonical_unit = to_canonical(amount, ingredient.unit)
                 
                 # Handle date conversion - for now use 0 for empty dates
                 date_int = 0  # Default value for date as integer
@@ -149,15 +385,30 @@ class DatabaseHandler:
                     except (ValueError, AttributeError):
                         date_int = 0  # Use 0 if date parsing fails
                 
+                ingredient_key = normalize_key(ingredient.name)
+                if not self.cursor.execute(
+                    "SELECT 1 FROM Ingredienten WHERE ingredient_key = ? LIMIT 1", (ingredient_key,)
+                ).fetchone():
+                    new_keys.add(ingredient_key)
+
                 self.cursor.execute("""
                     INSERT INTO Ingredienten 
                     (ID_maaltijden, hoeveelheid, eenheid, ingredient, 
-                    prijs, winkel, datum_prijs)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (recipe_id, amount_int, ingredient.unit, 
+                    prijs, winkel, datum_prijs, ingredient_key,
+                    hoeveelheid_canon, eenheid_canon)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (recipe_id, amount, ingredient.unit, 
                       ingredient.name, ingredient.price, ingredient.shop, 
-                      date_int))
+                      date_int, ingredient_key, canonical_amount, canonical_unit))
+                self._index_search_tokens([(recipe_id, ingredient.name)])
+
+            # Receipts bought before this ingredient existed can now be linked to it
+            self._link_new_ingredient_keys(sorted(new_keys))
+            self._invalidate_expansions(recipe_id)
             self.conn.commit()
+            if new_keys:
+                # Only after the commit, so no handler rebuilds it without them
+                self._forget_ingredient_automaton()
             logger.info(f"Successfully inserted {len(ingredients)} ingredients for recipe ID: {recipe_id}")
         except sqlite3.Error as e:
             logger.error(f"Failed to insert ingredients: {str(e)}")
@@ -166,26 +417,199 @@ class DatabaseHandler:
 
     def get_all_recipes(self) -> pd.DataFrame:
         """Get all recipes from database"""
+        import pandas as pd
+
         logger.debug("Fetching all recipes.")
         query = "SELECT * FROM maaltijden ORDER BY ID ASC"
         return pd.read_sql_query(query, self.conn)
 
+    def get_recipe_id_bounds(self) -> tuple:
+        """Get the lowest and highest recipe ID (None, None for an empty library)"""
+        self.cursor.execute("SELECT MIN(ID), MAX(ID) FROM maaltijden")
+        return self.cursor.fetchone()
+
+    def set_recipe_rating(self, recipe_id: int, rating: Optional[int]):
+        """Set a recipe's rating (1-5, None to clear it)"""
+        try:
+            logger.info(f"Rating recipe ID {recipe_id}: {rating}")
+            self.cursor.execute(
+                "UPDATE maaltijden SET waardering = ? WHERE ID = ?", (rating, recipe_id)
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to rate recipe: {str(e)}")
+            self.conn.rollback()
+            raise
+
+    def get_recipe_weight_inputs(self, recipe_ids: Optional[List[int]] = None) -> List[tuple]:
+        """Get (ID, rating, last served timestamp) rows of all or the given recipes"""
+        query = """
+            SELECT m.ID, m.waardering, r.last_served
+            FROM maaltijden m
+            LEFT JOIN RecipeRecency r ON r.recipe_id = m.ID
+        """
+        if recipe_ids is None:
+            self.cursor.execute(query)
+        else:
+            self.cursor.execute(
+                query + "WHERE m.ID IN ({})".format(','.join(['?'] * len(recipe_ids))),
+                list(recipe_ids),
+            )
+        return self.cursor.fetchall()
+
+    def sample_recipe_ids(self, n: int, exclude_ids: Iterable[int] = (),
+                          rng: Optional[random.Random] = None) -> List[int]:
+        """
+        Pick up to n distinct random recipe IDs inside SQLite.
+        IDs are drawn uniformly from the ID range and looked up through the
+        primary key; draws landing in gaps (deleted recipes) are rejected and
+        redrawn, so every recipe stays equally likely. Only a very sparse ID
+        range falls back to ORDER BY RANDOM() for the remainder.
+        """
+        rng = rng or random.Random()
+        low, high = self.get_recipe_id_bounds()
+        if low is None or n <= 0:
+            return []
+        excluded = set(exclude_ids)
+        chosen: List[int] = []
+        seen = set(excluded)
+
+        for _ in range(8):
+            missing = n - len(chosen)
+            if not missing:
+                break
+            draws = {rng.randint(low, high) for _ in range(missing * 2)} - seen
+            if not draws:
+                continue
+            self.cursor.execute(
+                f"SELECT ID FROM maaltijden WHERE ID IN ({','.join(['?'] * len(draws))})",
+                list(draws),
+            )
+            hits = [row[0] for row in self.cursor.fetchall()]
+            rng.shuffle(hits)
+            chosen.extend(hits[:missing])
+            seen |= draws
+
+        missing = n - len(chosen)
+        if missing:
+            skip = excluded | set(chosen)
+            self.cursor.execute(
+                f"SELECT ID FROM maaltijden WHERE ID NOT IN ({','.join(['?'] * len(skip))}) "
+                "ORDER BY RANDOM() LIMIT ?",
+                list(skip) + [missing],
+            )
+            chosen.extend(row[0] for row in self.cursor.fetchall())
+        return chosen
+
+    def get_recipes_by_ids(self, recipe_ids: List[int]) -> pd.DataFrame:
+        """Get the given recipes, in the order of recipe_ids"""
+        import pandas as pd
+
+        logger.debug(f"Fetching {len(recipe_ids)} recipes by ID.")
+        query = "SELECT * FROM maaltijden WHERE ID IN ({})".format(
+            ','.join(['?'] * len(recipe_ids))
+        )
+        df = pd.read_sql_query(query, self.conn, params=list(recipe_ids))
+        return df.set_index("ID", drop=False).reindex(recipe_ids).reset_index(drop=True)
+
+    def get_recipe_summaries(self, recipe_ids: List[int]) -> List[tuple]:
+        """
+        Get (ID, recept_naam, bereidingstijd, gezondheidsgraad, keuken_origine_key)
+        rows for the given recipes, in the order of recipe_ids.
+        """
+        self.cursor.execute(
+            """
+            SELECT ID, recept_naam, bereidingstijd, gezondheidsgraad, keuken_origine_key
+            FROM maaltijden WHERE ID IN ({})
+            """.format(','.join(['?'] * len(recipe_ids))),
+            list(recipe_ids),
+        )
+        rows = {row[0]: row for row in self.cursor.fetchall()}
+        return [rows[recipe_id] for recipe_id in recipe_ids if recipe_id in rows]
+
+    def get_planner_candidates(self, start_id: int, limit: int,
+                               max_cooking_time: Optional[int] = None,
+                               require_health_grade: bool = False,
+                               exclude_ids=()) -> List[tuple]:
+        """
+        Get up to limit recipes with ID >= start_id satisfying the per-recipe
+        planner constraints, as (ID, recept_naam, bereidingstijd,
+        gezondheidsgraad, keuken_origine_key) rows.
+        """
+        # The CASTs keep SQLite on the ID range: the scan stops after about
+        # limit / selectivity rows instead of sorting every match of an index.
+        # They also read legacy TEXT grades and turn values such as '/' into 0.
+        conditions = ["ID >= ?"]
+        params: list = [start_id]
+        if max_cooking_time is not None:
+            conditions.append("CAST(bereidingstijd AS INTEGER) BETWEEN 1 AND ?")
+            params.append(max_cooking_time)
+        if require_health_grade:
+            conditions.append("CAST(gezondheidsgraad AS INTEGER) BETWEEN 1 AND 3")
+        if exclude_ids:
+            conditions.append(f"ID NOT IN ({','.join(['?'] * len(exclude_ids))})")
+            params.extend(exclude_ids)
+        query = f"""
+            SELECT ID, recept_naam, bereidingstijd, gezondheidsgraad, keuken_origine_key
+            FROM maaltijden
+            WHERE {' AND '.join(conditions)}
+            ORDER BY ID
+            LIMIT ?
+        """
+        self.cursor.execute(query, params + [limit])
+        return self.cursor.fetchall()
+
     def search_recipes(self, search_term: str) -> pd.DataFrame:
         """Search recipes by name, cuisine, or ingredients"""
+        import pandas as pd
+
         logger.debug(f"Searching recipes with term: {search_term}")
-        query = """
-            SELECT DISTINCT m.* FROM maaltijden m
+        words = search_tokens(search_term)
+        if not words:  # only punctuation, nothing to match
+            return pd.read_sql_query("SELECT * FROM maaltijden WHERE 0", self.conn)
+        # Every word must start a word of the recipe's name, cuisine or ingredients.
+        # Prefixes become token ranges, which the SearchTokens primary key serves, and
+        # normalized tokens mean "creme" also finds "crème"
+        matches = " INTERSECT ".join(
+            ["SELECT recipe_id FROM SearchTokens WHERE token >= ? AND token < ?"] * len(words)
+        )
+        params = [bound for word in words for bound in (word, word[:-1] + chr(ord(word[-1]) + 1))]
+        return pd.read_sql_query(
+            f"SELECT m.* FROM maaltijden m WHERE m.ID IN ({matches}) ORDER BY m.ID ASC",
+            self.conn, params=params,
+        )
+
+    def get_recipe_ingredient_names(self) -> List[tuple]:
+        """Get (recipe ID, ingredient name) pairs for building the pantry index"""
+        logger.debug("Fetching ingredient names per recipe.")
+        self.cursor.execute("SELECT ID_maaltijden, ingredient FROM Ingredienten")
+        return self.cursor.fetchall()
+
+    def get_similarity_rows(self) -> List[tuple]:
+        """Get (recipe ID, cuisine, ingredient) rows for building recipe vectors"""
+        logger.debug("Fetching cuisine and ingredients per recipe.")
+        self.cursor.execute("""
+            SELECT m.ID, m.keuken_origine, i.ingredient
+            FROM maaltijden m
             LEFT JOIN Ingredienten i ON m.ID = i.ID_maaltijden
-            WHERE LOWER(m.recept_naam) LIKE ? 
-               OR LOWER(m.keuken_origine) LIKE ?
-               OR LOWER(i.ingredient) LIKE ?
-            ORDER BY m.ID ASC
-        """
-        search_pattern = f'%{search_term.lower()}%'
-        return pd.read_sql_query(query, self.conn, params=[search_pattern, search_pattern, search_pattern])
+        """)
+        return self.cursor.fetchall()
+
+    def get_recipe_names(self, recipe_ids: List[int]) -> dict:
+        """Get a mapping of recipe ID to recipe name for the given IDs"""
+        logger.debug(f"Fetching recipe names for IDs: {recipe_ids}")
+        if not recipe_ids:
+            return {}
+        query = """
+            SELECT ID, recept_naam FROM maaltijden WHERE ID IN ({})
+        """.format(','.join(['?'] * len(recipe_ids)))
+        self.cursor.execute(query, list(recipe_ids))
+        return dict(self.cursor.fetchall())
 
     def get_recipes_for_combo(self) -> pd.DataFrame:
         """Get recipes for combo box selection"""
+        import pandas as pd
+
         logger.debug("Fetching recipes for combobox.")
         query = "SELECT ID, recept_naam FROM maaltijden ORDER BY ID DESC"
         return pd.read_sql_query(query, self.conn)
@@ -202,24 +626,313 @@ class DatabaseHandler:
         
         return result[0]
 
+    # Ingredient lines per recipe with components expanded: flat recipes read
+    # Ingredienten directly, composite ones their memoized RecipeExpansion rows.
+    # Callers run _ensure_expansions() first and define a "targets" CTE (ID).
+    EXPANDED_CTE = """
+        expanded AS (
+            SELECT t.ID AS recipe_id, i.ingredient, i.ingredient_key, i.eenheid_canon,
+                   i.hoeveelheid_canon AS amount
+            FROM targets t
+            INNER JOIN Ingredienten i ON i.ID_maaltijden = t.ID
+            WHERE NOT EXISTS (SELECT 1 FROM RecipeComponents c WHERE c.parent_id = t.ID)
+            UNION ALL
+            SELECT e.recipe_id, e.ingredient, e.ingredient_key, e.eenheid_canon, e.amount
+            FROM targets t
+            INNER JOIN RecipeExpansion e ON e.recipe_id = t.ID
+        )
+    """
+
+    def _missing_expansions(self, targets_sql: str, params: list) -> List[int]:
+        """Composite target recipes without memoized expansion"""
+        self.cursor.execute(f"""
+            WITH targets AS ({targets_sql})
+            SELECT DISTINCT c.parent_id FROM RecipeComponents c
+            INNER JOIN targets t ON t.ID = c.parent_id
+            WHERE c.parent_id NOT IN (SELECT recipe_id FROM RecipeExpansionState)
+        """, params)
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def _ensure_expansions(self, targets_sql: str, params: list):
+        """
+        Memoize the expanded ingredient vectors of composite target recipes.
+        Other connections may expand the same recipes concurrently, so the
+        missing ones are looked up again under a write lock before inserting.
+        """
+        if not self._missing_expansions(targets_sql, params):
+            return
+        own_transaction = not self.conn.in_transaction
+        try:
+            if own_transaction:
+                self.cursor.execute("BEGIN IMMEDIATE")
+            missing = self._missing_expansions(targets_sql, params)
+            for recipe_id in missing:
+                self._expand_recipe(recipe_id)
+            if missing:
+                logger.debug(f"Expanded {len(missing)} composite recipes.")
+            if own_transaction:
+                self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to expand composite recipes: {str(e)}")
+            if own_transaction:
+                self.conn.rollback()
+            raise
+
+    def _expand_recipe(self, recipe_id: int):
+        """Insert the expanded ingredient vector of one composite recipe"""
+        self.cursor.execute("""
+            WITH RECURSIVE tree(recipe_id, factor, depth) AS (
+                SELECT ?, 1.0, 0
+                UNION ALL
+                SELECT c.child_id, tree.factor * c.factor, tree.depth + 1
+                FROM RecipeComponents c
+                INNER JOIN tree ON c.parent_id = tree.recipe_id
+                WHERE tree.depth < ?
+            )
+            INSERT OR IGNORE INTO RecipeExpansion
+                (recipe_id, ingredient, ingredient_key, eenheid_canon, amount)
+            SELECT ?, i.ingredient, MIN(i.ingredient_key), i.eenheid_canon,
+                   SUM(i.hoeveelheid_canon * tree.factor)
+            FROM tree
+            INNER JOIN Ingredienten i ON i.ID_maaltijden = tree.recipe_id
+            GROUP BY i.ingredient, i.eenheid_canon
+        """, (recipe_id, MAX_COMPONENT_DEPTH, recipe_id))
+        self.cursor.execute(
+            "INSERT OR IGNORE INTO RecipeExpansionState (recipe_id) VALUES (?)", (recipe_id,)
+        )
+
+    def _invalidate_expansions(self, recipe_id: int):
+        """Drop the memoized vectors of a recipe and every recipe containing it"""
+        ancestors = self.get_recipe_ancestors(recipe_id) + [recipe_id]
+        placeholders = ','.join(['?'] * len(ancestors))
+        self.cursor.execute(
+            f"DELETE FROM RecipeExpansion WHERE recipe_id IN ({placeholders})", ancestors
+        )
+        self.cursor.execute(
+            f"DELETE FROM RecipeExpansionState WHERE recipe_id IN ({placeholders})", ancestors
+        )
+
+    def get_recipe_ancestors(self, recipe_id: int) -> List[int]:
+        """IDs of all recipes that contain the recipe, directly or through others"""
+        self.cursor.execute("""
+            WITH RECURSIVE up(id) AS (
+                SELECT parent_id FROM RecipeComponents WHERE child_id = ?
+                UNION
+                SELECT c.parent_id FROM RecipeComponents c INNER JOIN up ON c.child_id = up.id
+            )
+            SELECT id FROM up
+        """, (recipe_id,))
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def get_recipe_components(self, recipe_id: int) -> List[tuple]:
+        """Get (child ID, child name, factor) rows of a recipe's direct components"""
+        self.cursor.execute("""
+            SELECT c.child_id, m.recept_naam, c.factor
+            FROM RecipeComponents c
+            INNER JOIN maaltijden m ON m.ID = c.child_id
+            WHERE c.parent_id = ?
+            ORDER BY m.recept_naam
+        """, (recipe_id,))
+        return self.cursor.fetchall()
+
+    def add_recipe_component(self, parent_id: int, child_id: int, factor: float = 1.0):
+        """
+        Use child_id as a component of parent_id, factor times its own amounts.
+        Raises ValueError if that would make a recipe contain itself.
+        """
+        self.cursor.execute("""
+            WITH RECURSIVE down(id) AS (
+                SELECT ?
+                UNION
+                SELECT c.child_id FROM RecipeComponents c INNER JOIN down ON c.parent_id = down.id
+            )
+            SELECT 1 FROM down WHERE id = ?
+        """, (child_id, parent_id))
+        if self.cursor.fetchone():
+            raise ValueError("A recipe cannot contain itself, directly or through its components")
+        try:
+            logger.info(f"Adding recipe ID {child_id} x{factor} as component of recipe ID {parent_id}")
+            self.cursor.execute("""
+                INSERT INTO RecipeComponents (parent_id, child_id, factor) VALUES (?, ?, ?)
+                ON CONFLICT(parent_id, child_id) DO UPDATE SET factor = excluded.factor
+            """, (parent_id, child_id, factor))
+            self._invalidate_expansions(parent_id)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to add recipe component: {str(e)}")
+            self.conn.rollback()
+            raise
+
+    def remove_recipe_component(self, parent_id: int, child_id: int):
+        """Remove a component from a recipe"""
+        try:
+            logger.info(f"Removing component recipe ID {child_id} from recipe ID {parent_id}")
+            self.cursor.execute(
+                "DELETE FROM RecipeComponents WHERE parent_id = ? AND child_id = ?",
+                (parent_id, child_id),
+            )
+            self._invalidate_expansions(parent_id)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to remove recipe component: {str(e)}")
+            self.conn.rollback()
+            raise
+
     def get_ingredients_for_meals(self, meal_names: List[str]) -> List[tuple]:
         """Get aggregated ingredients for a list of meals"""
         logger.debug(f"Fetching ingredients for meals: {meal_names}")
-        query = """
+        targets = "SELECT ID FROM maaltijden WHERE recept_naam IN ({})".format(
+            ','.join(['?'] * len(meal_names))
+        )
+        self._ensure_expansions(targets, meal_names)
+        query = f"""
+            WITH targets AS ({targets}), {self.EXPANDED_CTE}
             SELECT 
-                i.ingredient,
-                SUM(i.hoeveelheid) as total_amount,
-                i.eenheid
-            FROM maaltijden m
-            INNER JOIN Ingredienten i ON m.ID = i.ID_maaltijden
-            WHERE m.recept_naam IN ({})
-            GROUP BY i.ingredient, i.eenheid
-            ORDER BY i.ingredient ASC
-        """.format(','.join(['?'] * len(meal_names)))
+                ingredient,
+                ROUND(SUM(amount), 2) as total_amount,
+                eenheid_canon
+            FROM expanded
+            GROUP BY ingredient, eenheid_canon
+            ORDER BY ingredient ASC
+        """
         
         self.cursor.execute(query, meal_names)
         return self.cursor.fetchall()
 
+    def get_priced_ingredients_for_meals(self, meal_names: List[str]) -> List[tuple]:
+        """
+        Get aggregated ingredients for a list of meals with the most recent
+        linked receipt price and shop, as (ingredient, amount, unit, price, shop).
+        """
+        logger.debug(f"Fetching priced ingredients for meals: {meal_names}")
+        targets = "SELECT ID FROM maaltijden WHERE recept_naam IN ({})".format(
+            ','.join(['?'] * len(meal_names))
+        )
+        self._ensure_expansions(targets, meal_names)
+        query = f"""
+            WITH targets AS ({targets}), {self.EXPANDED_CTE},
+            needed AS (
+                SELECT
+                    ingredient,
+                    ingredient_key,
+                    ROUND(SUM(amount), 2) AS total_amount,
+                    eenheid_canon AS eenheid
+                FROM expanded
+                GROUP BY ingredient, eenheid_canon
+            ),
+            latest AS (
+                SELECT
+                    l.ingredient_key,
+                    r.price,
+                    r.shop,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY l.ingredient_key
+                        ORDER BY r.price_date DESC, r.price ASC
+                    ) AS rank
+                FROM ReceiptIngredientLinks l
+                INNER JOIN ReceiptItems r ON r.id = l.receipt_item_id
+                WHERE l.ingredient_key IN (SELECT ingredient_key FROM needed)
+            )
+            SELECT n.ingredient, n.total_amount, n.eenheid, p.price, p.shop
+            FROM needed n
+            LEFT JOIN latest p ON p.ingredient_key = n.ingredient_key AND p.rank = 1
+            ORDER BY n.ingredient ASC
+        """
+
+        self.cursor.execute(query, meal_names)
+        return self.cursor.fetchall()
+
+    def get_recipe_ingredient_vector(self, recipe_id: int) -> List[tuple]:
+        """Get (ingredient, ingredient_key, canonical unit, canonical amount) rows of one recipe"""
+        logger.debug(f"Fetching ingredient vector for recipe ID: {recipe_id}")
+        self._ensure_expansions("SELECT ? AS ID", [recipe_id])
+        self.cursor.execute(f"""
+            WITH targets(ID) AS (SELECT ?), {self.EXPANDED_CTE}
+            SELECT ingredient, MIN(ingredient_key), eenheid_canon, SUM(amount)
+            FROM expanded
+            GROUP BY ingredient, eenheid_canon
+        """, (recipe_id,))
+        return self.cursor.fetchall()
+
+    def get_recipe_ingredient_keys(self, recipe_ids: List[int]) -> List[tuple]:
+        """Get distinct (recipe ID, ingredient_key) pairs of the given recipes"""
+        if not recipe_ids:
+            return []
+        targets = "SELECT ID FROM maaltijden WHERE ID IN ({})".format(
+            ','.join(['?'] * len(recipe_ids))
+        )
+        self._ensure_expansions(targets, list(recipe_ids))
+        self.cursor.execute(f"""
+            WITH targets AS ({targets}), {self.EXPANDED_CTE}
+            SELECT DISTINCT recipe_id, ingredient_key
+            FROM expanded
+            WHERE ingredient_key <> ''
+        """, list(recipe_ids))
+        return self.cursor.fetchall()
+
+    def get_latest_prices(self, ingredient_keys: List[str]) -> dict:
+        """Get the most recent linked receipt (price, shop) per ingredient key"""
+        logger.debug(f"Fetching latest prices for {len(ingredient_keys)} ingredients.")
+        if not ingredient_keys:
+            return {}
+        query = """
+            SELECT ingredient_key, price, shop FROM (
+                SELECT
+                    l.ingredient_key,
+                    r.price,
+                    r.shop,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY l.ingredient_key
+                        ORDER BY r.price_date DESC, r.price ASC
+                    ) AS rank
+                FROM ReceiptIngredientLinks l
+                INNER JOIN ReceiptItems r ON r.id = l.receipt_item_id
+                WHERE l.ingredient_key IN ({})
+            )
+            WHERE rank = 1
+        """.format(','.join(['?'] * len(ingredient_keys)))
+
+        self.cursor.execute(query, ingredient_keys)
+        return {key: (price, shop) for key, price, shop in self.cursor.fetchall()}
+
+    def get_shop_prices_for_meals(self, meal_names: List[str]) -> List[tuple]:
+        """
+        Get the latest linked receipt price of every ingredient of the given meals
+        at every shop, as (ingredient, eenheid, shop, price) rows.
+        """
+        logger.debug(f"Fetching shop prices for meals: {meal_names}")
+        targets = "SELECT ID FROM maaltijden WHERE recept_naam IN ({})".format(
+            ','.join(['?'] * len(meal_names))
+        )
+        self._ensure_expansions(targets, meal_names)
+        query = f"""
+            WITH targets AS ({targets}), {self.EXPANDED_CTE},
+            needed AS (
+                SELECT DISTINCT ingredient, eenheid_canon AS eenheid, ingredient_key
+                FROM expanded
+            ),
+            latest AS (
+                SELECT
+                    l.ingredient_key,
+                    r.shop,
+                    r.price,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY l.ingredient_key, r.shop
+                        ORDER BY r.price_date DESC, r.price ASC
+                    ) AS rank
+                FROM ReceiptIngredientLinks l
+                INNER JOIN ReceiptItems r ON r.id = l.receipt_item_id
+                WHERE l.ingredient_key IN (SELECT ingredient_key FROM needed)
+                  AND r.shop IS NOT NULL AND r.shop != ''
+            )
+            SELECT n.ingredient, n.eenheid, p.shop, p.price
+            FROM needed n
+            INNER JOIN latest p ON p.ingredient_key = n.ingredient_key AND p.rank = 1
+        """
+
+        self.cursor.execute(query, meal_names)
+        return self.cursor.fetchall()
+
     def get_week_menu_recipes_with_urls(self, meal_names: List[str]) -> List[dict]:
         """Get recipes for a list of meal names, including their URLs."""
         logger.debug(f"Fetching recipes with URLs for meals: {meal_names}")
@@ -268,14 +981,55 @@ class DatabaseHandler:
 
     def get_all_receipt_items(self) -> pd.DataFrame:
         """Get all receipt items from the database"""
+        import pandas as pd
+
         logger.debug("Fetching all receipt items.")
         query = "SELECT * FROM ReceiptItems ORDER BY price_date DESC"
         return pd.read_sql_query(query, self.conn)
 
+    def get_ingredient_keys(self) -> List[str]:
+        """Get all distinct normalized ingredient names"""
+        logger.debug("Fetching distinct ingredient keys.")
+        self.cursor.execute(
+            "SELECT DISTINCT ingredient_key FROM Ingredienten WHERE ingredient_key != ''"
+        )
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def _ingredient_automaton(self) -> AhoCorasick:
+        """Cached automaton over all ingredient keys, built on first use"""
+        with self._automata_lock:
+            automaton = self._automata.get(self.DB_PATH)
+            if automaton is None:
+                automaton = AhoCorasick(self.get_ingredient_keys())
+                self._automata[self.DB_PATH] = automaton
+            return automaton
+
+    def _forget_ingredient_automaton(self):
+        with self._automata_lock:
+            self._automata.pop(self.DB_PATH, None)
+
+    def get_receipt_version(self) -> Optional[int]:
+        """Cheap change marker for the append-only ReceiptItems table: the highest id"""
+        self.cursor.execute("SELECT MAX(id) FROM ReceiptItems")
+        return self.cursor.fetchone()[0]
+
+    def get_receipt_name_prices(self) -> List[tuple]:
+        """Get (item_name, average price, purchase count) per distinct receipt item name"""
+        logger.debug("Fetching receipt item name prices.")
+        self.cursor.execute("""
+            SELECT item_name, AVG(price), COUNT(*)
+            FROM ReceiptItems
+            WHERE price > 0
+            GROUP BY item_name
+        """)
+        return self.cursor.fetchall()
+
     def insert_receipt_items(self, items: List[ReceiptItem]):
-        """Insert receipt items into the database"""
+        """Insert receipt items and link them to the ingredients they contain"""
         try:
             logger.info(f"Inserting {len(items)} receipt items.")
+            inserted = []
+            first_item_id = None
             for item in items:
                 self.cursor.execute("""
                     INSERT INTO ReceiptItems
@@ -283,6 +1037,14 @@ class DatabaseHandler:
                     VALUES (?, ?, ?, ?, ?, ?, ?)
                 """, (item.item_name, item.price, item.shop,
                       item.price_date, item.quantity, item.unit, item.receipt_image_path))
+                inserted.append((self.cursor.lastrowid, item.item_name))
+                if first_item_id is None:
+                    first_item_id = self.cursor.lastrowid
+
+            # Price lookups later join on these links instead of string matching
+            self._insert_receipt_links(link_receipt_items(self._ingredient_automaton(), inserted))
+            if first_item_id is not None:
+                analytics.add_receipt_items(self.cursor, first_item_id)
             self.conn.commit()
             logger.info(f"Successfully inserted {len(items)} receipt items.")
         except sqlite3.Error as e:
@@ -290,61 +1052,280 @@ class DatabaseHandler:
             self.conn.rollback()
             raise
 
-    def insert_week_menu_entry(self, entry: WeekMenuEntry):
-        """Insert a new week menu entry into the database"""
+    def _insert_receipt_links(self, links: List[tuple]):
+        """Store automatically computed receipt item -> ingredient links"""
+        self.cursor.executemany("""
+            INSERT OR IGNORE INTO ReceiptIngredientLinks (receipt_item_id, ingredient_key, is_manual)
+            VALUES (?, ?, 0)
+        """, links)
+
+    def _iter_auto_linked_receipt_items(self):
+        """Stream (id, item_name) of receipt items without a manual link override"""
+        return self.conn.execute("""
+            SELECT r.id, r.item_name FROM ReceiptItems r
+            WHERE NOT EXISTS (
+                SELECT 1 FROM ReceiptIngredientLinks l
+                WHERE l.receipt_item_id = r.id AND l.is_manual = 1
+            )
+        """)
+
+    def _link_new_ingredient_keys(self, keys: List[str]):
+        """Link existing receipt items to ingredient names that did not exist before"""
+        if not keys:
+            return
+        automaton = AhoCorasick(keys)
+        links = link_receipt_items(automaton, self._iter_auto_linked_receipt_items())
+        if links:
+            self._insert_receipt_links(links)
+            analytics.rebuild_aggregates(self.cursor, keys)
+
+    def _relink_receipt_items(self) -> int:
+        """Recompute all automatic links, keeping manual overrides"""
+        self.cursor.execute("DELETE FROM ReceiptIngredientLinks WHERE is_manual = 0")
+        links = link_receipt_items(self._ingredient_automaton(),
+                                   self._iter_auto_linked_receipt_items())
+        self._insert_receipt_links(links)
+        return len(links)
+
+    def backfill_receipt_links(self, progress: Optional[Callable[[int, int, str], None]] = None) -> int:
+        """
+        Batch job recomputing the automatic receipt links of all existing receipt
+        items; progress(done, total, message) is called between its steps.
+        """
         try:
-            logger.info(f"Inserting week menu entry for {entry.day}: Recipe ID {entry.recipe_id}")
+            logger.info("Backfilling receipt ingredient links.")
+            if progress:
+                progress(0, 2, "Linking receipt items to ingredients...")
+            count = self._relink_receipt_items()
+            if progress:
+                progress(1, 2, "Rebuilding price history...")
+            analytics.rebuild_aggregates(self.cursor)
+            self.conn.commit()
+            if progress:
+                progress(2, 2, "Price links rebuilt")
+            logger.info(f"Stored {count} automatic receipt ingredient links.")
+            return count
+        except sqlite3.Error as e:
+            logger.error(f"Failed to backfill receipt links: {str(e)}")
+            self.conn.rollback()
+            raise
+
+    def _get_receipt_item_link_keys(self, receipt_item_id: int) -> set:
+        """Ingredient keys a receipt item is currently linked to"""
+        self.cursor.execute(
+            "SELECT ingredient_key FROM ReceiptIngredientLinks WHERE receipt_item_id = ?",
+            (receipt_item_id,),
+        )
+        return {row[0] for row in self.cursor.fetchall()}
+
+    def set_receipt_item_link(self, receipt_item_id: int, ingredient_name: Optional[str]):
+        """
+        Manually link a receipt item to an ingredient, replacing automatic links.
+        Passing None marks the item as matching no ingredient at all.
+        """
+        try:
+            logger.info(f"Setting manual link for receipt item {receipt_item_id}: {ingredient_name}")
+            affected = self._get_receipt_item_link_keys(receipt_item_id)
+            self.cursor.execute(
+                "DELETE FROM ReceiptIngredientLinks WHERE receipt_item_id = ?", (receipt_item_id,)
+            )
             self.cursor.execute("""
-                INSERT INTO WeekMenu (day, recipe_id, created_at)
-                VALUES (?, ?, ?)
-            """, (entry.day, entry.recipe_id, entry.created_at))
+                INSERT INTO ReceiptIngredientLinks (receipt_item_id, ingredient_key, is_manual)
+                VALUES (?, ?, 1)
+            """, (receipt_item_id, normalize_key(ingredient_name)))
+            affected.add(normalize_key(ingredient_name))
+            analytics.rebuild_aggregates(self.cursor, affected - {""})
             self.conn.commit()
-            logger.info(f"Successfully inserted week menu entry for {entry.day}.")
         except sqlite3.Error as e:
-            logger.error(f"Failed to insert week menu entry: {str(e)}")
+            logger.error(f"Failed to set receipt item link: {str(e)}")
             self.conn.rollback()
             raise
 
-    def get_latest_week_menu(self) -> List[WeekMenuEntry]:
-        """Get the latest complete week menu (7 entries) from the database."""
-        logger.debug("Fetching latest week menu.")
-        query = """
+    def reset_receipt_item_link(self, receipt_item_id: int):
+        """Drop the manual override of a receipt item and relink it automatically"""
+        try:
+            logger.info(f"Resetting links for receipt item {receipt_item_id}")
+            affected = self._get_receipt_item_link_keys(receipt_item_id)
+            self.cursor.execute(
+                "DELETE FROM ReceiptIngredientLinks WHERE receipt_item_id = ?", (receipt_item_id,)
+            )
+            row = self.cursor.execute(
+                "SELECT id, item_name FROM ReceiptItems WHERE id = ?", (receipt_item_id,)
+            ).fetchone()
+            if row:
+                self._insert_receipt_links(link_receipt_items(self._ingredient_automaton(), [row]))
+            affected |= self._get_receipt_item_link_keys(receipt_item_id)
+            analytics.rebuild_aggregates(self.cursor, affected - {""})
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to reset receipt item link: {str(e)}")
+            self.conn.rollback()
+            raise
+
+    def get_receipt_items_with_links(self, limit: int = 500) -> List[tuple]:
+        """Get the most recent receipt items with their linked ingredients and override flag"""
+        logger.debug("Fetching receipt items with ingredient links.")
+        self.cursor.execute("""
+            SELECT r.id, r.item_name, r.price, r.shop, r.price_date,
+                   GROUP_CONCAT(NULLIF(l.ingredient_key, ''), ', '),
+                   COALESCE(MAX(l.is_manual), 0)
+            FROM ReceiptItems r
+            LEFT JOIN ReceiptIngredientLinks l ON l.receipt_item_id = r.id
+            GROUP BY r.id
+            ORDER BY r.price_date DESC, r.id DESC
+            LIMIT ?
+        """, (limit,))
+        return self.cursor.fetchall()
+
+    @staticmethod
+    def _week_timestamp(week_start: str) -> int:
+        """Local midnight of a week start date as a Unix timestamp"""
+        monday = datetime.date.fromisoformat(week_start)
+        return int(datetime.datetime.combine(monday, datetime.time()).timestamp())
+
+    def _touch_recency(self, entries: Iterable[WeekMenuEntry]):
+        """Move the last served week of the entries' recipes forward"""
+        self.cursor.executemany("""
+            INSERT INTO RecipeRecency (recipe_id, last_served) VALUES (?, ?)
+            ON CONFLICT(recipe_id) DO UPDATE
+            SET last_served = MAX(last_served, excluded.last_served)
+        """, [(entry.recipe_id, self._week_timestamp(entry.week_start)) for entry in entries])
+
+    def _refresh_recency(self, recipe_ids: Optional[List[int]] = None):
+        """Recompute last served weeks from the menu history (all recipes if None)"""
+        if recipe_ids is None:
+            self.cursor.execute("DELETE FROM RecipeRecency")
+            where, params = "", []
+        else:
+            placeholders = ','.join(['?'] * len(recipe_ids))
+            self.cursor.execute(
+                f"DELETE FROM RecipeRecency WHERE recipe_id IN ({placeholders})", recipe_ids
+            )
+            where, params = f"WHERE recipe_id IN ({placeholders})", list(recipe_ids)
+        self.cursor.execute(f"""
+            INSERT INTO RecipeRecency (recipe_id, last_served)
+            SELECT recipe_id, MAX(CAST(strftime('%s', week_start, 'utc') AS INTEGER))
+            FROM WeekMenu {where} GROUP BY recipe_id
+        """, params)
+
+    def insert_week_menu_entry(self, entry: WeekMenuEntry):
+        """Insert a single entry as its own version of the entry's week"""
+        self.insert_week_menus([[entry]])
+
+    def insert_week_menus(self, menus: List[List[WeekMenuEntry]]) -> List[int]:
+        """
+        Save week menus as new versions of their weeks, all in a single
+        transaction. Every menu's entries share one week_start; returns the
+        version number given to each menu.
+        """
+        for menu in menus:
+            for entry in menu:
+                self._week_timestamp(entry.week_start)  # ValueError before anything is written
+                if entry.week_start != menu[0].week_start:
+                    raise ValueError(
+                        f"Week menu mixes weeks {menu[0].week_start} and {entry.week_start}"
+                    )
+        try:
+            versions = []
+            rows = []
+            for menu in menus:
+                if not menu:
+                    versions.append(0)
+                    continue
+                week_start = menu[0].week_start
+                self.cursor.execute(
+                    "SELECT COALESCE(MAX(version), 0) FROM WeekMenu WHERE week_start = ?",
+                    (week_start,),
+                )
+                version = self.cursor.fetchone()[0] + 1
+                # Two menus for the same week in one batch get consecutive versions
+                version = max([version] + [v + 1 for m, v in zip(menus, versions)
+                                           if m and m[0].week_start == week_start])
+                versions.append(version)
+                for entry in menu:
+                    entry.version = version
+                    rows.append((entry.day, entry.recipe_id, entry.created_at,
+                                 entry.week_start, version))
+            logger.info(f"Saving {len(menus)} week menus ({len(rows)} entries).")
+            self.cursor.executemany("""
+                INSERT INTO WeekMenu (day, recipe_id, created_at, week_start, version)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+            self._touch_recency(entry for menu in menus for entry in menu)
+            self.conn.commit()
+            return versions
+        except Exception as e:
+            logger.error(f"Failed to save week menus: {str(e)}")
+            self.conn.rollback()
+            raise
+
+    def get_recent_recipe_ids(self, since: int) -> List[int]:
+        """IDs of recipes served (or planned) at or after the since timestamp"""
+        self.cursor.execute(
+            "SELECT recipe_id FROM RecipeRecency WHERE last_served >= ?", (since,)
+        )
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def get_week_menu_version(self, week_start: str) -> int:
+        """Latest saved version of a week, 0 if the week has no menu"""
+        self.cursor.execute(
+            "SELECT COALESCE(MAX(version), 0) FROM WeekMenu WHERE week_start = ?", (week_start,)
+        )
+        return self.cursor.fetchone()[0]
+
+    def get_week_menu(self, week_start: str, version: Optional[int] = None) -> List[dict]:
+        """Get a week's menu (latest version by default), None for open days."""
+        logger.debug(f"Fetching week menu for {week_start} (version {version or 'latest'}).")
+        if version is None:
+            version = self.get_week_menu_version(week_start)
+        self.cursor.execute("""
             SELECT wm.day, wm.recipe_id, m.recept_naam, m.url
             FROM WeekMenu wm
             JOIN maaltijden m ON wm.recipe_id = m.ID
-            ORDER BY wm.created_at DESC, wm.id DESC
-            LIMIT 7
-        """
-        self.cursor.execute(query)
-        results = self.cursor.fetchall()
+            WHERE wm.week_start = ? AND wm.version = ?
+        """, (week_start, version))
 
-        # Map results to WeekMenuEntry objects (or a more suitable structure for GUI)
-        # For now, return a list of dicts for easier GUI consumption
-        menu_data = []
-        for day, recipe_id, recipe_name, recipe_url in results:
-            menu_data.append({
+        days_of_week = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        full_menu = {day: None for day in days_of_week}
+        for day, recipe_id, recipe_name, recipe_url in self.cursor.fetchall():
+            full_menu[day] = {
                 'day': day,
                 'recipe_id': recipe_id,
                 'recipe_name': recipe_name,
                 'recipe_url': recipe_url
-            })
-        
-        # Ensure we have 7 entries, even if some are missing from DB (fill with None or empty)
-        days_of_week = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        full_menu = {day: None for day in days_of_week}
-        for item in menu_data:
-            full_menu[item['day']] = item
-
+            }
         return [full_menu[day] for day in days_of_week]
 
-    def clear_week_menu(self):
-        """Clear all entries from the WeekMenu table."""
+    def get_latest_menu_week(self, until: str) -> Optional[str]:
+        """Most recent week start with a saved menu, on or before until"""
+        self.cursor.execute("SELECT MAX(week_start) FROM WeekMenu WHERE week_start <= ?", (until,))
+        return self.cursor.fetchone()[0]
+
+    def get_latest_week_menu(self) -> List[dict]:
+        """Get the menu of the most recent week up to the current one."""
+        today = datetime.date.today()
+        monday = today - datetime.timedelta(days=today.weekday())
+        week_start = self.get_latest_menu_week(monday.isoformat())
+        return self.get_week_menu(week_start) if week_start else [None] * 7
+
+    def clear_week_menu(self, week_start: str):
+        """Delete the latest version of a week's menu, older versions stay as history."""
         try:
-            logger.info("Clearing all entries from WeekMenu table.")
-            self.cursor.execute("DELETE FROM WeekMenu")
+            logger.info(f"Clearing the latest week menu version of {week_start}.")
+            version = self.get_week_menu_version(week_start)
+            self.cursor.execute(
+                "SELECT DISTINCT recipe_id FROM WeekMenu WHERE week_start = ? AND version = ?",
+                (week_start, version),
+            )
+            recipe_ids = [row[0] for row in self.cursor.fetchall()]
+            self.cursor.execute(
+                "DELETE FROM WeekMenu WHERE week_start = ? AND version = ?", (week_start, version)
+            )
+            if recipe_ids:
+                self._refresh_recency(recipe_ids)
             self.conn.commit()
-            logger.info("WeekMenu table cleared successfully.")
+            logger.info("Week menu version cleared successfully.")
         except sqlite3.Error as e:
-            logger.error(f"Failed to clear WeekMenu table: {str(e)}")
+            logger.error(f"Failed to clear week menu: {str(e)}")
             self.conn.rollback()
             raise
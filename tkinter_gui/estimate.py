@@ -0,0 +1,158 @@
+"""
+CuisineCraft Price Estimation Module
+Nearest-neighbour price estimates for ingredients without a linked receipt price.
+
+Distinct receipt item names are turned into TF-IDF vectors over character
+trigrams, which tolerate plurals, brand prefixes and typos ("tomaat" vs
+"AH tomaten"). All missing ingredients of a shopping list are scored against
+every receipt name in one sparse product (a single ``np.bincount``), and the
+price is the similarity-weighted mean of the k best matches. Estimates are
+cached per ingredient until the receipts change.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from tkinter_gui.logger import logger
+from tkinter_gui.utils import normalize_key
+
+NGRAM_SIZE = 3
+# Upper bound on the queries x receipt names score matrix of one batch
+MAX_BATCH_CELLS = 4_000_000
+
+
+@dataclass
+class PriceEstimate:
+    """Predicted price of an ingredient and the receipt names it is based on"""
+    price: float
+    similarity: float  # best cosine similarity, a rough confidence
+    neighbours: List[str]
+
+
+def char_ngrams(text: str, size: int = NGRAM_SIZE) -> Set[str]:
+    """Character n-grams of a normalized name, padded so word edges count"""
+    padded = f" {text} "
+    return {padded[i:i + size] for i in range(max(len(padded) - size + 1, 1))}
+
+
+class PriceEstimator:
+    """k-nearest-neighbour regression over receipt item names"""
+
+    def __init__(self, k: int = 5, min_similarity: float = 0.35):
+        self.k = k
+        self.min_similarity = min_similarity
+        self.version = None
+        self._names: List[str] = []
+        self._prices = np.empty(0)
+        self._columns: Dict[str, int] = {}
+        self._idf = np.empty(0)
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.empty(0, dtype=np.int64)
+        self._weights = np.empty(0)
+        self._cache: Dict[str, Optional[PriceEstimate]] = {}
+
+    def refresh(self, db) -> None:
+        """Refit on the receipt history if it changed since the last fit"""
+        version = db.get_receipt_version()
+        if version != self.version:
+            self.fit(db.get_receipt_name_prices())
+            self.version = version
+
+    def fit(self, rows: Iterable[Tuple[str, float, int]]) -> None:
+        """Fit on (item_name, average price, purchase count) rows"""
+        totals: Dict[str, List[float]] = {}
+        for item_name, price, count in rows:
+            key = normalize_key(item_name)
+            if key and price is not None:
+                total = totals.setdefault(key, [0.0, 0])
+                total[0] += price * count
+                total[1] += count
+        self._names = list(totals)
+        self._prices = np.array([total / count for total, count in totals.values()])
+        self._cache.clear()
+
+        # Binary trigram matrix in CSC layout, then IDF weights and L2 row norms
+        self._columns = {}
+        row_parts, col_parts = [], []
+        for row, name in enumerate(self._names):
+            columns = [self._columns.setdefault(g, len(self._columns)) for g in char_ngrams(name)]
+            row_parts.append(np.full(len(columns), row, dtype=np.int64))
+            col_parts.append(np.array(columns, dtype=np.int64))
+        rows_array = np.concatenate(row_parts) if row_parts else np.empty(0, dtype=np.int64)
+        cols_array = np.concatenate(col_parts) if col_parts else np.empty(0, dtype=np.int64)
+
+        doc_freq = np.bincount(cols_array, minlength=len(self._columns))
+        self._idf = np.log((1 + len(self._names)) / (1 + doc_freq)) + 1.0
+        weights = self._idf[cols_array]
+        norms = np.sqrt(np.bincount(rows_array, weights=weights ** 2, minlength=len(self._names)))
+        weights = weights / np.where(norms > 0, norms, 1.0)[rows_array]
+
+        order = np.argsort(cols_array, kind="stable")
+        self._indices = rows_array[order]
+        self._weights = weights[order]
+        self._indptr = np.concatenate(([0], np.cumsum(doc_freq)))
+        logger.debug(f"Fitted price estimator on {len(self._names)} receipt names.")
+
+    def _query_postings(self, keys: Sequence[str]):
+        """Flattened (query, receipt row, weight product) postings of all queries"""
+        unseen_idf = np.log(1 + len(self._names)) + 1.0
+        query_ids, postings, query_weights = [], [], []
+        for query, key in enumerate(keys):
+            grams = char_ngrams(key)
+            columns = [self._columns[g] for g in grams if g in self._columns]
+            idf = self._idf[columns] if columns else np.empty(0)
+            # Unseen n-grams still lengthen the query vector
+            norm = np.sqrt((idf ** 2).sum() + (len(grams) - len(columns)) * unseen_idf ** 2)
+            for column, weight in zip(columns, idf / norm):
+                start, stop = self._indptr[column], self._indptr[column + 1]
+                postings.append(np.arange(start, stop))
+                query_ids.append(np.full(stop - start, query, dtype=np.int64))
+                query_weights.append(np.full(stop - start, weight))
+        if not postings:
+            return None
+        postings = np.concatenate(postings)
+        return (np.concatenate(query_ids), self._indices[postings],
+                self._weights[postings] * np.concatenate(query_weights))
+
+    def _predict(self, keys: Sequence[str]) -> List[Optional[PriceEstimate]]:
+        """Estimate prices for a batch of normalized names"""
+        n_names = len(self._names)
+        flat = self._query_postings(keys) if n_names else None
+        if flat is None:
+            return [None] * len(keys)
+        query_ids, rows, weights = flat
+        scores = np.bincount(query_ids * n_names + rows, weights=weights,
+                             minlength=len(keys) * n_names).reshape(len(keys), n_names)
+
+        k = min(self.k, n_names)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        usable = top_scores >= self.min_similarity
+        weight_sums = np.where(usable, top_scores, 0.0).sum(axis=1)
+        predicted = (np.where(usable, top_scores * self._prices[top], 0.0).sum(axis=1)
+                     / np.where(weight_sums > 0, weight_sums, 1.0))
+
+        estimates: List[Optional[PriceEstimate]] = []
+        for query in range(len(keys)):
+            if weight_sums[query] <= 0:
+                estimates.append(None)
+                continue
+            ranked = sorted(zip(top_scores[query], top[query]), reverse=True)
+            estimates.append(PriceEstimate(
+                price=float(predicted[query]),
+                similarity=float(ranked[0][0]),
+                neighbours=[self._names[row] for score, row in ranked if score >= self.min_similarity],
+            ))
+        return estimates
+
+    def estimate(self, names: Iterable[str]) -> Dict[str, Optional[PriceEstimate]]:
+        """Estimates keyed by normalized name; uncached names are predicted in one batch"""
+        keys = list(dict.fromkeys(normalize_key(name) for name in names if name))
+        missing = [key for key in keys if key not in self._cache]
+        batch = max(1, MAX_BATCH_CELLS // max(len(self._names), 1))
+        for start in range(0, len(missing), batch):
+            chunk = missing[start:start + batch]
+            self._cache.update(zip(chunk, self._predict(chunk)))
+        return {key: self._cache[key] for key in keys}
@@ -269,14 +269,14 @@ Features:
         self.status_bar.set_status("Saving manual week menu...", show_progress=True)
         try:
             with self.db() as db:
-                db.clear_week_menu()
-                
-                saved_count = 0
-                for day, recipe_id in self.week_menu_recipe_ids.items():
-                    if recipe_id is not None:
-                        entry = WeekMenuEntry(day=day, recipe_id=recipe_id)
-                        db.insert_week_menu_entry(entry)
-                        saved_count += 1
+                # Saved as a new version of this week; earlier versions stay as history
+                entries = [
+                    WeekMenuEntry(day=day, recipe_id=recipe_id)
+                    for day, recipe_id in self.week_menu_recipe_ids.items()
+                    if recipe_id is not None
+                ]
+                db.insert_week_menus([entries])
+                saved_count = len(entries)
             
             self.status_bar.set_status(f"Saved {saved_count} recipes to manual week menu.")
             messagebox.showinfo("Success", f"Manual week menu saved successfully with {saved_count} entries!")
@@ -0,0 +1,200 @@
+"""
+CuisineCraft Facet Engine
+Precomputed bitmap indexes for faceted recipe filtering.
+
+Every recipe gets a fixed bit position; each facet value (a cuisine, a cooking
+time bucket, a health grade, a number of persons) owns a Python int whose set
+bits are the recipes carrying that value. Filter combinations and facet counts
+are then plain ``&``/``|`` and ``int.bit_count`` operations, which run in C over
+machine words instead of re-querying SQLite.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Facet names in display order
+FACETS: Tuple[str, ...] = ("cuisine", "time", "health", "persons")
+
+UNKNOWN_VALUE = "Unknown"
+
+# (label, lower bound, upper bound) in minutes, bounds inclusive
+COOKING_TIME_BUCKETS: List[Tuple[str, int, Optional[int]]] = [
+    ("≤ 15 min", 0, 15),
+    ("16-30 min", 16, 30),
+    ("31-60 min", 31, 60),
+    ("> 60 min", 61, None),
+]
+
+
+def _to_int(value) -> Optional[int]:
+    """Convert a database value to int, returning None for missing or invalid data"""
+    try:
+        if value is None or value != value:  # None or NaN
+            return None
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def cooking_time_bucket(cooking_time) -> str:
+    """Map a cooking time in minutes to its facet bucket label"""
+    minutes = _to_int(cooking_time)
+    if minutes is None or minutes <= 0:
+        return UNKNOWN_VALUE
+    for label, low, high in COOKING_TIME_BUCKETS:
+        if minutes >= low and (high is None or minutes <= high):
+            return label
+    return UNKNOWN_VALUE
+
+
+def facet_values(cuisine, cooking_time, health_grade, persons) -> Dict[str, str]:
+    """Compute the facet value labels for one recipe"""
+    cuisine_label = str(cuisine).strip() if cuisine and cuisine == cuisine else ""
+    health = _to_int(health_grade)
+    person_count = _to_int(persons)
+    return {
+        "cuisine": cuisine_label or UNKNOWN_VALUE,
+        "time": cooking_time_bucket(cooking_time),
+        "health": str(health) if health else UNKNOWN_VALUE,
+        "persons": str(person_count) if person_count else UNKNOWN_VALUE,
+    }
+
+
+class FacetEngine:
+    """Bitmap-backed facet index over recipe IDs"""
+
+    def __init__(self):
+        self._ids: List[Optional[int]] = []  # bit position -> recipe ID
+        self._positions: Dict[int, int] = {}  # recipe ID -> bit position
+        self._bitmaps: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self._all = 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "FacetEngine":
+        """
+        Build the index in one pass from (ID, keuken_origine, bereidingstijd,
+        gezondheidsgraad, aantal_personen) rows.
+        """
+        engine = cls()
+        positions: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+        for recipe_id, cuisine, cooking_time, health_grade, persons in rows:
+            recipe_id = int(recipe_id)
+            if recipe_id in engine._positions:
+                continue
+            position = len(engine._ids)
+            engine._ids.append(recipe_id)
+            engine._positions[recipe_id] = position
+            values = facet_values(cuisine, cooking_time, health_grade, persons)
+            for facet, value in values.items():
+                positions[facet].setdefault(value, []).append(position)
+
+        # Setting bits one by one on a growing int is quadratic, so every
+        # bitmap is assembled in a bytearray and converted once.
+        for facet, by_value in positions.items():
+            for value, value_positions in by_value.items():
+                engine._bitmaps[facet][value] = engine._positions_to_bitmap(value_positions)
+        engine._all = engine._positions_to_bitmap(range(len(engine._ids)))
+        return engine
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _positions_to_bitmap(self, positions: Iterable[int]) -> int:
+        """Pack bit positions into an int bitmap"""
+        buffer = bytearray((len(self._ids) + 7) // 8)
+        for position in positions:
+            buffer[position >> 3] |= 1 << (position & 7)
+        return int.from_bytes(buffer, "little")
+
+    def add_recipe(self, recipe_id: int, cuisine, cooking_time, health_grade, persons) -> None:
+        """Add or update a single recipe in the index"""
+        if recipe_id in self._positions:
+            self.remove_recipe(recipe_id)
+        position = len(self._ids)
+        self._ids.append(recipe_id)
+        self._positions[recipe_id] = position
+        bit = 1 << position
+        self._all |= bit
+        for facet, value in facet_values(cuisine, cooking_time, health_grade, persons).items():
+            self._bitmaps[facet][value] = self._bitmaps[facet].get(value, 0) | bit
+
+    def remove_recipe(self, recipe_id: int) -> None:
+        """Remove a recipe from the index, leaving its bit position unused"""
+        position = self._positions.pop(recipe_id, None)
+        if position is None:
+            return
+        self._ids[position] = None
+        mask = ~(1 << position)
+        self._all &= mask
+        for by_value in self._bitmaps.values():
+            for value in [v for v, bm in by_value.items() if bm >> position & 1]:
+                by_value[value] &= mask
+                if not by_value[value]:
+                    del by_value[value]
+
+    def values(self, facet: str) -> List[str]:
+        """Sorted values of a facet, with the unknown bucket last"""
+        if facet == "time":
+            order = [label for label, _, _ in COOKING_TIME_BUCKETS] + [UNKNOWN_VALUE]
+            return [label for label in order if label in self._bitmaps[facet]]
+        known = [v for v in self._bitmaps[facet] if v != UNKNOWN_VALUE]
+        if facet in ("health", "persons"):
+            known.sort(key=int)
+        else:
+            known.sort(key=str.lower)
+        if UNKNOWN_VALUE in self._bitmaps[facet]:
+            known.append(UNKNOWN_VALUE)
+        return known
+
+    def bitmap_for_ids(self, recipe_ids: Iterable[int]) -> int:
+        """Convert a collection of recipe IDs (e.g. text search hits) into a bitmap"""
+        return self._positions_to_bitmap(
+            self._positions[recipe_id]
+            for recipe_id in map(int, recipe_ids)
+            if recipe_id in self._positions
+        )
+
+    def _facet_mask(self, facet: str, selected: Set[str]) -> int:
+        """OR of the bitmaps of the selected values within one facet"""
+        mask = 0
+        for value in selected:
+            mask |= self._bitmaps[facet].get(value, 0)
+        return mask
+
+    def filter(self, selections: Dict[str, Set[str]], base: Optional[int] = None,
+               skip_facet: Optional[str] = None) -> int:
+        """
+        Bitmap of recipes matching all selections.
+        Values within a facet are OR-ed, facets are AND-ed, and the optional
+        base bitmap (text search hits) restricts the result further.
+        """
+        result = self._all if base is None else self._all & base
+        for facet, selected in selections.items():
+            if facet == skip_facet or not selected:
+                continue
+            result &= self._facet_mask(facet, selected)
+        return result
+
+    def counts(self, selections: Dict[str, Set[str]],
+               base: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Live facet counts. Each facet is counted against the other facets'
+        selections so that alternative values stay visible while one is selected.
+        """
+        result = {}
+        for facet in FACETS:
+            mask = self.filter(selections, base, skip_facet=facet)
+            result[facet] = {
+                value: (mask & bitmap).bit_count()
+                for value, bitmap in self._bitmaps[facet].items()
+            }
+        return result
+
+    def ids(self, bitmap: int) -> List[int]:
+        """Recipe IDs for the set bits of a bitmap, in insertion order"""
+        bits = bin(bitmap)[:1:-1]  # least significant bit first, '0b' stripped
+        recipe_ids = []
+        position = bits.find("1")
+        while position != -1:
+            recipe_ids.append(self._ids[position])
+            position = bits.find("1", position + 1)
+        return recipe_ids
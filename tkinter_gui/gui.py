@@ -1,27 +1,53 @@
 """
 CuisineCraft Main GUI Module
 Refactored from CuisineCraft_Modern.py with modular structure
+
+pandas and the numpy-backed modules (similarity, basket, budget, estimate)
+are imported where they are first needed, so the window can appear before
+they have loaded.
 """
 
+from __future__ import annotations
+
 from tkinter_gui.models import Recipe, WeekMenuEntry
 from tkinter_gui.db import DatabaseHandler
 from tkinter_gui.theme import ModernTheme, ToolTip, StatusBar
 from tkinter_gui.widgets.modern_entry import ModernEntry
 from tkinter_gui.widgets.ingredient_entry import ModernIngredientEntry
-from tkinter_gui.utils import parse_cooking_time, export_to_text, export_to_csv
+from tkinter_gui.widgets.virtual_list import LazyRows, VirtualListbox
+from tkinter_gui.utils import parse_cooking_time, export_to_text, export_to_csv, normalize_key
+from tkinter_gui.facets import FacetEngine
+from tkinter_gui.pantry import PantryIndex
+from tkinter_gui.search import SearchScheduler
+from tkinter_gui.workers import ChangeLog, Job, JobExecutor
+from tkinter_gui.analytics import PriceAnalytics, PERIOD_DAILY, PERIOD_WEEKLY
+from tkinter_gui.shopping import ShoppingList
+from tkinter_gui.listdiff import apply_ops, diff_keys, merge_keys
+from tkinter_gui.sampling import WEIGHT_MODES, WEIGHT_UNIFORM, WeightedSampler, recipe_weight
+from tkinter_gui.config import RECENT_MENU_DAYS, ensure_export_dir
+from tkinter_gui.planner import (
+    DAYS, MenuPlanner, MenuConstraints, next_monday, plan_weeks, week_start
+)
 import tkinter as tk
-import pandas as pd
 from tkinter_gui.logger import logger
-from tkinter import ttk, messagebox, filedialog
-from typing import List, Optional
+from tkinter import ttk, messagebox, filedialog, simpledialog
+from typing import TYPE_CHECKING, Dict, List, Optional
 from pathlib import Path
-from dotenv import load_dotenv
+import re
+import datetime
+import time
 # Removed requests, BeautifulSoup, urlparse as they are now in importers.py
 
-load_dotenv()  # Load environment variables from .env file
+if TYPE_CHECKING:
+    import pandas as pd
+    from tkinter_gui.estimate import PriceEstimator
+    from tkinter_gui.similarity import SimilarityIndex
 
 
 class CuisineCraftModernGUI:
+
+    TAB_PREBUILD_DELAY_MS = 300  # let the first paint happen before prebuilding tabs
+
     def __init__(self, root):
         self.root = root
         self.db = DatabaseHandler()
@@ -56,18 +82,192 @@ class CuisineCraftModernGUI:
 
         # Initialize list to hold comboboxes for manual week menu
         self.manual_week_menu_recipe_combos = {}
+        self.all_recipes_for_manual_menu = {}  # recipe ID -> name
+
+        # Facet index over the recipe list, rebuilt on refresh
+        self.facet_engine = FacetEngine()
+        self.recipe_index_changes = ChangeLog()  # saves made while a refresh runs
+        self.facet_combos = {}
+        self.facet_combo_values = {}  # facet -> value behind each combobox entry
+        self.recipe_labels = {}  # recipe ID -> listbox label
+        self.shown_recipe_ids: List[int] = []  # keys of the recipe list rows
+        self._search_bitmap: Optional[int] = None
+
+        # Recipe comboboxes share one "ID - name" value list, newest first
+        self.combo_recipe_ids: List[int] = []
+        self.combo_recipe_names = {}
+        self.combo_recipe_values: List[str] = []
+
+        # Ingredient -> recipe index for pantry matching, built on first use
+        self.pantry_index: Optional[PantryIndex] = None
+        self.pantry_index_changes = ChangeLog()
+
+        # TF-IDF recipe vectors with cached neighbours, built on first use
+        self.similarity_index: Optional[SimilarityIndex] = None
+
+        # Nearest-neighbour prices for ingredients without a receipt match
+        self._price_estimator: Optional[PriceEstimator] = None
+
+        # Manual week menu shopping list, patched row by row on day edits
+        self.manual_shopping_list = ShoppingList()
+        self.manual_shopping_iids = {}  # shopping line -> Treeview item
+
+        # Week shown in the manual menu tab and its loaded version (0 = unsaved)
+        self.manual_week_start = week_start()
+        self.manual_week_version = 0
+        self.week_navigator_var = tk.StringVar()
+
+        # Alias-table samplers per weighting mode, updated as ratings and menus change
+        self.recipe_samplers = {}
+
+        # Slow handlers run here; results come back on the Tk thread
+        self.jobs = JobExecutor(self.root)
+        self._status_jobs: Dict[Job, str] = {}  # running jobs shown in the status bar, oldest first
+        self._recipe_list_job: Optional[Job] = None
+
+        # Background search with adaptive debounce and stale-result discard
+        self._last_search_term = ""
+        self.recipe_search = SearchScheduler(
+            self.jobs,
+            self.query_recipes,
+            self.on_recipe_search_result,
+            self.on_recipe_search_error,
+        )
+        self.manual_menu_search = SearchScheduler(
+            self.jobs,
+            self.query_recipes,
+            self.show_manual_menu_recipes,
+            self.on_manual_menu_search_error,
+        )
 
-        # Initialize tabs
-        self.setup_recipe_list_tab()
-        self.setup_week_menu_tab()  # This is the random generator tab
-        self.setup_manual_week_menu_tab()  # New tab for manual selection
-        self.setup_recipe_tab()
-        self.setup_ingredients_tab()
-        self.setup_import_recipe_tab()  # New tab for importing recipes
+        # Tabs are built on first selection; the others are prebuilt while idle
+        self.tab_builders = {
+            str(self.tab_recipes): self.setup_recipe_list_tab,
+            str(self.tab_week_menu): self.setup_week_menu_tab,  # Random generator
+            str(self.tab_manual_week_menu): self.setup_manual_week_menu_tab,
+            str(self.tab_add_recipe): self.setup_recipe_tab,
+            str(self.tab_ingredients): self.setup_ingredients_tab,
+            str(self.tab_import_recipe): self.setup_import_recipe_tab,
+            str(self.tab_pantry): self.setup_pantry_tab,
+        }
+        self.built_tabs = set()
+        self.ensure_tab(self.tab_recipes)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.root.after(self.TAB_PREBUILD_DELAY_MS, self.prebuild_next_tab)
 
         # Load initial data
         self.refresh_recipe_list()
 
+    def is_tab_built(self, tab) -> bool:
+        return str(tab) in self.built_tabs
+
+    def ensure_tab(self, tab):
+        """Build a tab's widgets and load its data if that has not happened yet"""
+        name = str(tab)
+        if name in self.built_tabs:
+            return
+        self.built_tabs.add(name)
+        started = time.perf_counter()
+        self.tab_builders[name]()
+        logger.debug(
+            f"Built tab {self.notebook.tab(name, 'text')} in "
+            f"{(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+    def on_tab_changed(self, event=None):
+        """Build the selected tab on first selection"""
+        self.ensure_tab(self.notebook.select())
+
+    def prebuild_next_tab(self):
+        """Build one unbuilt tab per idle slot, starting after the selected tab"""
+        tabs = list(self.notebook.tabs())
+        if not tabs:
+            return
+        current = tabs.index(self.notebook.select()) if self.notebook.select() in tabs else 0
+        for offset in range(1, len(tabs) + 1):
+            tab = tabs[(current + offset) % len(tabs)]
+            if tab not in self.built_tabs:
+                self.ensure_tab(tab)
+                self.root.after_idle(self.prebuild_next_tab)
+                return
+
+    def with_tab(self, tab, handler):
+        """Run a handler whose widgets live on a tab that may not be built yet"""
+        self.ensure_tab(tab)
+        return handler()
+
+    def run_in_background(self, status: str, fn, *args, on_result=None, on_error=None,
+                          error_message: str = "Task failed", replaces: Optional[Job] = None,
+                          **kwargs) -> Job:
+        """
+        Run fn(context, *args) on the job executor, showing status and progress
+        in the status bar. on_result runs on the Tk thread; failures are shown
+        in an error dialog unless on_error handles them. A job passed as replaces
+        is cancelled and no longer reports to the status bar.
+        """
+        if replaces is not None:
+            self._status_jobs.pop(replaces, None)
+            replaces.cancel()
+        self.status_bar.set_status(status, show_progress=True)
+
+        def release() -> bool:
+            """Hand the status bar to the newest job still running, True if none is"""
+            del self._status_jobs[job]
+            if self._status_jobs:
+                self.status_bar.set_status(
+                    next(reversed(self._status_jobs.values())), show_progress=True
+                )
+                return False
+            return True
+
+        def report(error: Exception, show_status: bool):
+            if show_status:
+                self.status_bar.set_status(f"{error_message}: {str(error)}")
+            if on_error:
+                on_error(error)
+            else:
+                messagebox.showerror("Error", f"{error_message}: {str(error)}")
+
+        def failed(error: Exception):
+            if job in self._status_jobs:  # superseded jobs were already logged by the executor
+                report(error, show_status=release())
+
+        def finished(result):
+            if job in self._status_jobs and release():
+                self.status_bar.set_status("Ready")
+            if on_result:
+                try:
+                    on_result(result)
+                except Exception as e:
+                    logger.error(f"{error_message}: {str(e)}")
+                    report(e, show_status=not self._status_jobs)
+
+        def progress(done, total, message):
+            if job in self._status_jobs:
+                self.status_bar.set_progress(done, total, message or status)
+
+        def cancelled():
+            # A superseded job stays quiet; the job replacing it owns the status
+            if job in self._status_jobs and release():
+                self.status_bar.set_status("Cancelled")
+
+        job = self.jobs.submit(
+            fn, *args,
+            on_result=finished,
+            on_error=failed,
+            on_progress=progress,
+            on_cancelled=cancelled,
+            **kwargs,
+        )
+        self._status_jobs[job] = status
+        return job
+
+    def cancel_background_jobs(self):
+        """Cancel all running background jobs (Escape)"""
+        if self.jobs.busy:
+            self.jobs.cancel_all()
+            self.status_bar.set_status("Cancelled")
+
     def setup_header(self):
         """Create modern header with title and branding"""
         header_frame = ttk.Frame(self.main_frame, style="Modern.TFrame")
@@ -114,6 +314,7 @@ class CuisineCraftModernGUI:
         self.tab_import_recipe = ttk.Frame(
             self.notebook, style="Modern.TFrame"
         )  # New tab frame
+        self.tab_pantry = ttk.Frame(self.notebook, style="Modern.TFrame")
 
         # Add tabs with modern styling
         self.notebook.add(self.tab_recipes, text="📋 Recipe List")
@@ -124,6 +325,7 @@ class CuisineCraftModernGUI:
         self.notebook.add(self.tab_add_recipe, text="➕ Add Recipe")
         self.notebook.add(self.tab_ingredients, text="🥕 Add Ingredients")
         self.notebook.add(self.tab_import_recipe, text="🔗 Import Recipe")  # New tab
+        self.notebook.add(self.tab_pantry, text="🧺 What Can I Cook")
 
     def setup_recipe_list_tab(self):
         """Modern recipe list with search and filters"""
@@ -151,6 +353,36 @@ class CuisineCraftModernGUI:
         # Bind search to real-time filtering
         self.search_entry.entry.bind("<KeyRelease>", self.on_search_change)
 
+        # Facet filters with live counts
+        filter_frame = ttk.Frame(search_frame, style="Card.TFrame")
+        filter_frame.pack(fill="x", pady=(8, 0))
+
+        facet_labels = [
+            ("cuisine", "Cuisine"),
+            ("time", "Cooking Time"),
+            ("health", "Health Grade"),
+            ("persons", "Persons"),
+        ]
+        for facet, label in facet_labels:
+            ttk.Label(filter_frame, text=f"{label}:", style="Card.TLabel").pack(
+                side="left", padx=(0, 4)
+            )
+            combo = ttk.Combobox(filter_frame, state="readonly", width=14, values=["All"])
+            combo.current(0)
+            combo.pack(side="left", padx=(0, 12))
+            combo.bind("<<ComboboxSelected>>", self.on_facet_change)
+            self.facet_combos[facet] = combo
+            self.facet_combo_values[facet] = [None]
+
+        clear_filters_btn = ttk.Button(
+            filter_frame,
+            text="Clear Filters",
+            style="Secondary.TButton",
+            command=self.clear_facet_filters,
+        )
+        clear_filters_btn.pack(side="right")
+        ToolTip(clear_filters_btn, "Show recipes of all cuisines, times and grades")
+
         # Recipe list frame
         list_frame = ttk.Frame(self.tab_recipes, style="Card.TFrame")
         list_frame.pack(fill="both", expand=True)
@@ -165,11 +397,11 @@ class CuisineCraftModernGUI:
         )
         list_header.pack(anchor="w", pady=(0, 8))
 
-        # Listbox with modern styling
+        # Virtual listbox: only the visible rows are drawn, whatever the library size
         listbox_frame = ttk.Frame(list_frame, style="Card.TFrame")
         listbox_frame.pack(fill="both", expand=True, pady=(0, 12))
 
-        self.recipe_listbox = tk.Listbox(
+        self.recipe_listbox = VirtualListbox(
             listbox_frame,
             font=ModernTheme.FONTS["body"],
             bg=ModernTheme.COLORS["surface"],
@@ -187,6 +419,15 @@ class CuisineCraftModernGUI:
         scrollbar.config(command=self.recipe_listbox.yview)
         self.recipe_listbox.pack(fill="both", expand=True)
 
+        # Recommendations for the selected recipe
+        self.similar_recipes_listbox = self.create_similar_recipes_list(list_frame)
+        self.recipe_listbox.bind(
+            "<<ListboxSelect>>",
+            lambda event: self.show_similar_recipes(
+                self.recipe_listbox, self.similar_recipes_listbox
+            ),
+        )
+
         # Action buttons
         button_frame = ttk.Frame(list_frame, style="Card.TFrame")
         button_frame.pack(fill="x")
@@ -209,6 +450,39 @@ class CuisineCraftModernGUI:
         search_btn.pack(side="left")
         ToolTip(search_btn, "Search recipes by name, cuisine, or ingredient")
 
+        rate_btn = ttk.Button(
+            button_frame,
+            text="⭐ Rate",
+            style="Secondary.TButton",
+            command=self.rate_selected_recipe,
+        )
+        rate_btn.pack(side="left", padx=(8, 0))
+        ToolTip(rate_btn, "Rate the selected recipe (1-5); favourites come up more often in weighted menus")
+
+    def create_similar_recipes_list(self, parent) -> tk.Listbox:
+        """Create the small "similar recipes" panel shown below a recipe list"""
+        similar_label = ttk.Label(
+            parent,
+            text="Similar Recipes",
+            style="Card.TLabel",
+            font=ModernTheme.FONTS["subheading"],
+        )
+        similar_label.pack(anchor="w", pady=(0, 8))
+
+        similar_listbox = tk.Listbox(
+            parent,
+            font=ModernTheme.FONTS["body"],
+            bg=ModernTheme.COLORS["surface"],
+            fg=ModernTheme.COLORS["text_primary"],
+            selectbackground=ModernTheme.COLORS["primary_light"],
+            borderwidth=0,
+            highlightthickness=0,
+            activestyle="none",
+            height=5,
+        )
+        similar_listbox.pack(fill="x", pady=(0, 12))
+        return similar_listbox
+
     def setup_week_menu_tab(self):
         """Modern week menu generator with enhanced UI"""
         self.tab_week_menu.configure(padding=16)
@@ -239,6 +513,33 @@ class CuisineCraftModernGUI:
         generate_btn.pack(side="left", padx=(0, 8))
         ToolTip(generate_btn, "Generate a random 7-day menu (Ctrl+G)")
 
+        plan_btn = ttk.Button(
+            controls_frame,
+            text="🧩 Plan Menu...",
+            style="Secondary.TButton",
+            command=self.show_menu_planner_dialog,
+        )
+        plan_btn.pack(side="left", padx=(0, 8))
+        ToolTip(plan_btn, "Plan a menu with cooking time, health and variety constraints")
+
+        budget_btn = ttk.Button(
+            controls_frame,
+            text="💰 Budget Menu",
+            style="Secondary.TButton",
+            command=self.generate_budget_menu,
+        )
+        budget_btn.pack(side="left", padx=(0, 8))
+        ToolTip(budget_btn, "Pick 7 recipes that share ingredients and cost the least to shop for")
+
+        plan_weeks_btn = ttk.Button(
+            controls_frame,
+            text="📆 Plan Weeks...",
+            style="Secondary.TButton",
+            command=self.show_multi_week_dialog,
+        )
+        plan_weeks_btn.pack(side="left", padx=(0, 8))
+        ToolTip(plan_weeks_btn, "Generate and save several consecutive week menus without repeats")
+
         export_btn = ttk.Button(
             controls_frame,
             text="📤 Export Menu",
@@ -257,6 +558,39 @@ class CuisineCraftModernGUI:
         remove_selected_btn.pack(side="left", padx=(8, 0))
         ToolTip(remove_selected_btn, "Remove selected recipes from the week menu")
 
+        split_btn = ttk.Button(
+            controls_frame,
+            text="🛒 Split Across Shops",
+            style="Secondary.TButton",
+            command=self.optimize_shopping_basket,
+        )
+        split_btn.pack(side="left", padx=(8, 0))
+        ToolTip(split_btn, "Find the cheapest way to buy the shopping list at a limited number of shops")
+
+        ttk.Label(controls_frame, text="Max shops:", style="Card.TLabel").pack(
+            side="left", padx=(8, 4)
+        )
+        self.max_shops_var = tk.IntVar(value=2)
+        ttk.Spinbox(
+            controls_frame, from_=1, to=10, width=4, textvariable=self.max_shops_var
+        ).pack(side="left")
+
+        options_frame = ttk.Frame(generator_frame, style="Card.TFrame")
+        options_frame.pack(fill="x", pady=(0, 12))
+        ttk.Label(options_frame, text="Weighting:", style="Card.TLabel").pack(
+            side="left", padx=(0, 4)
+        )
+        self.weighting_mode_var = tk.StringVar(value=WEIGHT_UNIFORM)
+        weighting_combo = ttk.Combobox(
+            options_frame,
+            textvariable=self.weighting_mode_var,
+            values=list(WEIGHT_MODES),
+            state="readonly",
+            width=28,
+        )
+        weighting_combo.pack(side="left")
+        ToolTip(weighting_combo, "How Generate Week Menu picks recipes")
+
         # Week menu display
         menu_frame = ttk.Frame(self.tab_week_menu, style="Card.TFrame")
         menu_frame.pack(fill="x", pady=(0, 16))
@@ -324,6 +658,11 @@ class CuisineCraftModernGUI:
         tree_scrollbar.pack(side="right", fill="y")
         self.ingredients_tree.configure(yscrollcommand=tree_scrollbar.set)
         self.ingredients_tree.pack(fill="both", expand=True)
+        self.ingredients_tree.bind(
+            "<Double-1>", lambda e: self.show_price_history_for_tree(self.ingredients_tree)
+        )
+        self.ingredients_tree.tag_configure("shop", font=ModernTheme.FONTS["button"])
+        self.configure_shopping_tags(self.ingredients_tree)
 
     def setup_recipe_tab(self):
         """Modern recipe addition form"""
@@ -492,6 +831,60 @@ class CuisineCraftModernGUI:
             recipe_select_frame, state="readonly", width=50
         )
         self.recipe_combo.pack(fill="x")
+        self.recipe_combo.bind(
+            "<<ComboboxSelected>>", lambda event: self.refresh_component_list()
+        )
+
+        # Components: other recipes (stocks, sauces, doughs) used in this one
+        components_frame = ttk.Frame(scrollable_frame, style="Card.TFrame")
+        components_frame.pack(fill="x", pady=(16, 0))
+        components_frame.configure(padding=12)
+
+        ttk.Label(
+            components_frame,
+            text="Components (recipes used in the selected recipe)",
+            style="Card.TLabel",
+            font=ModernTheme.FONTS["subheading"],
+        ).pack(anchor="w", pady=(0, 8))
+
+        component_controls = ttk.Frame(components_frame, style="Card.TFrame")
+        component_controls.pack(fill="x", pady=(0, 8))
+        self.component_combo = ttk.Combobox(component_controls, state="readonly", width=40)
+        self.component_combo.pack(side="left", fill="x", expand=True, padx=(0, 8))
+        ttk.Label(component_controls, text="x", style="Card.TLabel").pack(side="left")
+        self.component_factor_var = tk.StringVar(value="1")
+        ttk.Entry(
+            component_controls, textvariable=self.component_factor_var, width=6
+        ).pack(side="left", padx=(4, 8))
+        add_component_btn = ttk.Button(
+            component_controls,
+            text="➕ Add Component",
+            style="Modern.TButton",
+            command=self.add_recipe_component,
+        )
+        add_component_btn.pack(side="left", padx=(0, 8))
+        ToolTip(add_component_btn, "Use this recipe, scaled by the factor, as part of the selected recipe")
+        remove_component_btn = ttk.Button(
+            component_controls,
+            text="➖ Remove",
+            style="Secondary.TButton",
+            command=self.remove_recipe_component,
+        )
+        remove_component_btn.pack(side="left")
+
+        self.component_listbox = tk.Listbox(
+            components_frame,
+            height=4,
+            font=ModernTheme.FONTS["body"],
+            bg=ModernTheme.COLORS["surface"],
+            fg=ModernTheme.COLORS["text_primary"],
+            selectbackground=ModernTheme.COLORS["primary_light"],
+            selectforeground=ModernTheme.COLORS["surface"],
+            borderwidth=0,
+            highlightthickness=0,
+            activestyle="none",
+        )
+        self.component_listbox.pack(fill="x")
         self.populate_recipe_combo()
 
         # Form buttons
@@ -559,18 +952,192 @@ class CuisineCraftModernGUI:
         )
         self.import_feedback_label.pack(side="left", padx=(8, 0))
 
+    def setup_pantry_tab(self):
+        """Setup the tab for finding recipes based on ingredients on hand."""
+        self.tab_pantry.configure(padding=16)
+
+        # Header
+        header_frame = ttk.Frame(self.tab_pantry, style="Modern.TFrame")
+        header_frame.pack(fill="x", pady=(0, 16))
+
+        form_header = ttk.Label(
+            header_frame, text="What Can I Cook?", style="Heading.TLabel"
+        )
+        form_header.pack(anchor="w")
+
+        # Pantry input
+        pantry_frame = ttk.Frame(self.tab_pantry, style="Card.TFrame")
+        pantry_frame.pack(fill="x", pady=(0, 12))
+        pantry_frame.configure(padding=12)
+
+        pantry_label = ttk.Label(
+            pantry_frame,
+            text="Ingredients on hand (one per line or comma-separated)",
+            style="Card.TLabel",
+            font=ModernTheme.FONTS["subheading"],
+        )
+        pantry_label.pack(anchor="w", pady=(0, 8))
+
+        self.pantry_text = tk.Text(
+            pantry_frame,
+            height=5,
+            font=ModernTheme.FONTS["body"],
+            bg=ModernTheme.COLORS["surface"],
+            fg=ModernTheme.COLORS["text_primary"],
+            borderwidth=1,
+            relief="solid",
+        )
+        self.pantry_text.pack(fill="x")
+
+        button_frame = ttk.Frame(pantry_frame, style="Card.TFrame")
+        button_frame.pack(fill="x", pady=(12, 0))
+
+        find_btn = ttk.Button(
+            button_frame,
+            text="🔍 Find Recipes",
+            style="Modern.TButton",
+            command=self.find_pantry_recipes,
+        )
+        find_btn.pack(side="left", padx=(0, 8))
+        ToolTip(find_btn, "Rank recipes by how many of their ingredients you have")
+
+        clear_btn = ttk.Button(
+            button_frame,
+            text="🗑️ Clear",
+            style="Secondary.TButton",
+            command=lambda: self.pantry_text.delete("1.0", tk.END),
+        )
+        clear_btn.pack(side="left")
+
+        # Results
+        results_frame = ttk.Frame(self.tab_pantry, style="Card.TFrame")
+        results_frame.pack(fill="both", expand=True)
+        results_frame.configure(padding=12)
+
+        results_label = ttk.Label(
+            results_frame,
+            text="Matching Recipes",
+            style="Card.TLabel",
+            font=ModernTheme.FONTS["subheading"],
+        )
+        results_label.pack(anchor="w", pady=(0, 8))
+
+        tree_frame = ttk.Frame(results_frame, style="Card.TFrame")
+        tree_frame.pack(fill="both", expand=True)
+
+        self.pantry_results_tree = ttk.Treeview(
+            tree_frame,
+            columns=("recipe", "coverage", "missing"),
+            show="headings",
+            style="Modern.Treeview",
+        )
+        self.pantry_results_tree.heading("recipe", text="Recipe")
+        self.pantry_results_tree.heading("coverage", text="Coverage")
+        self.pantry_results_tree.heading("missing", text="Missing Ingredients")
+
+        self.pantry_results_tree.column("recipe", width=220)
+        self.pantry_results_tree.column("coverage", width=90)
+        self.pantry_results_tree.column("missing", width=360)
+
+        tree_scrollbar = ttk.Scrollbar(
+            tree_frame, orient="vertical", command=self.pantry_results_tree.yview
+        )
+        tree_scrollbar.pack(side="right", fill="y")
+        self.pantry_results_tree.configure(yscrollcommand=tree_scrollbar.set)
+        self.pantry_results_tree.pack(fill="both", expand=True)
+
+    def find_pantry_recipes(self):
+        """Rank recipes by the fraction of their ingredients available in the pantry."""
+        raw_text = self.pantry_text.get("1.0", tk.END)
+        pantry = [item.strip() for item in re.split(r"[,\n]", raw_text) if item.strip()]
+
+        if not pantry:
+            messagebox.showwarning(
+                "Empty Pantry", "Please enter at least one ingredient you have on hand!"
+            )
+            return
+
+        if self.pantry_index is not None:
+            self.show_pantry_matches(pantry)
+            return
+
+        # The worker builds its own index; saves made meanwhile are replayed onto it
+        generation = self.pantry_index_changes.begin()
+
+        def work(context):
+            with DatabaseHandler() as db:
+                return PantryIndex.from_rows(db.get_recipe_ingredient_names())
+
+        def show(index):
+            changes = self.pantry_index_changes.finish(generation)
+            if changes is None:
+                return  # A newer build superseded this one and will show its matches
+            for recipe_id, ingredient_names in changes:
+                index.add_ingredients(recipe_id, ingredient_names)
+            self.pantry_index = index
+            self.show_pantry_matches(pantry)
+
+        self.run_in_background(
+            "Indexing pantry ingredients...", work,
+            on_result=show, error_message="Failed to match pantry ingredients",
+        )
+
+    def show_pantry_matches(self, pantry: List[str]):
+        """Match the pantry against the pantry index and list the best recipes."""
+        try:
+            matches = self.pantry_index.match(pantry)
+            with DatabaseHandler() as db:
+                recipe_names = db.get_recipe_names([m.recipe_id for m in matches])
+        except Exception as e:
+            logger.error(f"Failed to match pantry ingredients: {str(e)}")
+            messagebox.showerror("Error", f"Failed to match pantry ingredients: {str(e)}")
+            return
+
+        for item in self.pantry_results_tree.get_children():
+            self.pantry_results_tree.delete(item)
+
+        for match in matches:
+            self.pantry_results_tree.insert(
+                "",
+                "end",
+                values=(
+                    recipe_names.get(match.recipe_id, match.recipe_id),
+                    f"{match.coverage:.0%} ({match.matched}/{match.total})",
+                    ", ".join(match.missing),
+                ),
+            )
+
+        self.status_bar.set_status(f"Found {len(matches)} matching recipes")
+
     def import_recipe_from_url(self):
         """Fetch a recipe from a supported URL, parse, and add to the database."""
-        from tkinter_gui.importers import import_recipe_from_url as importer_func
+        url = self.url_entry.get().strip()
+        self.import_feedback_label.config(text="")
+
+        def work(context, url):
+            from tkinter_gui.importers import fetch_recipe_from_url
+
+            recipe = fetch_recipe_from_url(url)
+            context.check()
+            with DatabaseHandler() as db:
+                return db.insert_recipe(recipe), recipe
 
-        importer_func(
-            self.url_entry.get(),
-            self.status_bar,
-            self.import_feedback_label,
-            self.db,
-            self.refresh_recipe_list,
-            self.populate_recipe_combo,
-            self.url_entry.clear,
+        def imported(result):
+            recipe_id, recipe = result
+            self.import_feedback_label.config(text="Recipe imported successfully!")
+            self.status_bar.set_status("Recipe imported successfully!")
+            with DatabaseHandler() as db:
+                self.update_recipe_weights(db, [recipe_id])
+            messagebox.showinfo("Success", "Recipe imported and added to database.")
+            self.show_saved_recipe(recipe_id, recipe)
+            self.url_entry.clear()
+
+        def failed(error):
+            self.import_feedback_label.config(text=f"Import failed: {str(error)}")
+
+        self.run_in_background(
+            "Importing recipe...", work, url,
+            on_result=imported, on_error=failed, error_message="Error importing recipe",
         )
 
     def add_ingredient_entry(self):
@@ -604,6 +1171,10 @@ class CuisineCraftModernGUI:
         tools_menu.add_command(label="Refresh All", command=self.refresh_all)
         tools_menu.add_separator()
         tools_menu.add_command(label="Clear Search", command=self.clear_search)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Receipt Price Links...", command=self.show_receipt_links_dialog)
+        tools_menu.add_command(label="Rebuild Price Links", command=self.rebuild_price_links)
+        tools_menu.add_command(label="Price History...", command=self.show_price_history_dialog)
 
     def show_shortcuts(self):
         """Show keyboard shortcuts dialog"""
@@ -646,14 +1217,229 @@ Features:
     def refresh_all(self):
         """Refresh all data"""
         self.refresh_recipe_list()
-        self.populate_recipe_combo()
+        if self.is_tab_built(self.tab_ingredients):
+            self.populate_recipe_combo()
         self.status_bar.set_status("All data refreshed")
 
     def clear_search(self):
         """Clear search and show all recipes"""
         self.search_entry.clear()
+        self._last_search_term = ""
         self.refresh_recipe_list()
 
+    def rebuild_price_links(self):
+        """Recompute the automatic receipt-to-ingredient links of all receipts"""
+
+        def work(context):
+            with DatabaseHandler() as db:
+                return db.backfill_receipt_links(progress=context.progress)
+
+        def done(count):
+            self.reprice_manual_shopping_list()
+            self.status_bar.set_status(f"Rebuilt {count} price links")
+            messagebox.showinfo("Price Links", f"Stored {count} receipt-to-ingredient links.")
+
+        self.run_in_background(
+            "Rebuilding price links...", work,
+            on_result=done, error_message="Failed to rebuild price links",
+        )
+
+    def show_receipt_links_dialog(self):
+        """Dialog to review and override which ingredient a receipt item is linked to"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Receipt Price Links")
+        dialog.geometry("900x500")
+        dialog.transient(self.root)
+
+        frame = ttk.Frame(dialog, style="Card.TFrame", padding=15)
+        frame.pack(fill="both", expand=True)
+
+        columns = ("Item", "Price", "Shop", "Date", "Ingredients", "Manual")
+        tree = ttk.Treeview(frame, columns=columns, show="headings", height=15)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=90 if col in ("Price", "Date", "Manual") else 180)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+
+        controls = ttk.Frame(frame, style="Card.TFrame")
+        controls.pack(side="bottom", fill="x", pady=(10, 0))
+        tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        ttk.Label(controls, text="Ingredient:", style="Card.TLabel").pack(side="left")
+        ingredient_var = tk.StringVar()
+        ingredient_combo = ttk.Combobox(controls, textvariable=ingredient_var, width=30)
+        ingredient_combo.pack(side="left", padx=(5, 10))
+
+        def load_items():
+            with DatabaseHandler() as db:
+                rows = db.get_receipt_items_with_links()
+                ingredient_combo["values"] = db.get_ingredient_keys()
+            tree.delete(*tree.get_children())
+            for item_id, name, price, shop, price_date, keys, is_manual in rows:
+                tree.insert(
+                    "",
+                    "end",
+                    iid=str(item_id),
+                    values=(
+                        name,
+                        f"{price:.2f}" if price is not None else "",
+                        shop or "",
+                        price_date or "",
+                        keys or "",
+                        "Yes" if is_manual else "",
+                    ),
+                )
+
+        def apply(action):
+            selection = tree.selection()
+            if not selection:
+                messagebox.showwarning("No Selection", "Please select a receipt item.", parent=dialog)
+                return
+            try:
+                with DatabaseHandler() as db:
+                    for iid in selection:
+                        action(db, int(iid))
+                load_items()
+                self.reprice_manual_shopping_list()
+            except Exception as e:
+                logger.error(f"Failed to update receipt links: {str(e)}")
+                messagebox.showerror("Error", f"Failed to update receipt links: {str(e)}", parent=dialog)
+
+        def link_selected():
+            name = ingredient_var.get().strip()
+            if not name:
+                messagebox.showwarning("No Ingredient", "Please choose an ingredient.", parent=dialog)
+                return
+            apply(lambda db, item_id: db.set_receipt_item_link(item_id, name))
+
+        ttk.Button(controls, text="Link", style="Modern.TButton",
+                   command=link_selected).pack(side="left", padx=(0, 5))
+        ttk.Button(controls, text="No Match", style="Secondary.TButton",
+                   command=lambda: apply(lambda db, item_id: db.set_receipt_item_link(item_id, None))
+                   ).pack(side="left", padx=(0, 5))
+        ttk.Button(controls, text="Reset", style="Secondary.TButton",
+                   command=lambda: apply(lambda db, item_id: db.reset_receipt_item_link(item_id))
+                   ).pack(side="left")
+
+        try:
+            load_items()
+        except Exception as e:
+            logger.error(f"Failed to load receipt links: {str(e)}")
+            messagebox.showerror("Error", f"Failed to load receipt links: {str(e)}", parent=dialog)
+
+    def show_price_history_for_tree(self, tree):
+        """Open the price history of the ingredient in the selected shopping list row"""
+        selection = tree.selection()
+        if selection and not tree.get_children(selection[0]):  # skip shop rows
+            self.show_price_history_dialog(tree.item(selection[0], "values")[0])
+
+    def show_price_history_dialog(self, ingredient: Optional[str] = None):
+        """Dialog with price trend, window statistics and cheapest shops of an ingredient"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Price History")
+        dialog.geometry("820x560")
+        dialog.transient(self.root)
+
+        frame = ttk.Frame(dialog, style="Card.TFrame", padding=15)
+        frame.pack(fill="both", expand=True)
+
+        controls = ttk.Frame(frame, style="Card.TFrame")
+        controls.pack(fill="x", pady=(0, 10))
+
+        windows = {"Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All history": None}
+        periods = {"Weekly": PERIOD_WEEKLY, "Daily": PERIOD_DAILY}
+
+        ttk.Label(controls, text="Ingredient:", style="Card.TLabel").pack(side="left")
+        ingredient_var = tk.StringVar(value=normalize_key(ingredient) if ingredient else "")
+        ingredient_combo = ttk.Combobox(controls, textvariable=ingredient_var, width=28)
+        ingredient_combo.pack(side="left", padx=(5, 10))
+
+        ttk.Label(controls, text="Window:", style="Card.TLabel").pack(side="left")
+        window_var = tk.StringVar(value="Last 90 days")
+        window_combo = ttk.Combobox(controls, textvariable=window_var, values=list(windows),
+                                    state="readonly", width=14)
+        window_combo.pack(side="left", padx=(5, 10))
+
+        ttk.Label(controls, text="Period:", style="Card.TLabel").pack(side="left")
+        period_var = tk.StringVar(value="Weekly")
+        period_combo = ttk.Combobox(controls, textvariable=period_var, values=list(periods),
+                                    state="readonly", width=8)
+        period_combo.pack(side="left", padx=(5, 0))
+
+        summary_var = tk.StringVar()
+        ttk.Label(frame, textvariable=summary_var, style="Card.TLabel").pack(anchor="w", pady=(0, 8))
+
+        shops_tree = ttk.Treeview(frame, columns=("rank", "shop", "avg", "min", "n", "last"),
+                                  show="headings", height=4, style="Modern.Treeview")
+        for col, text, width in (("rank", "#", 40), ("shop", "Shop", 160), ("avg", "Avg", 80),
+                                 ("min", "Min", 80), ("n", "Purchases", 80), ("last", "Last Seen", 100)):
+            shops_tree.heading(col, text=text)
+            shops_tree.column(col, width=width)
+        shops_tree.pack(fill="x", pady=(0, 10))
+
+        trend_frame = ttk.Frame(frame, style="Card.TFrame")
+        trend_frame.pack(fill="both", expand=True)
+        trend_tree = ttk.Treeview(
+            trend_frame, columns=("period", "avg", "min", "max", "moving", "change", "n"),
+            show="headings", style="Modern.Treeview",
+        )
+        for col, text, width in (("period", "Period", 100), ("avg", "Avg", 70), ("min", "Min", 70),
+                                 ("max", "Max", 70), ("moving", "4-Period Avg", 100),
+                                 ("change", "Change", 80), ("n", "Purchases", 80)):
+            trend_tree.heading(col, text=text)
+            trend_tree.column(col, width=width)
+        trend_scrollbar = ttk.Scrollbar(trend_frame, orient="vertical", command=trend_tree.yview)
+        trend_tree.configure(yscrollcommand=trend_scrollbar.set)
+        trend_scrollbar.pack(side="right", fill="y")
+        trend_tree.pack(fill="both", expand=True)
+
+        def refresh(event=None):
+            key = normalize_key(ingredient_var.get())
+            days = windows[window_var.get()]
+            try:
+                with DatabaseHandler() as db:
+                    analytics = PriceAnalytics(db)
+                    if not ingredient_combo["values"]:
+                        ingredient_combo["values"] = analytics.ingredient_keys()
+                    summary = analytics.summary(key, days)
+                    shops = analytics.cheapest_shops(key, days)
+                    trend = analytics.trend(key, periods[period_var.get()], days)
+            except Exception as e:
+                logger.error(f"Failed to load price history: {str(e)}")
+                messagebox.showerror("Error", f"Failed to load price history: {str(e)}", parent=dialog)
+                return
+
+            if summary.purchases:
+                summary_var.set(
+                    f"{summary.purchases} purchases  •  min €{summary.min_price:.2f}  •  "
+                    f"avg €{summary.avg_price:.2f}  •  max €{summary.max_price:.2f}"
+                )
+            else:
+                summary_var.set("No prices recorded in this window")
+
+            shops_tree.delete(*shops_tree.get_children())
+            for shop in shops:
+                shops_tree.insert("", "end", values=(
+                    shop.rank, shop.shop or "Unknown", f"{shop.avg_price:.2f}",
+                    f"{shop.min_price:.2f}", shop.purchases, shop.last_seen,
+                ))
+
+            trend_tree.delete(*trend_tree.get_children())
+            for point in reversed(trend):  # most recent first
+                trend_tree.insert("", "end", values=(
+                    point.period, f"{point.avg_price:.2f}", f"{point.min_price:.2f}",
+                    f"{point.max_price:.2f}", f"{point.moving_avg:.2f}",
+                    f"{point.change:+.1%}" if point.change is not None else "",
+                    point.purchases,
+                ))
+
+        for combo in (ingredient_combo, window_combo, period_combo):
+            combo.bind("<<ComboboxSelected>>", refresh)
+        ingredient_combo.bind("<Return>", refresh)
+        refresh()
+
     def save_recipe(self):
         """Save recipe to database with modern UX feedback"""
         self.status_bar.set_status("Saving recipe...", show_progress=True)
@@ -675,14 +1461,18 @@ Features:
 
             with DatabaseHandler() as db:
                 recipe_id = db.insert_recipe(recipe)
+                self.update_recipe_weights(db, [recipe_id])
 
             # Show success message
             self.status_bar.set_status(f"Recipe saved successfully! ID: {recipe_id}")
             messagebox.showinfo("Success", "Recipe saved successfully!")
             self.clear_recipe_form()
 
-            # Refresh recipe combo in ingredients tab
-            self.populate_recipe_combo()
+            # Patch the recipe list and comboboxes instead of reloading them
+            self.show_saved_recipe(recipe_id, recipe)
+
+            if self.similarity_index is not None:
+                self.similarity_index.set_cuisine(recipe_id, recipe.cuisine_origin)
 
         except ValueError as e:
             self.status_bar.set_status("Validation error - please check inputs")
@@ -739,6 +1529,17 @@ Features:
                     recipe_id = result[0]
 
                 db.insert_ingredients(recipe_id, ingredients)
+                rebuild_shopping_list = self.forget_composed_recipes(db, recipe_id)
+
+            # Keep the in-memory indexes current without rebuilding them
+            ingredient_names = [ingredient.name for ingredient in ingredients]
+            self.pantry_index_changes.record((recipe_id, ingredient_names))
+            if self.pantry_index is not None:
+                self.pantry_index.add_ingredients(recipe_id, ingredient_names)
+            if self.similarity_index is not None:
+                self.similarity_index.add_ingredients(recipe_id, ingredient_names)
+            if rebuild_shopping_list:
+                self.update_manual_menu_ingredients_list()
 
             # Show success message
             self.status_bar.set_status(f"Saved {len(ingredients)} ingredients")
@@ -752,55 +1553,176 @@ Features:
         finally:
             self.status_bar.set_status("Ready")
 
+    @staticmethod
+    def query_recipes(db: DatabaseHandler, search_term: str) -> pd.DataFrame:
+        """Search query run by the search schedulers on their worker thread"""
+        if search_term:
+            return db.search_recipes(search_term)
+        return db.get_all_recipes()
+
     def on_search_change(self, event=None):
         """Handle real-time search as user types"""
-        # Add a small delay to avoid too frequent searches
-        if hasattr(self, "_search_after_id"):
-            self.root.after_cancel(self._search_after_id)
-        self._search_after_id = self.root.after(300, self.search_recipes)
+        search_term = self.search_entry.get().strip().lower()
+        if search_term == self._last_search_term:
+            return  # Navigation and modifier keys do not change the query
+        self._last_search_term = search_term
+
+        if not search_term:
+            self.refresh_recipe_list()
+            return
+
+        # The scheduler debounces, cancels the running query and drops stale results
+        self.status_bar.set_status("Searching recipes...", show_progress=True)
+        self.recipe_search.submit(search_term)
 
     def search_recipes(self):
         """Search recipes based on search term"""
         search_term = self.search_entry.get().strip().lower()
+        self._last_search_term = search_term
 
         if not search_term:
             self.refresh_recipe_list()
             return
 
         self.status_bar.set_status("Searching recipes...", show_progress=True)
-        self.recipe_listbox.delete(0, "end")
+        self.recipe_search.submit(search_term, immediate=True)
 
+    def on_recipe_search_result(self, search_term: str, df: pd.DataFrame):
+        """Show the results of the latest recipe search"""
         try:
-            with DatabaseHandler() as db:
-                # Search in recipe names, cuisine origin, and ingredients
-                df = db.search_recipes(search_term)
+            # Text hits become the base bitmap the facet filters are applied to
+            self._search_bitmap = self.facet_engine.bitmap_for_ids(df["ID"])
+            shown = self.apply_recipe_filters()
 
-                if df.empty:
-                    self.recipe_listbox.insert(
-                        tk.END, "No recipes found matching your search."
-                    )
-                    self.status_bar.set_status("No recipes found")
-                else:
-                    for idx, row in df.iterrows():
-                        self.recipe_listbox.insert(
-                            tk.END,
-                            f"{row['ID']}) {row['recept_naam']} ({row['keuken_origine']})",
-                        )
-                    self.status_bar.set_status(f"Found {len(df)} recipes")
+            if shown == 0:
+                self.recipe_listbox.insert(
+                    tk.END, "No recipes found matching your search."
+                )
+                self.status_bar.set_status("No recipes found")
+            else:
+                self.status_bar.set_status(f"Found {shown} recipes")
 
         except Exception as e:
-            logger.error(f"Failed to search recipes: {str(e)}")
-            self.status_bar.set_status(f"Search error: {str(e)}")
-            messagebox.showerror("Search Error", f"Failed to search recipes: {str(e)}")
+            self.on_recipe_search_error(e)
         finally:
             self.status_bar.set_status("Ready")
 
+    def on_recipe_search_error(self, error: Exception):
+        """Report a failed recipe search"""
+        logger.error(f"Failed to search recipes: {str(error)}")
+        self.status_bar.set_status(f"Search error: {str(error)}")
+        messagebox.showerror("Search Error", f"Failed to search recipes: {str(error)}")
+        self.status_bar.set_status("Ready")
+
+    def get_facet_selections(self) -> dict:
+        """Get the selected value per facet from the filter comboboxes"""
+        selections = {}
+        for facet, combo in self.facet_combos.items():
+            index = combo.current()
+            values = self.facet_combo_values[facet]
+            selected = values[index] if 0 < index < len(values) else None
+            selections[facet] = {selected} if selected else set()
+        return selections
+
+    def update_facet_combos(self, counts: dict):
+        """Refresh the filter comboboxes with the current facet counts"""
+        for facet, combo in self.facet_combos.items():
+            index = combo.current()
+            previous_values = self.facet_combo_values[facet]
+            selected = previous_values[index] if 0 < index < len(previous_values) else None
+
+            values = self.facet_engine.values(facet)
+            combo["values"] = ["All"] + [
+                f"{value} ({counts[facet].get(value, 0)})" for value in values
+            ]
+            self.facet_combo_values[facet] = [None] + values
+            combo.current(values.index(selected) + 1 if selected in values else 0)
+
+    def apply_recipe_filters(self, changed=None) -> int:
+        """
+        Show the recipes matching the facet filters and search, returns the
+        number shown. With changed (the recipe IDs just saved) only the rows
+        that differ from the current list are patched.
+        """
+        selections = self.get_facet_selections()
+        bitmap = self.facet_engine.filter(selections, base=self._search_bitmap)
+        self.update_facet_combos(
+            self.facet_engine.counts(selections, base=self._search_bitmap)
+        )
+
+        recipe_ids = self.facet_engine.ids(bitmap)
+        if changed is not None and self.shown_recipe_ids:
+            # The listbox model holds shown_recipe_ids itself, patching turns it into recipe_ids
+            self.recipe_listbox.patch(diff_keys(self.shown_recipe_ids, recipe_ids, changed))
+        else:
+            self.shown_recipe_ids = recipe_ids
+            self.recipe_listbox.set_items(LazyRows(recipe_ids, self.recipe_labels.__getitem__))
+        return len(recipe_ids)
+
+    def on_facet_change(self, event=None):
+        """Handle selection of a facet filter value"""
+        shown = self.apply_recipe_filters()
+        self.status_bar.set_status(f"{shown} of {len(self.facet_engine)} recipes match")
+
+    def clear_facet_filters(self):
+        """Reset all facet filters to show every recipe"""
+        for combo in self.facet_combos.values():
+            combo.current(0)
+        self.on_facet_change()
+
+    @property
+    def price_estimator(self) -> PriceEstimator:
+        """Price estimator for unpriced ingredients, created on first use"""
+        if self._price_estimator is None:
+            from tkinter_gui.estimate import PriceEstimator
+
+            self._price_estimator = PriceEstimator()
+        return self._price_estimator
+
+    def get_similarity_index(self) -> SimilarityIndex:
+        """Get the recipe similarity index, building it on first use"""
+        if self.similarity_index is None:
+            from tkinter_gui.similarity import SimilarityIndex
+
+            with DatabaseHandler() as db:
+                self.similarity_index = SimilarityIndex.from_rows(
+                    db.get_similarity_rows()
+                )
+        return self.similarity_index
+
+    def show_similar_recipes(self, source_listbox: tk.Listbox, target_listbox: tk.Listbox):
+        """Show the nearest neighbours of the recipe selected in a recipe listbox"""
+        selected_indices = source_listbox.curselection()
+        if not selected_indices:
+            return
+
+        try:
+            recipe_id = int(source_listbox.get(selected_indices[0]).split(")")[0])
+        except ValueError:
+            return  # Placeholder rows such as "No recipes found."
+
+        try:
+            neighbours = self.get_similarity_index().neighbours(recipe_id, top_k=5)
+            with DatabaseHandler() as db:
+                recipe_names = db.get_recipe_names([rid for rid, _ in neighbours])
+
+            target_listbox.delete(0, tk.END)
+            for neighbour_id, score in neighbours:
+                target_listbox.insert(
+                    tk.END,
+                    f"{neighbour_id}) {recipe_names.get(neighbour_id, '')} - {score:.0%} match",
+                )
+            if not neighbours:
+                target_listbox.insert(tk.END, "No similar recipes found.")
+
+        except Exception as e:
+            logger.error(f"Failed to find similar recipes: {str(e)}")
+            self.status_bar.set_status(f"Error finding similar recipes: {str(e)}")
+
     def on_manual_menu_search_change(self, event=None):
         """Handle real-time search for manual week menu as user types"""
-        if hasattr(self, "_manual_search_after_id"):
-            self.root.after_cancel(self._manual_search_after_id)
-        self._manual_search_after_id = self.root.after(
-            300, self.refresh_manual_menu_recipe_list
+        self.manual_menu_search.submit(
+            self.manual_menu_search_entry.get().strip().lower()
         )
 
     def refresh_manual_menu_recipe_list(self):
@@ -808,94 +1730,119 @@ Features:
         self.status_bar.set_status(
             "Refreshing manual menu recipe list...", show_progress=True
         )
-        self.manual_menu_recipe_listbox.delete(0, "end")
+        self.manual_menu_search.submit(
+            self.manual_menu_search_entry.get().strip().lower(), immediate=True
+        )
 
-        search_term = self.manual_menu_search_entry.get().strip().lower()
+    def show_manual_menu_recipes(self, search_term: str, df: pd.DataFrame):
+        """Show the results of the latest manual menu search"""
+        self.manual_menu_recipe_listbox.delete(0, "end")
 
         try:
-            with DatabaseHandler() as db:
-                if search_term:
-                    df = db.search_recipes(search_term)
-                else:
-                    df = db.get_all_recipes()
-
-                if df.empty:
-                    self.manual_menu_recipe_listbox.insert(tk.END, "No recipes found.")
-                    self.status_bar.set_status("No recipes found for manual menu")
-                else:
-                    for idx, row in df.iterrows():
-                        self.manual_menu_recipe_listbox.insert(
-                            tk.END,
-                            f"{row['ID']}) {row['recept_naam']} ({row['keuken_origine']})",
+            if df.empty:
+                self.manual_menu_recipe_listbox.insert(tk.END, "No recipes found.")
+                self.status_bar.set_status("No recipes found for manual menu")
+            else:
+                self.manual_menu_recipe_listbox.insert(
+                    tk.END,
+                    *(
+                        f"{recipe_id}) {name} ({cuisine})"
+                        for recipe_id, name, cuisine in zip(
+                            df["ID"], df["recept_naam"], df["keuken_origine"]
                         )
-                    self.status_bar.set_status(
-                        f"Loaded {len(df)} recipes for manual menu"
-                    )
+                    ),
+                )
+                self.status_bar.set_status(
+                    f"Loaded {len(df)} recipes for manual menu"
+                )
 
         except Exception as e:
-            logger.error(f"Failed to refresh manual menu recipe list: {str(e)}")
-            self.status_bar.set_status(
-                f"Error loading recipes for manual menu: {str(e)}"
-            )
-            messagebox.showerror(
-                "Error", f"Failed to refresh manual menu recipe list: {str(e)}"
-            )
+            self.on_manual_menu_search_error(e)
         finally:
             self.status_bar.set_status("Ready")
 
+    def on_manual_menu_search_error(self, error: Exception):
+        """Report a failed manual menu recipe search"""
+        logger.error(f"Failed to refresh manual menu recipe list: {str(error)}")
+        self.status_bar.set_status(
+            f"Error loading recipes for manual menu: {str(error)}"
+        )
+        messagebox.showerror(
+            "Error", f"Failed to refresh manual menu recipe list: {str(error)}"
+        )
+        self.status_bar.set_status("Ready")
+
     def refresh_recipe_list(self):
         """Refresh recipe list with modern loading indicator"""
-        self.status_bar.set_status("Refreshing recipe list...", show_progress=True)
-        self.recipe_listbox.delete(0, "end")
+        self.recipe_search.cancel()  # A pending search must not overwrite the full list
 
-        try:
+        def work(context):
             with DatabaseHandler() as db:
                 df = db.get_all_recipes()
-
-                for idx, row in df.iterrows():
-                    self.recipe_listbox.insert(
-                        tk.END,
-                        f"{row['ID']}) {row['recept_naam']} ({row['keuken_origine']})",
-                    )
-
-            self.status_bar.set_status(f"Loaded {len(df)} recipes")
-
-        except Exception as e:
-            logger.error(f"Failed to refresh recipe list: {str(e)}")
-            self.status_bar.set_status(f"Error loading recipes: {str(e)}")
-            messagebox.showerror("Error", f"Failed to refresh recipe list: {str(e)}")
-        finally:
-            self.status_bar.set_status("Ready")
+            context.check()
+            recipe_labels = {
+                int(recipe_id): f"{recipe_id}) {name} ({cuisine})"
+                for recipe_id, name, cuisine in zip(
+                    df["ID"], df["recept_naam"], df["keuken_origine"]
+                )
+            }
+            facet_engine = FacetEngine.from_rows(
+                df[
+                    [
+                        "ID",
+                        "keuken_origine",
+                        "bereidingstijd",
+                        "gezondheidsgraad",
+                        "aantal_personen",
+                    ]
+                ].itertuples(index=False, name=None)
+            )
+            return recipe_labels, facet_engine
+
+        def show(result):
+            changes = self.recipe_index_changes.finish(generation)
+            if changes is None:
+                return  # Superseded by a newer refresh
+            recipe_labels, facet_engine = result
+            # Recipes saved while the snapshot was loading
+            for recipe_id, recipe in changes:
+                self.index_saved_recipe(recipe_labels, facet_engine, recipe_id, recipe)
+            self.recipe_labels, self.facet_engine = recipe_labels, facet_engine
+            self._recipe_list_job = None
+            self._search_bitmap = None
+            shown = self.apply_recipe_filters()
+
+            self.status_bar.set_status(f"Loaded {shown} of {len(facet_engine)} recipes")
+
+        # The worker builds new indexes; saves made meanwhile are replayed onto them
+        generation = self.recipe_index_changes.begin()
+
+        self._recipe_list_job = self.run_in_background(
+            "Refreshing recipe list...", work,
+            on_result=show, error_message="Failed to refresh recipe list",
+            replaces=self._recipe_list_job,
+        )
 
     def populate_manual_menu_combos(self):
         """Populate the comboboxes for manual week menu with available recipes."""
         try:
-            with DatabaseHandler() as db:
-                df = db.get_recipes_for_combo()
-                # Store recipe ID and name for easy lookup
-                self.all_recipes_for_manual_menu = {
-                    row["ID"]: row["recept_naam"] for _, row in df.iterrows()
-                }
-                recipe_list_display = [
-                    f"{row['ID']} - {row['recept_naam']}" for _, row in df.iterrows()
-                ]
-
-                for day in self.days_of_week:
-                    combo = self.manual_week_menu_recipe_combos[day]
-                    combo["values"] = recipe_list_display
-                    # Ensure current selection is preserved if recipe still exists
-                    current_recipe_id = self.week_menu_recipe_ids.get(day)
-                    if (
-                        current_recipe_id
-                        and current_recipe_id in self.all_recipes_for_manual_menu
-                    ):
-                        combo.set(
-                            f"{current_recipe_id} - {self.all_recipes_for_manual_menu[current_recipe_id]}"
-                        )
-                    else:
-                        combo.set(
-                            "Select a recipe"
-                        )  # Reset if recipe not found or no selection
+            self.load_combo_recipes()
+            for day in self.days_of_week:
+                combo = self.manual_week_menu_recipe_combos[day]
+                combo["values"] = self.combo_recipe_values
+                # Ensure current selection is preserved if recipe still exists
+                current_recipe_id = self.week_menu_recipe_ids.get(day)
+                if (
+                    current_recipe_id
+                    and current_recipe_id in self.all_recipes_for_manual_menu
+                ):
+                    combo.set(
+                        f"{current_recipe_id} - {self.all_recipes_for_manual_menu[current_recipe_id]}"
+                    )
+                else:
+                    combo.set(
+                        "Select a recipe"
+                    )  # Reset if recipe not found or no selection
 
         except Exception as e:
             logger.error(f"Failed to populate manual menu combos: {str(e)}")
@@ -922,53 +1869,142 @@ Features:
             )
         except Exception as e:
             logger.warning(f"Could not parse selected recipe: {selected_item} - {e}")
+            return
+
+        self.show_similar_recipes(
+            self.manual_menu_recipe_listbox, self.manual_menu_similar_listbox
+        )
 
     def on_manual_menu_recipe_assign(self, day: str):
         """Handle recipe assignment to a specific day via combobox."""
         selected_value = self.week_menu_vars[day].get()
+        recipe_id = None
         if "Select a recipe" in selected_value or not selected_value:
-            self.week_menu_recipe_ids[day] = None
             self.status_bar.set_status(f"Cleared recipe for {day}")
         else:
             try:
                 recipe_id = int(selected_value.split(" - ")[0])
-                self.week_menu_recipe_ids[day] = recipe_id
                 self.status_bar.set_status(
                     f"Assigned {selected_value.split(' - ')[1]} to {day}"
                 )
             except ValueError:
-                self.week_menu_recipe_ids[day] = None
                 self.status_bar.set_status(f"Invalid recipe selection for {day}")
-        self.update_manual_menu_ingredients_list()
+        self.set_manual_menu_day(day, recipe_id)
 
     def clear_day_recipe(self, day: str):
         """Clear the recipe assigned to a specific day."""
         self.week_menu_vars[day].set("Select a recipe")
-        self.week_menu_recipe_ids[day] = None
         self.status_bar.set_status(f"Cleared recipe for {day}")
-        self.update_manual_menu_ingredients_list()
+        self.set_manual_menu_day(day, None)
+
+    def set_manual_menu_day(self, day: str, recipe_id: Optional[int]):
+        """Assign a recipe to a day and patch only the affected shopping list rows"""
+        self.week_menu_recipe_ids[day] = recipe_id
+        try:
+            with DatabaseHandler() as db:
+                shopping_list = self.manual_shopping_list
+                if recipe_id is not None and not shopping_list.has_recipe(recipe_id):
+                    shopping_list.cache_recipe(recipe_id, db.get_recipe_ingredient_vector(recipe_id))
+                changed = shopping_list.set_day(day, recipe_id)
+                self.patch_manual_shopping_rows(db, changed)
+        except Exception as e:
+            logger.error(f"Failed to update manual menu ingredients list: {str(e)}")
+            self.status_bar.set_status(
+                f"Error updating manual menu ingredients: {str(e)}"
+            )
+            messagebox.showerror(
+                "Error", f"Failed to update manual menu ingredients list: {str(e)}"
+            )
+
+    def patch_manual_shopping_rows(self, db, lines):
+        """Insert, update or delete the Treeview rows of changed shopping lines"""
+        shopping_list = self.manual_shopping_list
+        tree = self.manual_menu_ingredients_tree
+
+        # New receipts invalidate every cached price, so all rows are redrawn;
+        # link edits go through reprice_manual_shopping_list instead
+        receipt_version = db.get_receipt_version()
+        if receipt_version != shopping_list.prices_version:
+            shopping_list.prices.clear()
+            shopping_list.prices_version = receipt_version
+            lines = set(lines) | set(self.manual_shopping_iids)
+        present = [line for line in sorted(lines) if shopping_list.amount(line) is not None]
+
+        # Prices are looked up once per ingredient, estimates only for unpriced ones
+        unknown = {shopping_list.ingredient_key(line) for line in present} - set(shopping_list.prices)
+        if unknown:
+            latest = db.get_latest_prices(sorted(unknown))
+            for ingredient_key in unknown:
+                shopping_list.prices[ingredient_key] = latest.get(ingredient_key, (None, None))
+        unpriced = [
+            line[0] for line in present
+            if not shopping_list.prices[shopping_list.ingredient_key(line)][0]
+        ]
+        estimates = {}
+        if unpriced:
+            self.price_estimator.refresh(db)
+            estimates = self.price_estimator.estimate(unpriced)
+
+        # Ascending order keeps the insert positions of new rows valid
+        for line in sorted(lines):
+            iid = self.manual_shopping_iids.get(line)
+            amount = shopping_list.amount(line)
+            if amount is None:
+                if iid is not None:
+                    tree.delete(iid)
+                    del self.manual_shopping_iids[line]
+                continue
+
+            ingredient, unit = line
+            price, shop = shopping_list.prices[shopping_list.ingredient_key(line)]
+            values, tags = self.shopping_row_values(
+                ingredient, round(amount, 2), unit, price, shop,
+                None if price else estimates.get(normalize_key(ingredient)),
+            )
+            if iid is not None:
+                tree.item(iid, values=values, tags=tags)
+            else:
+                self.manual_shopping_iids[line] = tree.insert(
+                    "", shopping_list.index(line), values=values, tags=tags
+                )
+
+    def reprice_manual_shopping_list(self):
+        """Drop the cached shopping prices and redraw the rows after receipt links changed."""
+        self.manual_shopping_list.prices.clear()
+        if not self.manual_shopping_iids:
+            return
+        try:
+            with DatabaseHandler() as db:
+                self.patch_manual_shopping_rows(db, self.manual_shopping_list.lines())
+        except Exception as e:
+            logger.error(f"Failed to update manual menu ingredient prices: {str(e)}")
+            self.status_bar.set_status(f"Error updating ingredient prices: {str(e)}")
 
     def save_manual_week_menu(self):
-        """Save the current manual week menu to the database."""
+        """Save the manual week menu as a new version of the selected week."""
         self.status_bar.set_status("Saving manual week menu...", show_progress=True)
         try:
+            entries = [
+                WeekMenuEntry(day=day, recipe_id=recipe_id,
+                              week_start=self.manual_week_start.isoformat())
+                for day, recipe_id in self.week_menu_recipe_ids.items()
+                if recipe_id is not None
+            ]
+            if not entries:
+                messagebox.showwarning("Empty Menu", "Please assign at least one recipe first!")
+                return
             with DatabaseHandler() as db:
-                # Clear existing menu before saving new one
-                db.clear_week_menu()
-
-                saved_count = 0
-                for day, recipe_id in self.week_menu_recipe_ids.items():
-                    if recipe_id is not None:
-                        entry = WeekMenuEntry(day=day, recipe_id=recipe_id)
-                        db.insert_week_menu_entry(entry)
-                        saved_count += 1
+                version = db.insert_week_menus([entries])[0]
+                self.update_recipe_weights(db, [entry.recipe_id for entry in entries])
 
+            self.manual_week_version = version
+            self.update_week_navigator()
             self.status_bar.set_status(
-                f"Saved {saved_count} recipes to manual week menu."
+                f"Saved {len(entries)} recipes to manual week menu."
             )
             messagebox.showinfo(
                 "Success",
-                f"Manual week menu saved successfully with {saved_count} entries!",
+                f"Week menu saved as version {version} with {len(entries)} entries!",
             )
         except Exception as e:
             logger.error(f"Failed to save manual week menu: {str(e)}")
@@ -977,14 +2013,35 @@ Features:
         finally:
             self.status_bar.set_status("Ready")
 
+    def update_week_navigator(self):
+        """Show the selected week and its saved version in the navigator"""
+        sunday = self.manual_week_start + datetime.timedelta(days=6)
+        version = f"version {self.manual_week_version}" if self.manual_week_version else "not saved"
+        self.week_navigator_var.set(
+            f"{self.manual_week_start.strftime('%d-%m-%Y')} – {sunday.strftime('%d-%m-%Y')} ({version})"
+        )
+
+    def change_manual_week(self, weeks: Optional[int] = None):
+        """Move the week navigator by a number of weeks (back to this week if None)"""
+        if weeks is None:
+            self.manual_week_start = week_start()
+        else:
+            self.manual_week_start += datetime.timedelta(weeks=weeks)
+        self.load_manual_week_menu()
+
     def load_manual_week_menu(self):
-        """Load the latest saved manual week menu from the database."""
+        """Load the latest saved version of the selected week's menu."""
         self.status_bar.set_status(
-            "Loading latest manual week menu...", show_progress=True
+            "Loading week menu...", show_progress=True
         )
         try:
             with DatabaseHandler() as db:
-                latest_menu_data = db.get_latest_week_menu()
+                self.manual_week_version = db.get_week_menu_version(
+                    self.manual_week_start.isoformat()
+                )
+                menu_data = db.get_week_menu(
+                    self.manual_week_start.isoformat(), self.manual_week_version
+                )
 
                 # Reset current selections
                 for day in self.days_of_week:
@@ -992,7 +2049,7 @@ Features:
                     self.week_menu_recipe_ids[day] = None
 
                 loaded_count = 0
-                for entry in latest_menu_data:
+                for entry in menu_data:
                     if entry:  # Check if entry is not None (meaning a recipe was assigned for that day)
                         day = entry["day"]
                         recipe_id = entry["recipe_id"]
@@ -1003,6 +2060,7 @@ Features:
                             self.week_menu_recipe_ids[day] = recipe_id
                             loaded_count += 1
 
+            self.update_week_navigator()
             self.status_bar.set_status(
                 f"Loaded {loaded_count} recipes for manual week menu."
             )
@@ -1018,11 +2076,19 @@ Features:
         """Clear all recipes from the manual week menu and reset UI."""
         if messagebox.askyesno(
             "Clear Menu",
-            "Are you sure you want to clear all recipes from the manual week menu? This will also clear it from the database.",
+            "Are you sure you want to clear all recipes from the manual week menu? "
+            "This also deletes the latest saved version of this week.",
         ):
             try:
                 with DatabaseHandler() as db:
-                    db.clear_week_menu()  # Clear from database
+                    db.clear_week_menu(self.manual_week_start.isoformat())
+                    self.update_recipe_weights(
+                        db, [rid for rid in self.week_menu_recipe_ids.values() if rid is not None]
+                    )
+                    self.manual_week_version = db.get_week_menu_version(
+                        self.manual_week_start.isoformat()
+                    )
+                self.update_week_navigator()
 
                 for day in self.days_of_week:
                     self.week_menu_vars[day].set("Select a recipe")
@@ -1040,98 +2106,67 @@ Features:
 
     def export_manual_week_menu(self):
         """Export the current manual week menu with modern file dialog."""
-        try:
-            meal_names = []
-            for day in self.days_of_week:
-                recipe_id = self.week_menu_recipe_ids.get(day)
-                if recipe_id is not None:
-                    recipe_name = self.all_recipes_for_manual_menu.get(recipe_id)
-                    if recipe_name:
-                        meal_names.append(recipe_name)
-
-            if not meal_names:
-                messagebox.showwarning(
-                    "No Menu",
-                    "Please assign recipes to days in the manual week menu first!",
-                )
-                return
-
-            with DatabaseHandler() as db:
-                meals_with_urls = db.get_week_menu_recipes_with_urls(meal_names)
-                grouped_ingredients = db.get_grouped_ingredients_for_meals(meal_names)
-
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".txt",
-                filetypes=[
-                    ("Text files", "*.txt"),
-                    ("CSV files", "*.csv"),
-                    ("All files", "*.*"),
-                ],
-                title="Export Manual Week Menu",
-            )
-
-            if not file_path:
-                return
+        meal_names = []
+        for day in self.days_of_week:
+            recipe_id = self.week_menu_recipe_ids.get(day)
+            if recipe_id is not None:
+                recipe_name = self.all_recipes_for_manual_menu.get(recipe_id)
+                if recipe_name:
+                    meal_names.append(recipe_name)
 
-            self.status_bar.set_status(
-                "Exporting manual week menu...", show_progress=True
+        if not meal_names:
+            messagebox.showwarning(
+                "No Menu",
+                "Please assign recipes to days in the manual week menu first!",
             )
+            return
 
-            file_extension = Path(file_path).suffix.lower()
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[
+                ("Text files", "*.txt"),
+                ("CSV files", "*.csv"),
+                ("All files", "*.*"),
+            ],
+            initialdir=ensure_export_dir(),
+            title="Export Manual Week Menu",
+        )
 
-            if file_extension == ".csv":
-                export_to_csv(file_path, meals_with_urls, grouped_ingredients)
-            else:
-                export_to_text(file_path, meals_with_urls, grouped_ingredients)
+        if not file_path:
+            return
 
-            self.status_bar.set_status(f"Manual menu exported to {file_path}")
+        def exported(path):
+            self.status_bar.set_status(f"Manual menu exported to {path}")
             messagebox.showinfo(
                 "Export Complete",
-                f"Manual week menu exported successfully to:\n{file_path}",
+                f"Manual week menu exported successfully to:\n{path}",
             )
 
-        except Exception as e:
-            logger.error(f"Failed to export manual week menu: {str(e)}")
-            self.status_bar.set_status(f"Export failed: {str(e)}")
-            messagebox.showerror(
-                "Export Error", f"Failed to export manual week menu: {str(e)}"
-            )
-        finally:
-            self.status_bar.set_status("Ready")
+        self.run_in_background(
+            "Exporting manual week menu...", self.export_menu_file, meal_names, file_path,
+            on_result=exported, error_message="Failed to export manual week menu",
+        )
 
     def update_manual_menu_ingredients_list(self):
-        """Update ingredients list for the manual week menu based on assigned recipes."""
-        meal_names = []
-        for day in self.days_of_week:
-            recipe_id = self.week_menu_recipe_ids.get(day)
-            if recipe_id is not None:
-                recipe_name = self.all_recipes_for_manual_menu.get(recipe_id)
-                if recipe_name:
-                    meal_names.append(recipe_name)
-
+        """Rebuild the manual week menu shopping list from all assigned recipes."""
+        shopping_list = self.manual_shopping_list
         try:
             with DatabaseHandler() as db:
-                results = db.get_ingredients_for_meals(meal_names)
-                receipt_items_df = db.get_all_receipt_items()
-
+                shopping_list.clear()
+                shopping_list.prices.clear()
                 for item in self.manual_menu_ingredients_tree.get_children():
                     self.manual_menu_ingredients_tree.delete(item)
+                self.manual_shopping_iids.clear()
 
-                for i, (ingredient, amount, unit) in enumerate(results):
-                    price, shop = self.find_ingredient_price(
-                        ingredient, receipt_items_df
-                    )
-                    self.manual_menu_ingredients_tree.insert(
-                        "",
-                        "end",
-                        values=(
-                            ingredient,
-                            amount,
-                            unit,
-                            f"{price:.2f}" if price else "",
-                            shop,
-                        ),
-                    )
+                changed = set()
+                for day in self.days_of_week:
+                    recipe_id = self.week_menu_recipe_ids.get(day)
+                    if recipe_id is not None and not shopping_list.has_recipe(recipe_id):
+                        shopping_list.cache_recipe(
+                            recipe_id, db.get_recipe_ingredient_vector(recipe_id)
+                        )
+                    changed |= shopping_list.set_day(day, recipe_id)
+                self.patch_manual_shopping_rows(db, changed)
 
         except Exception as e:
             logger.error(f"Failed to update manual menu ingredients list: {str(e)}")
@@ -1142,22 +2177,84 @@ Features:
                 "Error", f"Failed to update manual menu ingredients list: {str(e)}"
             )
 
+    @staticmethod
+    def recent_menu_cutoff(reference: Optional[datetime.datetime] = None) -> int:
+        """Timestamp from which served recipes count as recent"""
+        reference = reference or datetime.datetime.now()
+        return int((reference - datetime.timedelta(days=RECENT_MENU_DAYS)).timestamp())
+
+    def get_recipe_sampler(self, db, mode: str) -> WeightedSampler:
+        """Alias-table sampler for a weighting mode, built on first use"""
+        if mode not in self.recipe_samplers:
+            self.recipe_samplers[mode] = WeightedSampler(
+                (recipe_id, recipe_weight(mode, rating, last_served))
+                for recipe_id, rating, last_served in db.get_recipe_weight_inputs()
+            )
+        return self.recipe_samplers[mode]
+
+    def update_recipe_weights(self, db, recipe_ids):
+        """Refresh the sampler weights of recipes whose rating or history changed"""
+        recipe_ids = list(set(recipe_ids))
+        if not self.recipe_samplers or not recipe_ids:
+            return
+        rows = db.get_recipe_weight_inputs(recipe_ids)
+        for mode, sampler in self.recipe_samplers.items():
+            sampler.update({
+                recipe_id: recipe_weight(mode, rating, last_served)
+                for recipe_id, rating, last_served in rows
+            })
+
+    def rate_selected_recipe(self):
+        """Ask for a 1-5 rating of the recipe selected in the recipe list"""
+        selected_indices = self.recipe_listbox.curselection()
+        if not selected_indices:
+            messagebox.showwarning("No Selection", "Please select a recipe to rate!")
+            return
+        try:
+            recipe_id = int(self.recipe_listbox.get(selected_indices[0]).split(")")[0])
+        except ValueError:
+            return
+        rating = simpledialog.askinteger(
+            "Rate Recipe", "Rating (1 = meh, 5 = family favourite):",
+            minvalue=1, maxvalue=5, parent=self.root,
+        )
+        if rating is None:
+            return
+        try:
+            with DatabaseHandler() as db:
+                db.set_recipe_rating(recipe_id, rating)
+                self.update_recipe_weights(db, [recipe_id])
+            self.status_bar.set_status(f"Rated recipe {recipe_id}: {'⭐' * rating}")
+        except Exception as e:
+            logger.error(f"Failed to rate recipe: {str(e)}")
+            self.status_bar.set_status(f"Error rating recipe: {str(e)}")
+            messagebox.showerror("Error", f"Failed to rate recipe: {str(e)}")
+
     def generate_week_menu(self):
         """Generate week menu with modern loading indicator"""
         self.status_bar.set_status("Generating week menu...", show_progress=True)
 
         try:
             with DatabaseHandler() as db:
-                df = db.get_all_recipes()
+                recent_ids = db.get_recent_recipe_ids(self.recent_menu_cutoff())
+                mode = self.weighting_mode_var.get()
+                if mode == WEIGHT_UNIFORM:
+                    recipe_ids = db.sample_recipe_ids(7, exclude_ids=recent_ids)
+                else:
+                    recipe_ids = self.get_recipe_sampler(db, mode).sample(7, exclude=recent_ids)
+                if len(recipe_ids) < 7:  # small library, allow recently served recipes
+                    recipe_ids += db.sample_recipe_ids(
+                        7 - len(recipe_ids), exclude_ids=recipe_ids
+                    )
 
-                if len(df) < 7:
+                if len(recipe_ids) < 7:
                     messagebox.showwarning(
                         "Not Enough Recipes",
                         "You need at least 7 recipes to generate a week menu!",
                     )
                     return
 
-                random_meals = df.sample(n=7)
+                random_meals = db.get_recipes_by_ids(recipe_ids)
                 self.week_menu_listbox.delete(0, tk.END)
 
                 for idx, meal in enumerate(random_meals["recept_naam"], 1):
@@ -1173,41 +2270,344 @@ Features:
         finally:
             self.status_bar.set_status("Ready")
 
+    def generate_budget_menu(self):
+        """Fill the week menu with the cheapest menu found"""
+
+        def work(context, cutoff):
+            from tkinter_gui.budget import plan_budget_menu
+
+            with DatabaseHandler() as db:
+                recent_ids = db.get_recent_recipe_ids(cutoff)
+                menu = plan_budget_menu(db, self.price_estimator, exclude_ids=recent_ids)
+                context.check()
+                recipes = db.get_recipes_by_ids(menu.recipe_ids) if menu else None
+            return menu, recipes
+
+        def show(result):
+            menu, recipes = result
+            if menu is None:
+                messagebox.showwarning(
+                    "Not Enough Recipes",
+                    "You need at least 7 recipes with ingredients to plan a budget menu!",
+                )
+                return
+            self.week_menu_listbox.delete(0, tk.END)
+            for idx, meal in enumerate(recipes["recept_naam"], 1):
+                self.week_menu_listbox.insert(tk.END, f"{idx}) {meal}")
+            self.update_ingredients_list(recipes["recept_naam"].tolist())
+            self.status_bar.set_status(
+                f"Budget menu: estimated €{menu.total:.2f}, "
+                f"{len(menu.shared)} ingredients shared between recipes"
+            )
+            logger.info(f"Budget menu scored {menu.evaluated} candidate menus.")
+
+        self.run_in_background(
+            "Searching for a budget menu...", work, self.recent_menu_cutoff(),
+            on_result=show, error_message="Failed to generate budget menu",
+        )
+
+    def show_menu_planner_dialog(self):
+        """Dialog collecting week menu constraints for the planner"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Plan Week Menu")
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+
+        frame = ttk.Frame(dialog, style="Card.TFrame", padding=15)
+        frame.pack(fill="both", expand=True)
+
+        fields = {
+            "weekday_max_time": ("Max cooking time on weekdays (min)", tk.StringVar(value="45")),
+            "max_avg_health_grade": ("Max average health grade (1 = healthiest)", tk.StringVar(value="2")),
+            "excluded_ids": ("Exclude recipe IDs (comma separated)", tk.StringVar()),
+            "time_budget": ("Time budget (seconds)", tk.StringVar(value="0.5")),
+        }
+        for row, (label, var) in enumerate(fields.values()):
+            ttk.Label(frame, text=f"{label}:", style="Card.TLabel").grid(
+                row=row, column=0, sticky="w", pady=4
+            )
+            ttk.Entry(frame, textvariable=var, width=20).grid(
+                row=row, column=1, sticky="w", padx=(10, 0), pady=4
+            )
+        unique_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(frame, text="Every day a different cuisine", variable=unique_var).grid(
+            row=len(fields), column=0, columnspan=2, sticky="w", pady=4
+        )
+
+        def optional_number(key, convert):
+            text = fields[key][1].get().strip()
+            return convert(text) if text else None
+
+        def plan():
+            try:
+                constraints = MenuConstraints(
+                    weekday_max_time=optional_number("weekday_max_time", int),
+                    max_avg_health_grade=optional_number("max_avg_health_grade", float),
+                    unique_cuisines=unique_var.get(),
+                    excluded_ids={
+                        int(part) for part in fields["excluded_ids"][1].get().split(",") if part.strip()
+                    },
+                    time_budget=optional_number("time_budget", float) or 0.5,
+                )
+            except ValueError:
+                messagebox.showerror("Invalid Input", "Please enter numbers only.", parent=dialog)
+                return
+            dialog.destroy()
+            self.plan_week_menu(constraints)
+
+        ttk.Button(frame, text="Plan", style="Modern.TButton", command=plan).grid(
+            row=len(fields) + 1, column=0, columnspan=2, pady=(10, 0)
+        )
+
+    def plan_week_menu(self, constraints: MenuConstraints):
+        """Fill the week menu with a plan satisfying the given constraints"""
+
+        def work(context):
+            with DatabaseHandler() as db:
+                return MenuPlanner(db, constraints).plan()
+
+        def show(plan):
+            if plan is None:
+                messagebox.showwarning(
+                    "No Menu Found",
+                    "No menu satisfying these constraints was found in time. "
+                    "Try relaxing the constraints or increasing the time budget.",
+                )
+                return
+
+            self.week_menu_listbox.delete(0, tk.END)
+            meal_names = []
+            for idx, day in enumerate(constraints.days, 1):
+                meal_names.append(plan[day].name)
+                self.week_menu_listbox.insert(tk.END, f"{idx}) {plan[day].name}")
+            self.update_ingredients_list(meal_names)
+            self.status_bar.set_status("Week menu planned successfully")
+
+        self.run_in_background(
+            "Planning week menu...", work,
+            on_result=show, error_message="Failed to plan week menu",
+        )
+
+    def show_multi_week_dialog(self):
+        """Dialog collecting the settings for batch week menu generation"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Plan Multiple Weeks")
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+
+        frame = ttk.Frame(dialog, style="Card.TFrame", padding=15)
+        frame.pack(fill="both", expand=True)
+
+        fields = {
+            "weeks": ("Number of weeks", tk.StringVar(value="13"), 1, 104),
+            "no_repeat_weeks": ("No repeats within (weeks)", tk.StringVar(value="4"), 0, 52),
+            "max_per_cuisine": ("Max recipes per cuisine per week", tk.StringVar(value="2"), 1, 7),
+        }
+        for row, (label, var, low, high) in enumerate(fields.values()):
+            ttk.Label(frame, text=f"{label}:", style="Card.TLabel").grid(
+                row=row, column=0, sticky="w", pady=4
+            )
+            ttk.Spinbox(frame, from_=low, to=high, textvariable=var, width=6).grid(
+                row=row, column=1, sticky="w", padx=(10, 0), pady=4
+            )
+
+        def generate():
+            try:
+                values = {key: int(field[1].get()) for key, field in fields.items()}
+            except ValueError:
+                messagebox.showerror("Invalid Input", "Please enter whole numbers only.", parent=dialog)
+                return
+            if values["weeks"] < 1 or values["max_per_cuisine"] < 1:
+                messagebox.showerror("Invalid Input", "Weeks and cuisine limit must be at least 1.",
+                                     parent=dialog)
+                return
+            dialog.destroy()
+            self.generate_multi_week_menus(**values)
+
+        ttk.Button(frame, text="Generate", style="Modern.TButton", command=generate).grid(
+            row=len(fields), column=0, columnspan=2, pady=(10, 0)
+        )
+
+    def generate_multi_week_menus(self, weeks: int, no_repeat_weeks: int, max_per_cuisine: int):
+        """Generate consecutive week menus, save them and show the first week"""
+        start = next_monday()
+        cutoff = self.recent_menu_cutoff(datetime.datetime.combine(start, datetime.time()))
+
+        def work(context):
+            def report(done, total):
+                context.check()
+                context.progress(done, total, f"Generated {done} of {total} week menus...")
+
+            with DatabaseHandler() as db:
+                served_ids = db.get_recent_recipe_ids(cutoff)
+                menus = plan_weeks(db, weeks, no_repeat_weeks, max_per_cuisine, served_ids,
+                                   progress=report)
+                entries = []
+                for week, menu in enumerate(menus):
+                    monday = (start + datetime.timedelta(weeks=week)).isoformat()
+                    entries.append([
+                        WeekMenuEntry(day=day, recipe_id=candidate.recipe_id, week_start=monday)
+                        for day, candidate in zip(DAYS, menu)
+                    ])
+                if entries:
+                    db.insert_week_menus(entries)
+            return menus, [entry.recipe_id for menu in entries for entry in menu]
+
+        def show(result):
+            menus, recipe_ids = result
+            if not menus:
+                messagebox.showwarning(
+                    "Not Enough Recipes",
+                    "You need at least 7 recipes to generate a week menu!",
+                )
+                return
+            with DatabaseHandler() as db:
+                self.update_recipe_weights(db, recipe_ids)
+
+            self.week_menu_listbox.delete(0, tk.END)
+            for idx, candidate in enumerate(menus[0], 1):
+                self.week_menu_listbox.insert(tk.END, f"{idx}) {candidate.name}")
+            self.update_ingredients_list([candidate.name for candidate in menus[0]])
+            self.status_bar.set_status(f"Saved {len(menus)} week menus")
+            messagebox.showinfo(
+                "Week Menus Saved",
+                f"Saved {len(menus)} week menus starting Monday {start.strftime('%d-%m-%Y')}.\n"
+                "The first week is shown in the generator.",
+            )
+
+        self.run_in_background(
+            f"Generating {weeks} week menus...", work,
+            on_result=show, error_message="Failed to generate week menus",
+        )
+
     def update_ingredients_list(self, meals):
         """Update ingredients list for week menu"""
         try:
             with DatabaseHandler() as db:
-                results = db.get_ingredients_for_meals(meals)
-                receipt_items_df = db.get_all_receipt_items()
+                results = db.get_priced_ingredients_for_meals(meals)
 
                 # Clear existing items
                 for item in self.ingredients_tree.get_children():
                     self.ingredients_tree.delete(item)
 
                 # Insert new data
-                for i, (ingredient, amount, unit) in enumerate(results):
-                    price, shop = self.find_ingredient_price(
-                        ingredient, receipt_items_df
-                    )
-                    self.ingredients_tree.insert(
+                self.insert_shopping_rows(db, self.ingredients_tree, results)
+
+        except Exception as e:
+            logger.error(f"Failed to update ingredients list: {str(e)}")
+            self.status_bar.set_status(f"Error updating ingredients: {str(e)}")
+            messagebox.showerror(
+                "Error", f"Failed to update ingredients list: {str(e)}"
+            )
+
+    def optimize_shopping_basket(self):
+        """Show the shopping list split over the cheapest combination of shops"""
+        meal_names = [
+            self.week_menu_listbox.get(i).split(") ", 1)[-1]
+            for i in range(self.week_menu_listbox.size())
+        ]
+        if not meal_names:
+            messagebox.showwarning("No Menu", "Please generate a week menu first!")
+            return
+
+        try:
+            max_shops = int(self.max_shops_var.get())
+        except (ValueError, tk.TclError):
+            messagebox.showerror("Invalid Input", "Max shops must be a whole number.")
+            return
+
+        def work(context, max_shops):
+            from tkinter_gui.basket import optimize_basket
+
+            with DatabaseHandler() as db:
+                results = db.get_ingredients_for_meals(meal_names)
+                shop_rows = db.get_shop_prices_for_meals(meal_names)
+            context.check()
+
+            shop_prices = {}
+            for ingredient, unit, shop, price in shop_rows:
+                shop_prices.setdefault((ingredient, unit), {})[shop] = price
+            plan = optimize_basket(
+                [shop_prices.get((ingredient, unit), {}) for ingredient, _, unit in results],
+                max_shops,
+            )
+            return results, plan
+
+        def show(result):
+            results, plan = result
+            for item in self.ingredients_tree.get_children():
+                self.ingredients_tree.delete(item)
+
+            groups = [(shop, plan.assignments[shop]) for shop in plan.shops]
+            if plan.unpriced:
+                groups.append((None, plan.unpriced))
+            for shop, rows in groups:
+                subtotal = sum(plan.prices[row] or 0 for row in rows)
+                parent = self.ingredients_tree.insert(
+                    "",
+                    "end",
+                    open=True,
+                    tags=("shop",),
+                    values=(
+                        f"🏪 {shop}" if shop else "No price at chosen shops",
                         "",
+                        "",
+                        f"{subtotal:.2f}" if shop else "",
+                        f"{len(rows)} items",
+                    ),
+                )
+                for row in rows:
+                    ingredient, amount, unit = results[row]
+                    price = plan.prices[row]
+                    self.ingredients_tree.insert(
+                        parent,
                         "end",
                         values=(
                             ingredient,
                             amount,
                             unit,
                             f"{price:.2f}" if price else "",
-                            shop,
+                            shop or "",
                         ),
                     )
 
-        except Exception as e:
-            logger.error(f"Failed to update ingredients list: {str(e)}")
-            self.status_bar.set_status(f"Error updating ingredients: {str(e)}")
-            messagebox.showerror(
-                "Error", f"Failed to update ingredients list: {str(e)}"
+            quality = "" if plan.exact else " (best found within time limit)"
+            self.status_bar.set_status(
+                f"Cheapest split over {len(plan.shops)} shops: €{plan.total:.2f}{quality}"
             )
 
+        self.run_in_background(
+            "Optimizing shopping basket...", work, max_shops,
+            on_result=show, error_message="Failed to optimize shopping basket",
+        )
+
+    def insert_shopping_rows(self, db, tree, results):
+        """Insert priced shopping list rows, estimating prices that have no receipt match"""
+        unpriced = [ingredient for ingredient, _, _, price, _ in results if not price]
+        estimates = {}
+        if unpriced:
+            self.price_estimator.refresh(db)
+            estimates = self.price_estimator.estimate(unpriced)
+
+        for ingredient, amount, unit, price, shop in results:
+            estimate = None if price else estimates.get(normalize_key(ingredient))
+            values, tags = self.shopping_row_values(ingredient, amount, unit, price, shop, estimate)
+            tree.insert("", "end", values=values, tags=tags)
+
+    @staticmethod
+    def configure_shopping_tags(tree):
+        """Configure the row tags used by shopping_row_values on a treeview"""
+        tree.tag_configure(
+            "estimate", foreground=ModernTheme.COLORS["info"], font=ModernTheme.FONTS["italic"]
+        )
+
+    @staticmethod
+    def shopping_row_values(ingredient, amount, unit, price, shop, estimate=None):
+        """Treeview values and tags of a shopping list row"""
+        if estimate is not None:
+            return (ingredient, amount, unit, f"~{estimate.price:.2f}", "estimated"), ("estimate",)
+        return (ingredient, amount, unit, f"{price:.2f}" if price else "", shop or ""), ()
+
     def remove_selected_menu_items(self):
         """Remove selected recipes from the week menu listbox and update shopping list."""
         selected_indices = self.week_menu_listbox.curselection()
@@ -1234,92 +2634,209 @@ Features:
             f"Removed {len(selected_indices)} items from week menu."
         )
 
-    def find_ingredient_price(
-        self, ingredient_name: str, receipt_items_df: pd.DataFrame
-    ) -> tuple[Optional[float], Optional[str]]:
-        """Find the price of an ingredient from receipt data."""
-        if receipt_items_df.empty:
-            return None, None
-
-        # Simple search: case-insensitive substring matching
-        # A more advanced implementation could use fuzzy matching
-        for _, row in receipt_items_df.iterrows():
-            if ingredient_name.lower() in row["item_name"].lower():
-                return row["price"], row["shop"]
-        return None, None
+    @staticmethod
+    def export_menu_file(context, meal_names: List[str], file_path: str) -> str:
+        """Job body writing a menu and its ingredients to a text or CSV file"""
+        with DatabaseHandler() as db:
+            meals_with_urls = db.get_week_menu_recipes_with_urls(meal_names)
+            context.progress(1, 3, "Collecting ingredients...")
+            grouped_ingredients = db.get_grouped_ingredients_for_meals(meal_names)
+        context.check()
+        context.progress(2, 3, "Writing file...")
+
+        # Determine export format
+        if Path(file_path).suffix.lower() == ".csv":
+            export_to_csv(file_path, meals_with_urls, grouped_ingredients)
+        else:
+            export_to_text(file_path, meals_with_urls, grouped_ingredients)
+        return file_path
 
     def export_week_menu(self):
         """Export week menu with modern file dialog"""
-        try:
-            meal_names = [
-                self.week_menu_listbox.get(i).split(") ", 1)[
-                    -1
-                ]  # Extract only the meal name
-                for i in range(self.week_menu_listbox.size())
-            ]
-
-            if not meal_names:
-                messagebox.showwarning("No Menu", "Please generate a week menu first!")
-                return
-
-            with DatabaseHandler() as db:
-                meals_with_urls = db.get_week_menu_recipes_with_urls(meal_names)
-                grouped_ingredients = db.get_grouped_ingredients_for_meals(meal_names)
-
-            # Get file path for export
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".txt",
-                filetypes=[
-                    ("Text files", "*.txt"),
-                    ("CSV files", "*.csv"),
-                    ("All files", "*.*"),
-                ],
-                title="Export Week Menu",
-            )
-
-            if not file_path:
-                return
+        meal_names = [
+            self.week_menu_listbox.get(i).split(") ", 1)[
+                -1
+            ]  # Extract only the meal name
+            for i in range(self.week_menu_listbox.size())
+        ]
 
-            self.status_bar.set_status("Exporting week menu...", show_progress=True)
+        if not meal_names:
+            messagebox.showwarning("No Menu", "Please generate a week menu first!")
+            return
 
-            # Determine export format
-            file_extension = Path(file_path).suffix.lower()
+        # Get file path for export
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[
+                ("Text files", "*.txt"),
+                ("CSV files", "*.csv"),
+                ("All files", "*.*"),
+            ],
+            initialdir=ensure_export_dir(),
+            title="Export Week Menu",
+        )
 
-            if file_extension == ".csv":
-                export_to_csv(file_path, meals_with_urls, grouped_ingredients)
-            else:
-                export_to_text(file_path, meals_with_urls, grouped_ingredients)
+        if not file_path:
+            return
 
-            self.status_bar.set_status(f"Menu exported to {file_path}")
+        def exported(path):
+            self.status_bar.set_status(f"Menu exported to {path}")
             messagebox.showinfo(
-                "Export Complete", f"Week menu exported successfully to:\n{file_path}"
+                "Export Complete", f"Week menu exported successfully to:\n{path}"
             )
 
+        self.run_in_background(
+            "Exporting week menu...", self.export_menu_file, meal_names, file_path,
+            on_result=exported, error_message="Failed to export week menu",
+        )
+
+    def selected_ingredients_recipe_id(self) -> Optional[int]:
+        """ID of the recipe selected in the Add Ingredients tab"""
+        selected_recipe = self.recipe_combo.get()
+        return int(selected_recipe.split(" - ")[0]) if selected_recipe else None
+
+    def refresh_component_list(self):
+        """Show the components of the recipe selected in the Add Ingredients tab"""
+        self.component_listbox.delete(0, tk.END)
+        recipe_id = self.selected_ingredients_recipe_id()
+        if recipe_id is None:
+            return
+        try:
+            with DatabaseHandler() as db:
+                components = db.get_recipe_components(recipe_id)
+            for child_id, name, factor in components:
+                self.component_listbox.insert(tk.END, f"{child_id} - {name} x{factor:g}")
         except Exception as e:
-            logger.error(f"Failed to export week menu: {str(e)}")
-            self.status_bar.set_status(f"Export failed: {str(e)}")
-            messagebox.showerror(
-                "Export Error", f"Failed to export week menu: {str(e)}"
-            )
-        finally:
-            self.status_bar.set_status("Ready")
+            logger.error(f"Failed to load recipe components: {str(e)}")
+            self.status_bar.set_status(f"Error loading components: {str(e)}")
+
+    def forget_composed_recipes(self, db, recipe_id: int):
+        """Drop cached shopping vectors of a recipe and the recipes containing it"""
+        assigned = [
+            self.manual_shopping_list.forget_recipe(rid)
+            for rid in [recipe_id] + db.get_recipe_ancestors(recipe_id)
+        ]
+        return any(assigned)
+
+    def add_recipe_component(self):
+        """Add the chosen recipe as a component of the selected recipe"""
+        parent_id = self.selected_ingredients_recipe_id()
+        child = self.component_combo.get()
+        if parent_id is None or not child:
+            messagebox.showwarning("No Selection", "Please select a recipe and a component!")
+            return
+        try:
+            factor = float(self.component_factor_var.get().replace(",", "."))
+            if factor <= 0:
+                raise ValueError("factor must be positive")
+            with DatabaseHandler() as db:
+                db.add_recipe_component(parent_id, int(child.split(" - ")[0]), factor)
+                rebuild = self.forget_composed_recipes(db, parent_id)
+            if rebuild:
+                self.update_manual_menu_ingredients_list()
+            self.refresh_component_list()
+            self.status_bar.set_status(f"Added component to recipe {parent_id}")
+        except ValueError as e:
+            messagebox.showerror("Invalid Component", str(e))
+        except Exception as e:
+            logger.error(f"Failed to add recipe component: {str(e)}")
+            self.status_bar.set_status(f"Error adding component: {str(e)}")
+            messagebox.showerror("Error", f"Failed to add component: {str(e)}")
+
+    def remove_recipe_component(self):
+        """Remove the component selected in the component list"""
+        parent_id = self.selected_ingredients_recipe_id()
+        selection = self.component_listbox.curselection()
+        if parent_id is None or not selection:
+            messagebox.showwarning("No Selection", "Please select a component to remove!")
+            return
+        try:
+            child_id = int(self.component_listbox.get(selection[0]).split(" - ")[0])
+            with DatabaseHandler() as db:
+                db.remove_recipe_component(parent_id, child_id)
+                rebuild = self.forget_composed_recipes(db, parent_id)
+            if rebuild:
+                self.update_manual_menu_ingredients_list()
+            self.refresh_component_list()
+            self.status_bar.set_status(f"Removed component from recipe {parent_id}")
+        except Exception as e:
+            logger.error(f"Failed to remove recipe component: {str(e)}")
+            self.status_bar.set_status(f"Error removing component: {str(e)}")
+            messagebox.showerror("Error", f"Failed to remove component: {str(e)}")
 
     def populate_recipe_combo(self):
         """Populate the recipe combo box with available recipes"""
         try:
-            with DatabaseHandler() as db:
-                df = db.get_recipes_for_combo()
-                recipe_list = [
-                    f"{row['ID']} - {row['recept_naam']}" for _, row in df.iterrows()
-                ]
-                self.recipe_combo["values"] = recipe_list
+            self.load_combo_recipes()
+            self.recipe_combo["values"] = self.combo_recipe_values
+            self.component_combo["values"] = self.combo_recipe_values
 
-                if recipe_list:
-                    self.recipe_combo.current(0)  # Select the most recent recipe
+            if self.combo_recipe_values:
+                self.recipe_combo.current(0)  # Select the most recent recipe
+            self.refresh_component_list()
 
         except Exception as e:
             logger.error(f"Failed to populate recipe combo: {str(e)}")
 
+    def load_combo_recipes(self):
+        """Load the recipe list shared by the recipe comboboxes, newest first"""
+        with DatabaseHandler() as db:
+            df = db.get_recipes_for_combo()
+        self.combo_recipe_ids = [int(recipe_id) for recipe_id in df["ID"]]
+        self.combo_recipe_names = dict(zip(self.combo_recipe_ids, df["recept_naam"]))
+        self.combo_recipe_values = [
+            self.combo_recipe_label(recipe_id) for recipe_id in self.combo_recipe_ids
+        ]
+        # Store recipe ID and name for easy lookup
+        self.all_recipes_for_manual_menu = dict(self.combo_recipe_names)
+
+    def combo_recipe_label(self, recipe_id: int) -> str:
+        return f"{recipe_id} - {self.combo_recipe_names[recipe_id]}"
+
+    def patch_recipe_combos(self, names: dict):
+        """Add or rename recipes in the recipe comboboxes without reloading them"""
+        combos = list(self.manual_week_menu_recipe_combos.values())
+        if self.is_tab_built(self.tab_ingredients):
+            combos += [self.recipe_combo, self.component_combo]
+        if not combos:
+            return  # the combos are loaded fresh when their tab is built
+        changed = [
+            recipe_id for recipe_id, name in names.items()
+            if self.combo_recipe_names.get(recipe_id, name) != name
+        ]
+        self.combo_recipe_names.update(names)
+        self.all_recipes_for_manual_menu.update(names)
+        recipe_ids = merge_keys(self.combo_recipe_ids, names, sort_key=lambda recipe_id: -recipe_id)
+        ops = diff_keys(self.combo_recipe_ids, recipe_ids, changed)
+        if not ops:
+            return
+        self.combo_recipe_ids = recipe_ids
+        apply_ops(self.combo_recipe_values, ops, self.combo_recipe_label)
+
+        # A ttk.Combobox only takes its value list whole; the list itself was patched
+        for combo in combos:
+            combo["values"] = self.combo_recipe_values
+        if self.is_tab_built(self.tab_ingredients):
+            self.recipe_combo.current(0)  # Select the most recent recipe
+            self.refresh_component_list()
+
+    def show_saved_recipe(self, recipe_id: int, recipe: Recipe):
+        """Patch the recipe list and comboboxes for a saved recipe instead of reloading them"""
+        self.index_saved_recipe(self.recipe_labels, self.facet_engine, recipe_id, recipe)
+        self.recipe_index_changes.record((recipe_id, recipe))
+        self.apply_recipe_filters(changed=[recipe_id])
+        self.patch_recipe_combos({recipe_id: recipe.name})
+
+    @staticmethod
+    def index_saved_recipe(recipe_labels: dict, facet_engine: FacetEngine,
+                           recipe_id: int, recipe: Recipe):
+        """Add or update a saved recipe in a label map and facet index"""
+        recipe_labels[recipe_id] = f"{recipe_id}) {recipe.name} ({recipe.cuisine_origin})"
+        facet_engine.add_recipe(
+            recipe_id, recipe.cuisine_origin, recipe.cooking_time,
+            recipe.health_grade, recipe.persons,
+        )
+
     def clear_recipe_form(self):
         """Clear all recipe form fields"""
         for entry in self.recipe_entries.values():
@@ -1336,6 +2853,9 @@ Features:
         """Handle application closing"""
         try:
             self.status_bar.set_status("Closing application...")
+            self.jobs.shutdown()
+            self.recipe_search.cancel()
+            self.manual_menu_search.cancel()
             self.root.destroy()
         except Exception as e:
             logger.error(f"Error during application shutdown: {str(e)}")
@@ -1351,14 +2871,23 @@ Features:
         self.root.bind("<Control-r>", lambda e: self.refresh_recipe_list())
 
         # Ctrl+G for generate menu
-        self.root.bind("<Control-g>", lambda e: self.generate_week_menu())
+        self.root.bind(
+            "<Control-g>",
+            lambda e: self.with_tab(self.tab_week_menu, self.generate_week_menu),
+        )
 
         # Ctrl+E for export
-        self.root.bind("<Control-e>", lambda e: self.export_week_menu())
+        self.root.bind(
+            "<Control-e>",
+            lambda e: self.with_tab(self.tab_week_menu, self.export_week_menu),
+        )
 
         # F5 for refresh (alternative)
         self.root.bind("<F5>", lambda e: self.refresh_recipe_list())
 
+        # Escape cancels background work
+        self.root.bind("<Escape>", lambda e: self.cancel_background_jobs())
+
     def run(self):
         """Start the application"""
         try:
@@ -1445,6 +2974,8 @@ Features:
             "<<ListboxSelect>>", self.on_manual_menu_recipe_select
         )
 
+        self.manual_menu_similar_listbox = self.create_similar_recipes_list(left_frame)
+
         # Right Frame: Day-by-day recipe selection and shopping list
         right_frame = ttk.Frame(main_paned_window, style="Card.TFrame")
         right_frame.configure(padding=12)
@@ -1463,6 +2994,35 @@ Features:
         )
         menu_select_label.pack(anchor="w", pady=(0, 8))
 
+        # Week navigator: every week keeps its saved versions
+        navigator_frame = ttk.Frame(menu_selection_frame, style="Card.TFrame")
+        navigator_frame.pack(fill="x", pady=(0, 8))
+        ttk.Button(
+            navigator_frame,
+            text="◀",
+            style="Secondary.TButton",
+            width=3,
+            command=lambda: self.change_manual_week(-1),
+        ).pack(side="left")
+        ttk.Label(
+            navigator_frame, textvariable=self.week_navigator_var, style="Card.TLabel"
+        ).pack(side="left", padx=8)
+        ttk.Button(
+            navigator_frame,
+            text="▶",
+            style="Secondary.TButton",
+            width=3,
+            command=lambda: self.change_manual_week(1),
+        ).pack(side="left")
+        this_week_btn = ttk.Button(
+            navigator_frame,
+            text="This Week",
+            style="Secondary.TButton",
+            command=self.change_manual_week,
+        )
+        this_week_btn.pack(side="right")
+        ToolTip(this_week_btn, "Go back to the current week")
+
         self.days_of_week = [
             "Monday",
             "Tuesday",
@@ -1520,7 +3080,7 @@ Features:
 
         load_menu_btn = ttk.Button(
             button_frame,
-            text="🔄 Load Latest",
+            text="🔄 Reload Week",
             style="Secondary.TButton",
             command=self.load_manual_week_menu,
         )
@@ -1585,9 +3145,19 @@ Features:
         tree_scrollbar.pack(side="right", fill="y")
         self.manual_menu_ingredients_tree.configure(yscrollcommand=tree_scrollbar.set)
         self.manual_menu_ingredients_tree.pack(fill="both", expand=True)
+        self.manual_menu_ingredients_tree.bind(
+            "<Double-1>",
+            lambda e: self.show_price_history_for_tree(self.manual_menu_ingredients_tree),
+        )
+        self.configure_shopping_tags(self.manual_menu_ingredients_tree)
 
         # Initial population of recipe list and comboboxes
         self.refresh_manual_menu_recipe_list()
         self.populate_manual_menu_combos()
-        self.load_manual_week_menu()  # Load any previously saved menu on startup
+        # Start at the most recent week with a saved menu
+        with DatabaseHandler() as db:
+            latest_week = db.get_latest_menu_week(week_start().isoformat())
+        if latest_week:
+            self.manual_week_start = datetime.date.fromisoformat(latest_week)
+        self.load_manual_week_menu()
 
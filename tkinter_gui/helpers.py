@@ -5,13 +5,15 @@ Contains various utility and helper functions.
 
 import pandas as pd
 from typing import Optional, Tuple
+from tkinter_gui.utils import normalize_key
 
 def find_ingredient_price(ingredient_name: str, receipt_items_df: pd.DataFrame) -> Tuple[Optional[float], Optional[str]]:
     """Find the price of an ingredient from receipt data."""
     if receipt_items_df.empty:
         return None, None
-        
-    for _, row in receipt_items_df.iterrows():
-        if ingredient_name.lower() in row['item_name'].lower():
-            return row['price'], row['shop']
-    return None, None
\ No newline at end of file
+
+    ingredient_key = normalize_key(ingredient_name)
+    for item_name, price, shop in receipt_items_df[['item_name', 'price', 'shop']].itertuples(index=False, name=None):
+        if item_name and ingredient_key in normalize_key(item_name):
+            return price, shop
+    return None, None
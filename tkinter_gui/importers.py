@@ -86,53 +86,28 @@ def parse_15gram_recipe(html_content: str, url: str) -> Optional[Recipe]:
         health_grade=health_grade
     )
 
-def import_recipe_from_url(url: str, status_bar, import_feedback_label, db_handler, refresh_recipe_list_func, populate_recipe_combo_func, url_entry_clear_func) -> None:
-    """Fetch a recipe from a supported URL, parse, and add to the database."""
-    import tkinter.messagebox as messagebox # Import here to avoid circular dependency if gui imports importers
-    
-    import_feedback_label.config(text="")
-    status_bar.set_status("Importing recipe...", show_progress=True)
-    try:
-        # Validate URL
-        if not url:
-            import_feedback_label.config(text="Please enter a recipe URL.")
-            status_bar.set_status("No URL entered")
-            return
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc.replace("www.", "")
-        if domain not in SUPPORTED_DOMAINS:
-            import_feedback_label.config(text=f"Unsupported domain: {domain}")
-            status_bar.set_status("Unsupported domain")
-            return
-
-        # Fetch HTML
-        response = requests.get(url, timeout=10)
-        if response.status_code != 200:
-            import_feedback_label.config(text=f"Failed to fetch page: {response.status_code}")
-            status_bar.set_status("Failed to fetch page")
-            return
-
-        # Parse recipe
-        parser_func_name = SUPPORTED_DOMAINS[domain]
-        parser_func = globals()[parser_func_name] # Get function by name
-        recipe = parser_func(response.text, url)
-        if not recipe:
-            import_feedback_label.config(text="Failed to parse recipe from page.")
-            status_bar.set_status("Parse error")
-            return
-
-        # Insert into database
-        with db_handler() as db:
-            db.insert_recipe(recipe)
-
-        import_feedback_label.config(text="Recipe imported successfully!")
-        status_bar.set_status("Recipe imported successfully!")
-        messagebox.showinfo("Success", "Recipe imported and added to database.")
-        refresh_recipe_list_func()
-        populate_recipe_combo_func()
-        url_entry_clear_func()
-    except Exception as e:
-        import_feedback_label.config(text=f"Error: {str(e)}")
-        status_bar.set_status(f"Error importing recipe: {str(e)}")
-    finally:
-        status_bar.set_status("Ready")
\ No newline at end of file
+class RecipeImportError(Exception):
+    """A recipe URL could not be fetched or parsed"""
+
+
+def fetch_recipe_from_url(url: str, timeout: float = 10) -> Recipe:
+    """Fetch and parse a recipe from a supported URL (blocking, run it off the Tk thread)."""
+    if not url:
+        raise RecipeImportError("Please enter a recipe URL.")
+    parsed_url = urlparse(url)
+    domain = parsed_url.netloc.replace("www.", "")
+    if domain not in SUPPORTED_DOMAINS:
+        raise RecipeImportError(f"Unsupported domain: {domain}")
+
+    # Fetch HTML
+    response = requests.get(url, timeout=timeout)
+    if response.status_code != 200:
+        raise RecipeImportError(f"Failed to fetch page: {response.status_code}")
+
+    # Parse recipe
+    parser_func_name = SUPPORTED_DOMAINS[domain]
+    parser_func = globals()[parser_func_name] # Get function by name
+    recipe = parser_func(response.text, url)
+    if not recipe:
+        raise RecipeImportError("Failed to parse recipe from page.")
+    return recipe
@@ -0,0 +1,106 @@
+"""
+CuisineCraft List Diff Module
+Minimal insert/delete/update operations between two keyed row lists.
+
+Widgets showing recipes are keyed by recipe ID. Instead of deleting every row
+and inserting the new model, the old and new key lists are compared: shared
+prefix and suffix are skipped, and of the keys present in both lists the
+longest run that kept its relative order (a longest increasing subsequence,
+found with bisect) stays in place. Every other key becomes a delete from the
+old list or an insert into the new one, so saving one recipe yields one op.
+"""
+
+from bisect import bisect_left, insort
+from typing import Callable, Hashable, Iterable, List, MutableSequence, Optional, Sequence, Tuple
+
+INSERT = "insert"
+DELETE = "delete"
+UPDATE = "update"
+
+# (kind, index, key). Deletes come first, highest index first, with indexes
+# into the old list; inserts and updates follow in ascending index order, with
+# indexes into the list as it is being rebuilt (which equal the new indexes).
+Op = Tuple[str, int, Hashable]
+
+
+def _stable_positions(old_positions: List[int]) -> List[bool]:
+    """Mark the longest increasing subsequence of old positions (in new order)"""
+    tails: List[int] = []  # smallest tail value of an increasing run per length
+    tail_index: List[int] = []
+    previous: List[int] = [-1] * len(old_positions)
+    for i, position in enumerate(old_positions):
+        length = bisect_left(tails, position)
+        if length == len(tails):
+            tails.append(position)
+            tail_index.append(i)
+        else:
+            tails[length] = position
+            tail_index[length] = i
+        previous[i] = tail_index[length - 1] if length else -1
+
+    stable = [False] * len(old_positions)
+    i = tail_index[-1] if tail_index else -1
+    while i != -1:
+        stable[i] = True
+        i = previous[i]
+    return stable
+
+
+def diff_keys(old: Sequence[Hashable], new: Sequence[Hashable],
+              changed: Iterable[Hashable] = ()) -> List[Op]:
+    """
+    Operations turning the old key list into the new one. Keys in changed that
+    stay in place get an update op (their row text changed).
+    """
+    changed = set(changed)
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end_old, end_new = len(old), len(new)
+    while end_old > start and end_new > start and old[end_old - 1] == new[end_new - 1]:
+        end_old -= 1
+        end_new -= 1
+
+    ops: List[Op] = []
+    old_index = {key: index for index, key in enumerate(old[start:end_old], start)}
+    common = [key for key in new[start:end_new] if key in old_index]
+    stable = _stable_positions([old_index[key] for key in common])
+    kept = {key for key, keep in zip(common, stable) if keep}
+
+    for index in range(end_old - 1, start - 1, -1):
+        if old[index] not in kept:
+            ops.append((DELETE, index, old[index]))
+    for index, key in enumerate(new):
+        if start <= index < end_new and key not in kept:
+            ops.append((INSERT, index, key))
+        elif key in changed:
+            ops.append((UPDATE, index, key))
+    return ops
+
+
+def apply_ops(rows: MutableSequence, ops: Iterable[Op],
+              render: Optional[Callable[[Hashable], object]] = None) -> MutableSequence:
+    """Apply diff ops to a list of rows (keys, or render(key) when given)"""
+    render = render or (lambda key: key)
+    for kind, index, key in ops:
+        if kind == DELETE:
+            del rows[index]
+        elif kind == INSERT:
+            rows.insert(index, render(key))
+        else:
+            rows[index] = render(key)
+    return rows
+
+
+def merge_keys(old: Sequence[Hashable], added: Iterable[Hashable] = (),
+               removed: Iterable[Hashable] = (), sort_key=None) -> List[Hashable]:
+    """Copy of a sorted key list with keys removed and added by bisect insertion"""
+    removed = set(removed)
+    keys = [key for key in old if key not in removed] if removed else list(old)
+    present = set(keys)
+    for key in added:
+        if key not in present:
+            insort(keys, key, key=sort_key)
+            present.add(key)
+    return keys
@@ -4,16 +4,43 @@ Run the application from here
 """
 
 import tkinter as tk
+from tkinter_gui.config import DEBUG
 from tkinter_gui.logger import logger
-from tkinter_gui.gui import CuisineCraftModernGUI
+from tkinter_gui.startup import ImportTimer, StartupTimer
 from tkinter import messagebox
 
+
+def report_startup(root, timer: StartupTimer, imports: ImportTimer):
+    """Log the startup timings once the main window has been drawn"""
+
+    def on_map(event):
+        if event.widget is not root:
+            return
+        root.unbind("<Map>", binding)
+        root.update_idletasks()
+        timer.mark("first paint")
+        imports.uninstall()
+        logger.info(timer.report(imports))
+
+    binding = root.bind("<Map>", on_map, add="+")
+
+
 def main():
+    timer = StartupTimer()
+    imports = ImportTimer.install() if DEBUG else None
     try:
+        # Imported here so DEBUG runs can time it
+        from tkinter_gui.gui import CuisineCraftModernGUI
+
+        timer.mark("import gui")
         root = tk.Tk()
+        timer.mark("create Tk root")
         # Instantiate the main GUI. The constructor sets up all widgets and event bindings.
         # We do not need to keep a reference to the object, as all logic is managed internally.
         CuisineCraftModernGUI(root)
+        timer.mark("build GUI")
+        if imports is not None:
+            report_startup(root, timer, imports)
         root.mainloop()
     except Exception as e:
         logger.exception("Failed to start CuisineCraft")
@@ -21,6 +48,10 @@ def main():
             "Startup Error",
             f"Failed to start CuisineCraft: {str(e)}"
         )
+    finally:
+        if imports is not None:
+            imports.uninstall()
+
 
 if __name__ == "__main__":
     main()
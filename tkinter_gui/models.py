@@ -3,7 +3,7 @@ CuisineCraft Models
 Data classes for Recipe and Ingredient objects
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import datetime
 
 @dataclass
@@ -38,9 +38,16 @@ class ReceiptItem:
     unit: str = ""
     receipt_image_path: str = ""
 
+def _current_week_start() -> str:
+    from tkinter_gui.planner import week_start
+
+    return week_start().isoformat()
+
 @dataclass
 class WeekMenuEntry:
     """Week Menu Entry data model"""
     day: str
     recipe_id: int
-    created_at: int = int(datetime.datetime.now().timestamp())
+    week_start: str = field(default_factory=_current_week_start)  # ISO date of the week's Monday
+    version: int = 0  # assigned when the menu is saved
+    created_at: int = field(default_factory=lambda: int(datetime.datetime.now().timestamp()))
@@ -0,0 +1,130 @@
+"""
+CuisineCraft Pantry Matching Module
+Inverted index from ingredient names to recipes for "what can I cook" queries.
+
+The index maps every normalized ingredient name to the set of recipe IDs using
+it, so a pantry query only touches the posting lists of the ingredients on hand
+instead of scanning the whole Ingredienten table. Recipes are ranked by coverage:
+the fraction of their distinct ingredients that the pantry provides.
+"""
+
+import heapq
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Set, Tuple
+
+from tkinter_gui.utils import normalize_key
+
+
+@dataclass
+class PantryMatch:
+    """A recipe ranked by how much of it the pantry covers"""
+    recipe_id: int
+    matched: int
+    total: int
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def coverage(self) -> float:
+        return self.matched / self.total if self.total else 0.0
+
+
+class PantryIndex:
+    """Inverted index from ingredient name to the recipes using it"""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._recipe_ingredients: Dict[int, Set[str]] = {}
+        # Word -> ingredient keys containing it, so "tomaten" also finds "verse tomaten"
+        self._tokens: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, str]]) -> "PantryIndex":
+        """Build the index from (ID_maaltijden, ingredient) rows"""
+        index = cls()
+        for recipe_id, name in rows:
+            if recipe_id is None or not name:
+                continue
+            index._add(int(recipe_id), normalize_key(name))
+        return index
+
+    def __len__(self) -> int:
+        return len(self._recipe_ingredients)
+
+    def _add(self, recipe_id: int, key: str) -> None:
+        if not key:
+            return
+        if key not in self._postings:
+            self._postings[key] = set()
+            for token in key.split():
+                self._tokens.setdefault(token, set()).add(key)
+        self._postings[key].add(recipe_id)
+        self._recipe_ingredients.setdefault(recipe_id, set()).add(key)
+
+    def add_ingredients(self, recipe_id: int, names: Iterable[str]) -> None:
+        """Incrementally index newly inserted ingredients of a recipe"""
+        for name in names:
+            if name:
+                self._add(int(recipe_id), normalize_key(name))
+
+    def remove_recipe(self, recipe_id: int) -> None:
+        """Drop a recipe and its postings from the index"""
+        for key in self._recipe_ingredients.pop(recipe_id, set()):
+            postings = self._postings.get(key)
+            if postings is None:
+                continue
+            postings.discard(recipe_id)
+            if not postings:
+                del self._postings[key]
+                for token in key.split():
+                    self._tokens[token].discard(key)
+                    if not self._tokens[token]:
+                        del self._tokens[token]
+
+    def resolve(self, pantry: Iterable[str]) -> Set[str]:
+        """
+        Map pantry entries to indexed ingredient keys.
+        An entry matches its exact key and every ingredient that contains all
+        of its words (e.g. "tomaten" matches "verse tomaten").
+        """
+        keys: Set[str] = set()
+        for item in pantry:
+            item_key = normalize_key(item)
+            if not item_key:
+                continue
+            if item_key in self._postings:
+                keys.add(item_key)
+            token_sets = [self._tokens.get(token, set()) for token in item_key.split()]
+            if token_sets:
+                keys.update(set.intersection(*token_sets))
+        return keys
+
+    def match(self, pantry: Iterable[str], top_k: int = 25,
+              min_coverage: float = 0.0) -> List[PantryMatch]:
+        """Rank recipes by the fraction of their ingredients available in the pantry"""
+        available = self.resolve(pantry)
+        if not available:
+            return []
+
+        # Count covered ingredients per recipe by walking only the relevant postings
+        hits: Counter = Counter()
+        for key in available:
+            hits.update(self._postings[key])
+
+        candidates = (
+            (matched / len(self._recipe_ingredients[recipe_id]), matched, recipe_id)
+            for recipe_id, matched in hits.items()
+        )
+        best = heapq.nlargest(
+            top_k,
+            (candidate for candidate in candidates if candidate[0] >= min_coverage),
+        )
+        return [
+            PantryMatch(
+                recipe_id=recipe_id,
+                matched=matched,
+                total=len(self._recipe_ingredients[recipe_id]),
+                missing=sorted(self._recipe_ingredients[recipe_id] - available),
+            )
+            for _, matched, recipe_id in best
+        ]
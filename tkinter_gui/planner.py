@@ -0,0 +1,248 @@
+"""
+CuisineCraft Menu Planner
+Constraint-based week menu planning with a time budget.
+
+Candidate pools are pulled from SQLite in random ID windows with the per-recipe
+constraints (weekday cooking time, known health grade, excluded recipes) pushed
+into the WHERE clause, so the library is never loaded as a whole. A randomized
+backtracking search then fills the most constrained day first; after every
+choice the other days' domains are pruned (same recipe, same cuisine) and the
+health average is bounded using the healthiest recipe left in each open day.
+If a pool turns out unsatisfiable, fresh pools are drawn until the budget ends.
+
+``plan_weeks`` generates many consecutive weeks in one pass from SQL-side
+samples, excluding recipes served within a sliding no-repeat window and
+capping how often one cuisine appears per week.
+"""
+
+import datetime
+import random
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Set
+
+from tkinter_gui.facets import _to_int
+from tkinter_gui.logger import logger
+from tkinter_gui.utils import normalize_key
+
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+WEEKDAYS = DAYS[:5]
+
+POOL_SIZE = 300
+POOL_WINDOWS = 4  # random ID windows per pool, so a pool is not one contiguous block
+
+
+class PlanningTimeout(Exception):
+    """Raised inside the search when the time budget is spent"""
+
+
+@dataclass
+class MenuConstraints:
+    """Constraints for a planned week menu"""
+    days: Sequence[str] = DAYS
+    weekday_max_time: Optional[int] = None  # minutes, applies Monday to Friday
+    max_avg_health_grade: Optional[float] = None  # 1 = healthiest, 3 = least healthy
+    unique_cuisines: bool = False
+    excluded_ids: Set[int] = field(default_factory=set)
+    time_budget: float = 0.5  # seconds
+
+
+@dataclass
+class Candidate:
+    """Planner view of a recipe"""
+    recipe_id: int
+    name: str
+    cooking_time: Optional[int]
+    health_grade: Optional[int]
+    cuisine_key: str
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "Candidate":
+        recipe_id, name, cooking_time, health_grade, cuisine_key = row
+        return cls(int(recipe_id), name, _to_int(cooking_time), _to_int(health_grade),
+                   normalize_key(cuisine_key))
+
+
+class MenuPlanner:
+    """Randomized constraint search over sampled candidate pools"""
+
+    def __init__(self, db, constraints: MenuConstraints, rng: Optional[random.Random] = None):
+        self.db = db
+        self.constraints = constraints
+        self.rng = rng or random.Random()
+        self._deadline = 0.0
+
+    def _fetch_pool(self, weekday: bool) -> List[Candidate]:
+        """Random sample of recipes satisfying the per-recipe constraints"""
+        c = self.constraints
+        max_time = c.weekday_max_time if weekday else None
+        require_health = c.max_avg_health_grade is not None
+        low, high = self.db.get_recipe_id_bounds()
+        if low is None:
+            return []
+
+        pool: Dict[int, Candidate] = {}
+        per_window = max(1, POOL_SIZE // POOL_WINDOWS)
+        for _ in range(POOL_WINDOWS):
+            start = self.rng.randint(low, high)
+            rows = self.db.get_planner_candidates(start, per_window, max_time, require_health,
+                                                  c.excluded_ids)
+            if len(rows) < per_window:  # wrap around past the highest ID
+                rows += self.db.get_planner_candidates(low, per_window - len(rows), max_time,
+                                                       require_health, c.excluded_ids)
+            for row in rows:
+                candidate = Candidate.from_row(row)
+                pool[candidate.recipe_id] = candidate
+        return list(pool.values())
+
+    def _conflicts(self, chosen: Candidate, other: Candidate) -> bool:
+        if chosen.recipe_id == other.recipe_id:
+            return True
+        return (self.constraints.unique_cuisines and bool(chosen.cuisine_key)
+                and chosen.cuisine_key == other.cuisine_key)
+
+    def _signature(self, candidate: Candidate, open_ids: Dict[str, Set[int]]) -> tuple:
+        """Candidates with equal signatures leave interchangeable domains for the open days"""
+        if self.constraints.unique_cuisines and candidate.cuisine_key:
+            # Removes its whole cuisine, itself included, from every open day
+            return candidate.cuisine_key, candidate.health_grade
+        # Removes only itself, so the open days it could still fill must match too
+        return candidate.health_grade, frozenset(
+            day for day, ids in open_ids.items() if candidate.recipe_id in ids
+        )
+
+    def _search(self, domains: Dict[str, List[Candidate]], assigned: Dict[str, Candidate],
+                health_sum: int) -> Optional[Dict[str, Candidate]]:
+        if time.perf_counter() > self._deadline:
+            raise PlanningTimeout()
+        open_days = [day for day in domains if day not in assigned]
+        if not open_days:
+            return dict(assigned)
+
+        bound = self.constraints.max_avg_health_grade
+        day = min(open_days, key=lambda d: len(domains[d]))  # most constrained first
+        others = [d for d in open_days if d != day]
+        values = list(domains[day])
+        self.rng.shuffle(values)
+        if bound is not None:
+            # Healthier first, randomized within a grade
+            values.sort(key=lambda candidate: candidate.health_grade)
+
+        # Once a candidate failed, one with the same signature would fail too
+        open_ids = {d: {o.recipe_id for o in domains[d]} for d in others}
+        tried = set()
+        for candidate in values:
+            signature = self._signature(candidate, open_ids)
+            if signature in tried:
+                continue
+            tried.add(signature)
+            if bound is not None:
+                optimistic = health_sum + candidate.health_grade + sum(
+                    min(other.health_grade for other in domains[d]) for d in others
+                )
+                if optimistic > bound * len(domains):
+                    break  # values are sorted, later ones are no better
+
+            pruned = {d: [o for o in domains[d] if not self._conflicts(candidate, o)]
+                      for d in others}
+            if any(not pruned[d] for d in others):
+                continue
+            assigned[day] = candidate
+            result = self._search({**domains, **pruned, day: [candidate]}, assigned,
+                                  health_sum + (candidate.health_grade or 0))
+            if result is not None:
+                return result
+            del assigned[day]
+        return None
+
+    def plan(self) -> Optional[Dict[str, Candidate]]:
+        """Find a menu satisfying the constraints, None if none is found in time"""
+        self._deadline = time.perf_counter() + self.constraints.time_budget
+        attempts = 0
+        try:
+            while True:
+                attempts += 1
+                weekday_pool = self._fetch_pool(weekday=True)
+                weekend_pool = (self._fetch_pool(weekday=False)
+                                if self.constraints.weekday_max_time is not None else weekday_pool)
+                domains = {
+                    day: list(weekday_pool if day in WEEKDAYS else weekend_pool)
+                    for day in self.constraints.days
+                }
+                if any(not values for values in domains.values()):
+                    return None  # nothing in the library satisfies the per-recipe constraints
+                result = self._search(domains, {}, 0)
+                if result is not None:
+                    logger.info(f"Planned week menu in {attempts} attempt(s).")
+                    return result
+        except PlanningTimeout:
+            logger.info(f"Menu planning ran out of time after {attempts} attempt(s).")
+            return None
+
+
+def week_start(day: Optional[datetime.date] = None) -> datetime.date:
+    """Monday of the week containing day (today by default)"""
+    day = day or datetime.date.today()
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def next_monday(today: Optional[datetime.date] = None) -> datetime.date:
+    """The coming Monday, or today if it is a Monday"""
+    today = today or datetime.date.today()
+    return today + datetime.timedelta(days=(7 - today.weekday()) % 7)
+
+
+def plan_weeks(db, weeks: int, no_repeat_weeks: int = 4, max_per_cuisine: int = 2,
+               served_ids: Iterable[int] = (),
+               rng: Optional[random.Random] = None,
+               progress: Optional[Callable[[int, int], None]] = None) -> List[List[Candidate]]:
+    """
+    Generate consecutive week menus. A recipe does not come back within
+    no_repeat_weeks weeks and no cuisine appears more than max_per_cuisine
+    times in a week; both targets are relaxed only when the library is too
+    small to meet them. served_ids (recently served recipes) count as the
+    week before the first one. progress(done, total) is called after each week.
+    """
+    rng = rng or random.Random()
+    window: Deque[List[int]] = deque(maxlen=max(no_repeat_weeks, 0) or None)
+    if no_repeat_weeks > 0 and served_ids:
+        window.append(list(served_ids))
+    menus: List[List[Candidate]] = []
+    days = len(DAYS)
+
+    for _ in range(weeks):
+        if no_repeat_weeks <= 0:
+            window.clear()
+        recent = [recipe_id for week in window for recipe_id in week]
+        menu: List[Candidate] = []
+        cuisine_counts: Counter = Counter()
+        cap = max_per_cuisine
+        while len(menu) < days:
+            taken = {candidate.recipe_id for candidate in menu}
+            sample = db.sample_recipe_ids((days - len(menu)) * 3, exclude_ids=set(recent) | taken,
+                                          rng=rng)
+            if not sample:
+                if recent:
+                    # Library smaller than the window: let the oldest week back in
+                    window.popleft()
+                    recent = [recipe_id for week in window for recipe_id in week]
+                    continue
+                if taken:
+                    raise ValueError(f"Only {len(taken)} recipes available for a week menu")
+                return menus
+            added = False
+            for row in db.get_recipe_summaries(sample):
+                candidate = Candidate.from_row(row)
+                if len(menu) < days and (not candidate.cuisine_key
+                                         or cuisine_counts[candidate.cuisine_key] < cap):
+                    menu.append(candidate)
+                    cuisine_counts[candidate.cuisine_key] += 1
+                    added = True
+            if not added:
+                cap += 1  # not enough distinct cuisines for the variety target
+        menus.append(menu)
+        window.append([candidate.recipe_id for candidate in menu])
+        if progress:
+            progress(len(menus), weeks)
+    return menus
@@ -0,0 +1,86 @@
+"""
+CuisineCraft Price Matching Module
+Aho-Corasick matching of ingredient names against receipt item names.
+
+One automaton is built over all ingredient names and every receipt item is
+streamed through it once. The database uses it at ingest time to persist
+receipt-to-ingredient links (see ``DatabaseHandler.insert_receipt_items``).
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+from tkinter_gui.utils import normalize_key
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher over normalized strings"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        # Trie of all patterns
+        terminal: Dict[int, List[int]] = {}
+        for pattern in dict.fromkeys(p for p in patterns if p):
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                node = next_node
+            terminal.setdefault(node, []).append(len(self.patterns))
+            self.patterns.append(pattern)
+
+        # Breadth-first failure links; outputs inherit along them
+        pending = deque()
+        for node in self._goto[0].values():
+            pending.append(node)
+            self._output[node] = tuple(terminal.get(node, ()))
+        while pending:
+            node = pending.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = tuple(terminal.get(child, ())) + self._output[self._fail[child]]
+                pending.append(child)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def find(self, text: str) -> Set[int]:
+        """Indexes of all patterns occurring in text"""
+        found: Set[int] = set()
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+
+def link_receipt_items(automaton: AhoCorasick,
+                       receipt_rows: Iterable[Tuple[int, str]]) -> List[Tuple[int, str]]:
+    """Match (receipt item id, item name) rows, returning (receipt item id, ingredient key) links"""
+    links: List[Tuple[int, str]] = []
+    memo: Dict[str, Set[int]] = {}
+    for item_id, item_name in receipt_rows:
+        if not item_name:
+            continue
+        item_key = normalize_key(item_name)
+        matched = memo.get(item_key)
+        if matched is None:
+            matched = memo[item_key] = automaton.find(item_key)
+        links.extend((item_id, automaton.patterns[index]) for index in matched)
+    return links
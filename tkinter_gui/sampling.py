@@ -0,0 +1,150 @@
+"""
+CuisineCraft Weighted Sampling Module
+Weighted random recipe draws with Walker alias tables.
+
+An alias table turns n weights into n (probability, alias) slots, after which a
+draw is one uniform slot pick plus one coin flip: O(1), no scan over weights.
+Rebuilding a single table is O(n), so weights are split into fixed-size buckets
+with an alias table each, plus a small table over the bucket totals. Changing
+one weight rebuilds only its bucket and the top-level table.
+"""
+
+import datetime
+import random
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+BUCKET_SIZE = 1024
+
+WEIGHT_UNIFORM = "Uniform"
+WEIGHT_RATING = "Favourites"
+WEIGHT_RECENCY = "Not eaten recently"
+WEIGHT_RATING_RECENCY = "Favourites, not eaten recently"
+WEIGHT_MODES = (WEIGHT_UNIFORM, WEIGHT_RATING, WEIGHT_RECENCY, WEIGHT_RATING_RECENCY)
+
+DEFAULT_RATING = 3  # unrated recipes count as average
+RECENCY_HORIZON_DAYS = 90  # served longer ago than this counts as "never"
+MIN_RECENCY_FACTOR = 0.05
+
+
+def recipe_weight(mode: str, rating: Optional[int], last_served: Optional[int],
+                  now: Optional[int] = None) -> float:
+    """Sampling weight of a recipe from its rating (1-5) and last served timestamp"""
+    weight = 1.0
+    if mode in (WEIGHT_RATING, WEIGHT_RATING_RECENCY):
+        weight *= float(rating or DEFAULT_RATING) ** 2
+    if mode in (WEIGHT_RECENCY, WEIGHT_RATING_RECENCY) and last_served is not None:
+        now = now if now is not None else int(datetime.datetime.now().timestamp())
+        days = max(now - last_served, 0) / 86400
+        weight *= max(min(days / RECENCY_HORIZON_DAYS, 1.0), MIN_RECENCY_FACTOR)
+    return weight
+
+
+class AliasTable:
+    """Walker alias table over a list of non-negative weights"""
+
+    def __init__(self, weights: Sequence[float]):
+        self.total = float(sum(weights))
+        n = len(weights)
+        self.probability = [1.0] * n
+        self.alias = list(range(n))
+        if n == 0 or self.total <= 0:
+            return
+        scaled = [weight * n / self.total for weight in weights]
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self.probability[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Leftovers are 1.0 up to rounding
+        for i in small + large:
+            self.probability[i] = 1.0
+
+    def sample(self, rng: random.Random) -> int:
+        slot = rng.randrange(len(self.alias))
+        return slot if rng.random() < self.probability[slot] else self.alias[slot]
+
+
+class WeightedSampler:
+    """Bucketed alias sampler over keyed weights, updatable in place"""
+
+    def __init__(self, items: Iterable[Tuple[Hashable, float]] = (),
+                 bucket_size: int = BUCKET_SIZE):
+        self.bucket_size = bucket_size
+        self._keys: List[Hashable] = []
+        self._weights: List[float] = []
+        self._positions: Dict[Hashable, int] = {}
+        for key, weight in items:
+            self._positions[key] = len(self._keys)
+            self._keys.append(key)
+            self._weights.append(max(float(weight), 0.0))
+        self._buckets = [self._build_bucket(b) for b in range(self._bucket_count())]
+        self._top = AliasTable([bucket.total for bucket in self._buckets])
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._positions
+
+    def _bucket_count(self) -> int:
+        return -(-len(self._keys) // self.bucket_size)
+
+    def _build_bucket(self, bucket: int) -> AliasTable:
+        start = bucket * self.bucket_size
+        return AliasTable(self._weights[start:start + self.bucket_size])
+
+    def _rebuild(self, buckets: Iterable[int]) -> None:
+        for bucket in set(buckets):
+            if bucket < len(self._buckets):
+                self._buckets[bucket] = self._build_bucket(bucket)
+            else:
+                self._buckets.append(self._build_bucket(bucket))
+        self._top = AliasTable([bucket.total for bucket in self._buckets])
+
+    def update(self, weights: Dict[Hashable, float]) -> None:
+        """Set (or add) the weights of some keys, rebuilding only their buckets"""
+        touched = []
+        for key, weight in weights.items():
+            position = self._positions.get(key)
+            if position is None:
+                position = self._positions[key] = len(self._keys)
+                self._keys.append(key)
+                self._weights.append(0.0)
+            self._weights[position] = max(float(weight), 0.0)
+            touched.append(position // self.bucket_size)
+        if touched:
+            self._rebuild(touched)
+
+    def remove(self, key: Hashable) -> None:
+        """Remove a key by giving it weight zero (its slot is kept)"""
+        if key in self._positions:
+            self.update({key: 0.0})
+
+    def sample_one(self, rng: random.Random) -> Optional[Hashable]:
+        if self._top.total <= 0:
+            return None
+        bucket = self._top.sample(rng)
+        return self._keys[bucket * self.bucket_size + self._buckets[bucket].sample(rng)]
+
+    def sample(self, n: int, rng: Optional[random.Random] = None,
+               exclude: Iterable[Hashable] = (), max_attempts: int = 50) -> List[Hashable]:
+        """
+        Draw up to n distinct keys proportionally to their weights (without
+        replacement, by rejecting repeats and excluded keys).
+        """
+        rng = rng or random.Random()
+        skip = set(exclude)
+        chosen: List[Hashable] = []
+        for _ in range(n * max_attempts):
+            if len(chosen) >= n:
+                break
+            key = self.sample_one(rng)
+            if key is None:
+                break
+            if key not in skip:
+                chosen.append(key)
+                skip.add(key)
+        return chosen
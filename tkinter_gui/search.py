@@ -0,0 +1,105 @@
+"""
+CuisineCraft Search Scheduler
+Debounced, cancellable background search for Tk entry fields.
+
+Every keystroke bumps a sequence number. A query only starts once the user
+pauses for the debounce delay, which adapts to the measured query latency:
+fast queries are run almost immediately, slow ones wait a little longer so
+fewer of them are wasted. A newer keystroke interrupts the in-flight SQLite
+query via ``Connection.interrupt`` and results carrying an old sequence number
+are dropped instead of repainting the list. Queries run as JobExecutor jobs, so
+results reach the Tk thread through the executor's polling bridge.
+"""
+
+import time
+from typing import Any, Callable, Optional
+
+from tkinter_gui.db import DatabaseHandler
+from tkinter_gui.logger import logger
+from tkinter_gui.workers import Job, JobContext, JobExecutor
+
+
+class SearchScheduler:
+    """Runs the latest search term as a background job and delivers only fresh results"""
+
+    def __init__(self, executor: JobExecutor, query: Callable[[DatabaseHandler, str], Any],
+                 on_result: Callable[[str, Any], None],
+                 on_error: Optional[Callable[[Exception], None]] = None,
+                 min_delay_ms: int = 50, max_delay_ms: int = 400,
+                 initial_delay_ms: int = 300):
+        self.executor = executor
+        self.root = executor.root
+        self.query = query
+        self.on_result = on_result
+        self.on_error = on_error
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.delay_ms = initial_delay_ms
+        self.latency_ms: Optional[float] = None  # exponential moving average
+
+        self._seq = 0
+        self._after_id = None
+        self._job: Optional[Job] = None
+
+    def submit(self, term: str, immediate: bool = False) -> int:
+        """Schedule a search for term, superseding any pending or running one"""
+        seq = self.cancel()
+        delay = 0 if immediate else self.delay_ms
+        self._after_id = self.root.after(delay, self._start, seq, term)
+        return seq
+
+    def cancel(self) -> int:
+        """Invalidate pending and running searches, returns the new sequence number"""
+        self._seq += 1
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._job is not None:
+            self._job.cancel()  # interrupts the running SQLite query
+            self._job = None
+        return self._seq
+
+    def _start(self, seq: int, term: str) -> None:
+        self._after_id = None
+        if seq != self._seq:
+            return
+        self._job = self.executor.submit(
+            self._run, term,
+            name=f"search #{seq}",
+            on_result=lambda outcome: self._deliver(seq, term, outcome),
+            on_error=lambda error: self._deliver_error(seq, term, error),
+        )
+
+    def _run(self, context: JobContext, term: str):
+        """Worker body: run the query on its own connection"""
+        started = time.perf_counter()
+        with DatabaseHandler() as db:
+            context.token.on_cancel(lambda: db.conn is not None and db.conn.interrupt())
+            context.check()
+            result = self.query(db, term)
+        return result, (time.perf_counter() - started) * 1000
+
+    def _deliver(self, seq: int, term: str, outcome) -> None:
+        if seq != self._seq:
+            logger.debug(f"Discarded stale search #{seq} for '{term}'")
+            return
+        self._job = None
+        result, elapsed_ms = outcome
+        self._record_latency(elapsed_ms)
+        self.on_result(term, result)
+
+    def _deliver_error(self, seq: int, term: str, error: Exception) -> None:
+        if seq != self._seq:
+            return
+        self._job = None
+        if self.on_error:
+            self.on_error(error)
+
+    def _record_latency(self, elapsed_ms: float) -> None:
+        """Update the latency estimate and derive the next debounce delay"""
+        if self.latency_ms is None:
+            self.latency_ms = elapsed_ms
+        else:
+            self.latency_ms = 0.7 * self.latency_ms + 0.3 * elapsed_ms
+        # Wait roughly twice as long as a query takes, within sane bounds
+        self.delay_ms = int(min(self.max_delay_ms, max(self.min_delay_ms, 2 * self.latency_ms)))
@@ -0,0 +1,100 @@
+"""
+CuisineCraft Shopping List Module
+Incrementally maintained shopping list aggregate for the manual week menu.
+
+Each recipe's ingredient vector ((ingredient, canonical unit) -> amount) is
+fetched once and cached. Assigning a recipe to a day adds its vector to the
+running totals and clearing a day subtracts it, returning only the lines that
+changed so the caller can patch those Treeview rows instead of rebuilding the
+whole list.
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# (ingredient, canonical unit)
+LineKey = Tuple[str, str]
+
+
+class ShoppingList:
+    """Running ingredient totals over the recipes assigned to days"""
+
+    def __init__(self):
+        self._vectors: Dict[int, List[Tuple[LineKey, str, float]]] = {}
+        self._days: Dict[str, int] = {}  # day -> recipe ID
+        self._totals: Dict[LineKey, float] = {}
+        self._contributions: Dict[LineKey, int] = {}  # drop lines at 0, not at ~0.0
+        self._ingredient_keys: Dict[LineKey, str] = {}
+        self._order: List[LineKey] = []  # sorted line keys, mirrors the Treeview order
+        self.prices: Dict[str, Tuple[Optional[float], Optional[str]]] = {}  # ingredient_key -> (price, shop)
+        self.prices_version: Optional[int] = None  # receipt version the prices were read at
+
+    def has_recipe(self, recipe_id: int) -> bool:
+        return recipe_id in self._vectors
+
+    def cache_recipe(self, recipe_id: int, rows: Iterable[tuple]) -> None:
+        """Cache a recipe vector from (ingredient, ingredient_key, unit, amount) rows"""
+        self._vectors[recipe_id] = [
+            ((ingredient, unit or ""), ingredient_key or "", amount or 0.0)
+            for ingredient, ingredient_key, unit, amount in rows
+        ]
+
+    def forget_recipe(self, recipe_id: int) -> bool:
+        """Drop a cached vector, returns True if the recipe is currently assigned"""
+        self._vectors.pop(recipe_id, None)
+        return recipe_id in self._days.values()
+
+    def _apply(self, recipe_id: int, sign: int, changed: Set[LineKey]) -> None:
+        for key, ingredient_key, amount in self._vectors.get(recipe_id, ()):
+            count = self._contributions.get(key, 0) + sign
+            if count:
+                self._contributions[key] = count
+                self._totals[key] = self._totals.get(key, 0.0) + sign * amount
+                if key not in self._ingredient_keys:
+                    self._ingredient_keys[key] = ingredient_key
+                    self._order.insert(bisect_left(self._order, key), key)
+            else:
+                del self._contributions[key]
+                del self._totals[key]
+                del self._ingredient_keys[key]
+                del self._order[bisect_left(self._order, key)]
+            changed.add(key)
+
+    def set_day(self, day: str, recipe_id: Optional[int]) -> Set[LineKey]:
+        """Assign (or with None clear) a day's recipe, returns the changed lines"""
+        changed: Set[LineKey] = set()
+        previous = self._days.pop(day, None)
+        if previous == recipe_id:
+            if recipe_id is not None:
+                self._days[day] = recipe_id
+            return changed
+        if previous is not None:
+            self._apply(previous, -1, changed)
+        if recipe_id is not None:
+            self._days[day] = recipe_id
+            self._apply(recipe_id, 1, changed)
+        return changed
+
+    def clear(self) -> Set[LineKey]:
+        """Clear every day, returns the removed lines"""
+        changed = set(self._order)
+        self._days.clear()
+        self._totals.clear()
+        self._contributions.clear()
+        self._ingredient_keys.clear()
+        self._order.clear()
+        return changed
+
+    def amount(self, key: LineKey) -> Optional[float]:
+        """Total amount of a line, None if it is not on the list"""
+        return self._totals.get(key)
+
+    def ingredient_key(self, key: LineKey) -> str:
+        return self._ingredient_keys[key]
+
+    def index(self, key: LineKey) -> int:
+        """Position of a line in the sorted list"""
+        return bisect_left(self._order, key)
+
+    def lines(self) -> List[LineKey]:
+        return list(self._order)
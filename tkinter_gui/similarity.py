@@ -0,0 +1,177 @@
+"""
+CuisineCraft Recipe Similarity Module
+Sparse TF-IDF vectors over ingredients and cuisine with cached cosine neighbours.
+
+Recipe vectors are binary term postings kept per column (the rows containing
+each term), updated in place when a recipe changes, so an edit only touches
+the columns of that recipe's old and new terms. IDF weights and row norms are
+derived from the postings with one vectorized pass on the next lookup. Scoring
+one recipe against the whole library is a single ``np.bincount`` over the
+postings of the recipe's terms, so no per-recipe Python loop or DB scan is
+needed. Top-k neighbour lists are cached per recipe; IDF depends on every
+document, so a change that alters it drops all cached lists.
+"""
+
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from tkinter_gui.utils import normalize_key
+
+CUISINE_PREFIX = "cuisine:"
+
+
+class SimilarityIndex:
+    """TF-IDF recipe vectors with cached top-k cosine neighbours"""
+
+    def __init__(self, top_k: int = 10):
+        self.top_k = top_k
+        self._recipe_terms: Dict[int, Set[str]] = {}
+        self._columns: Dict[str, int] = {}  # term -> column, append-only
+        self._recipe_columns: Dict[int, np.ndarray] = {}  # encoded term sets
+        # recipe ID -> (k the table was computed for, neighbour table)
+        self._neighbours: Dict[int, Tuple[int, List[Tuple[int, float]]]] = {}
+
+        # Binary postings, updated in place; rows are append-only and keep their
+        # number when a recipe is removed (its postings are simply emptied)
+        self._rows: Dict[int, int] = {}  # recipe ID -> row
+        self._row_ids: List[int] = []
+        self._postings: List[Set[int]] = []  # column -> rows containing the term
+        self._n_docs = 0
+
+        # IDF and row norms, recomputed from the postings when stale
+        self._idf = np.empty(0, dtype=np.float64)
+        self._norms = np.empty(0, dtype=np.float64)
+        self._weights_stale = True
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple], top_k: int = 10) -> "SimilarityIndex":
+        """Build the index from (recipe ID, keuken_origine, ingredient) rows"""
+        index = cls(top_k=top_k)
+        for recipe_id, cuisine, ingredient in rows:
+            terms = index._recipe_terms.setdefault(int(recipe_id), set())
+            if cuisine and cuisine == cuisine:
+                terms.add(CUISINE_PREFIX + normalize_key(cuisine))
+            if ingredient:
+                terms.add(normalize_key(ingredient))
+        for recipe_id in index._recipe_terms:
+            index._update(recipe_id)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._recipe_terms)
+
+    def _column(self, term: str) -> int:
+        column = self._columns.get(term)
+        if column is None:
+            column = self._columns[term] = len(self._columns)
+            self._postings.append(set())
+        return column
+
+    def _update(self, recipe_id: int) -> None:
+        """Move a recipe's postings to its current terms"""
+        old_columns = set(self._recipe_columns.pop(recipe_id, ()))
+        terms = self._recipe_terms.get(recipe_id)
+        new_columns = {self._column(term) for term in terms} if terms is not None else set()
+        if terms is not None:
+            self._recipe_columns[recipe_id] = np.fromiter(
+                sorted(new_columns), dtype=np.int64, count=len(new_columns)
+            )
+            if recipe_id not in self._rows:
+                self._rows[recipe_id] = len(self._row_ids)
+                self._row_ids.append(recipe_id)
+
+        row = self._rows.get(recipe_id)
+        for column in old_columns - new_columns:
+            self._postings[column].discard(row)
+        for column in new_columns - old_columns:
+            self._postings[column].add(row)
+        if old_columns != new_columns or len(self._recipe_terms) != self._n_docs:
+            self._n_docs = len(self._recipe_terms)
+            # Document frequencies or the document count moved, so every IDF
+            # weight, row norm and cached score changed with them
+            self._weights_stale = True
+            self._neighbours.clear()
+
+    def add_ingredients(self, recipe_id: int, names: Iterable[str]) -> None:
+        """Add ingredient terms to a recipe's vector"""
+        terms = self._recipe_terms.setdefault(int(recipe_id), set())
+        terms |= {normalize_key(name) for name in names if name}
+        self._update(int(recipe_id))
+
+    def set_cuisine(self, recipe_id: int, cuisine: str) -> None:
+        """Set or replace the cuisine term of a recipe"""
+        terms = self._recipe_terms.setdefault(int(recipe_id), set())
+        terms.difference_update({t for t in terms if t.startswith(CUISINE_PREFIX)})
+        if cuisine:
+            terms.add(CUISINE_PREFIX + normalize_key(cuisine))
+        self._update(int(recipe_id))
+
+    def remove_recipe(self, recipe_id: int) -> None:
+        """Remove a recipe from the index"""
+        if self._recipe_terms.pop(int(recipe_id), None) is not None:
+            self._update(int(recipe_id))
+
+    def _refresh_weights(self) -> None:
+        """Recompute smoothed IDF per column and the L2 norm of every row"""
+        n_docs = self._n_docs
+        doc_freq = np.fromiter((len(rows) for rows in self._postings), dtype=np.float64,
+                               count=len(self._postings))
+        self._idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1.0
+
+        # Binary term frequency, so a row's squared norm is the sum of its idf^2
+        encoded = list(self._recipe_columns.values())
+        rows = np.fromiter((self._rows[recipe_id] for recipe_id in self._recipe_columns),
+                           dtype=np.int64, count=len(encoded))
+        lengths = np.fromiter((len(cols) for cols in encoded), dtype=np.int64,
+                              count=len(encoded))
+        col_array = (np.concatenate(encoded) if encoded
+                     else np.empty(0, dtype=np.int64))
+        self._norms = np.sqrt(np.bincount(
+            np.repeat(rows, lengths), weights=self._idf[col_array] ** 2,
+            minlength=len(self._row_ids),
+        ))
+        self._weights_stale = False
+
+    def _scores(self, recipe_id: int) -> np.ndarray:
+        """Cosine similarity of one recipe against every row in the index"""
+        columns = self._recipe_columns[recipe_id]
+        if not len(columns):
+            return np.zeros(len(self._row_ids))
+
+        lengths = np.fromiter((len(self._postings[column]) for column in columns),
+                              dtype=np.int64, count=len(columns))
+        posting_rows = np.fromiter(
+            chain.from_iterable(self._postings[column] for column in columns),
+            dtype=np.int64, count=int(lengths.sum()),
+        )
+        # Shared terms contribute idf^2; dividing by both norms gives the cosine
+        dots = np.bincount(posting_rows, weights=np.repeat(self._idf[columns] ** 2, lengths),
+                           minlength=len(self._row_ids))
+        norms = np.where(self._norms > 0, self._norms, 1.0)
+        return dots / norms / norms[self._rows[recipe_id]]
+
+    def neighbours(self, recipe_id: int, top_k: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Get the most similar recipes as (recipe ID, cosine similarity) pairs"""
+        recipe_id = int(recipe_id)
+        top_k = top_k or self.top_k
+        cached = self._neighbours.get(recipe_id)
+        if cached is not None and cached[0] >= top_k:
+            return cached[1][:top_k]
+        if recipe_id not in self._recipe_terms:
+            return []
+        if self._weights_stale:
+            self._refresh_weights()
+
+        row = self._rows[recipe_id]
+        scores = self._scores(recipe_id)
+        scores[row] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        result = [(self._row_ids[r], float(scores[r])) for r in candidates]
+        self._neighbours[recipe_id] = (top_k, result)
+        return result
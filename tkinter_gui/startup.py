@@ -0,0 +1,119 @@
+"""
+CuisineCraft Startup Module
+Cold-start timing report for DEBUG runs.
+
+StartupTimer marks the phases of a launch (imports, Tk root, GUI construction,
+first paint). ImportTimer sits first on sys.meta_path and wraps the loader of
+every module imported on the main thread, recording self and cumulative import
+time the way ``python -X importtime`` does, without restarting the interpreter
+with that flag. Both only cost anything when main() installs them.
+"""
+
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+class _TimedLoader:
+    """Loader proxy timing exec_module, then handing the module its real loader"""
+
+    def __init__(self, loader, timer: "ImportTimer", name: str):
+        self._loader = loader
+        self._timer = timer
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._timer._run(self._name, self._loader.exec_module, module)
+
+
+class ImportTimer:
+    """Meta path finder recording per-module import times on the main thread"""
+
+    def __init__(self):
+        self.records: List[Tuple[str, float, float]] = []  # (module, self, cumulative) seconds
+        self._children: List[float] = []
+        self._thread = threading.get_ident()
+        self._finding = False
+
+    @classmethod
+    def install(cls) -> "ImportTimer":
+        timer = cls()
+        sys.meta_path.insert(0, timer)
+        return timer
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if self._finding or threading.get_ident() != self._thread:
+            return None
+        self._finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, self, fullname)
+                    return spec
+            return None
+        finally:
+            self._finding = False
+
+    def _run(self, name: str, exec_module, module) -> None:
+        started = time.perf_counter()
+        self._children.append(0.0)
+        try:
+            exec_module(module)
+        finally:
+            cumulative = time.perf_counter() - started
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += cumulative
+            self.records.append((name, cumulative - children, cumulative))
+
+    def slowest(self, limit: int = 15) -> List[Tuple[str, float, float]]:
+        return sorted(self.records, key=lambda record: record[2], reverse=True)[:limit]
+
+
+class StartupTimer:
+    """Phase timings of one application launch"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        """Close the current phase under the given name"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    @property
+    def elapsed(self) -> float:
+        return self._last - self.started
+
+    def report(self, imports: Optional[ImportTimer] = None, limit: int = 15) -> str:
+        """Phase timings plus, when recorded, the slowest imports in -X importtime layout"""
+        lines = [f"Startup took {self.elapsed * 1000:.0f} ms"]
+        lines += [f"  {phase:<24} {seconds * 1000:8.1f} ms" for phase, seconds in self.phases]
+        if imports is not None and imports.records:
+            lines.append("import time: self [us] | cumulative | imported package")
+            lines += [
+                f"import time: {own * 1e6:9.0f} | {cumulative * 1e6:10.0f} | {name}"
+                for name, own, cumulative in imports.slowest(limit)
+            ]
+        return "\n".join(lines)
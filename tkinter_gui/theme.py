@@ -66,6 +66,7 @@ class ModernTheme:
         'subheading': ('Segoe UI', 12, 'bold'),
         'body': ('Segoe UI', 10),
         'small': ('Segoe UI', 9),
+        'italic': ('Segoe UI', 10, 'italic'),
         'button': ('Segoe UI', 10, 'bold')
     }
     
@@ -189,8 +190,17 @@ class StatusBar(ttk.Frame):
     def set_status(self, message, show_progress=False):
         self.status_var.set(message)
         if show_progress:
+            self.progress.configure(mode='indeterminate')
             self.progress.pack(side='right', padx=8, pady=4)
             self.progress.start()
         else:
             self.progress.stop()
             self.progress.pack_forget()
+
+    def set_progress(self, done, total, message=None):
+        """Show determinate progress (done out of total)"""
+        if message:
+            self.status_var.set(message)
+        self.progress.stop()
+        self.progress.configure(mode='determinate', maximum=max(total, 1), value=min(done, total))
+        self.progress.pack(side='right', padx=8, pady=4)
@@ -0,0 +1,91 @@
+"""
+CuisineCraft Unit Normalization Module
+Conversion of ingredient amounts to canonical units for shopping list aggregation.
+
+Every known unit spelling (Dutch and English, abbreviated or not) maps to one
+canonical unit per dimension and a multiplication factor: grams for mass,
+millilitres for volume and "stuk" for counted items. Units outside the table
+(e.g. "teen", "snuifje") keep their own normalized spelling with factor 1, so
+they still aggregate with themselves. Canonical amounts are stored next to the
+raw values in Ingredienten, so aggregation can simply SUM them in SQL.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Tuple
+
+from tkinter_gui.utils import normalize_key
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+GRAM = "g"
+MILLILITER = "ml"
+PIECE = "stuk"
+
+# alias -> (canonical unit, factor to canonical)
+UNIT_CONVERSIONS: Dict[str, Tuple[str, float]] = {}
+
+
+def _register(canonical: str, factor: float, *aliases: str) -> None:
+    for alias in aliases:
+        UNIT_CONVERSIONS[alias] = (canonical, factor)
+
+
+# Mass
+_register(GRAM, 1.0, "g", "gr", "gram", "grammen", "grams", "gramme")
+_register(GRAM, 1000.0, "kg", "kilo", "kilogram", "kilograms", "kilogrammen")
+_register(GRAM, 0.001, "mg", "milligram", "milligrams")
+_register(GRAM, 100.0, "ons")
+_register(GRAM, 500.0, "pond")
+_register(GRAM, 453.592, "lb", "lbs", "pound", "pounds")
+_register(GRAM, 28.3495, "oz", "ounce", "ounces")
+
+# Volume
+_register(MILLILITER, 1.0, "ml", "milliliter", "milliliters", "millilitre", "millilitres")
+_register(MILLILITER, 10.0, "cl", "centiliter", "centiliters", "centilitre")
+_register(MILLILITER, 100.0, "dl", "deciliter", "deciliters", "decilitre")
+_register(MILLILITER, 1000.0, "l", "liter", "liters", "litre", "litres")
+_register(MILLILITER, 15.0, "el", "eetlepel", "eetlepels", "eetl", "tbsp", "tablespoon", "tablespoons")
+_register(MILLILITER, 5.0, "kl", "tl", "koffielepel", "koffielepels", "theelepel", "theelepels",
+          "tsp", "teaspoon", "teaspoons")
+_register(MILLILITER, 250.0, "kop", "kopje", "kopjes")
+_register(MILLILITER, 240.0, "cup", "cups")
+
+# Counted items
+_register(PIECE, 1.0, "stuk", "stuks", "st", "aantal", "x", "piece", "pieces", "pc", "pcs")
+
+# Plural spellings of other counted units, kept as their own unit
+_register("teen", 1.0, "teen", "tenen", "teentje", "teentjes", "clove", "cloves")
+_register("takje", 1.0, "takje", "takjes", "tak", "takken", "sprig", "sprigs")
+_register("plak", 1.0, "plak", "plakken", "plakje", "plakjes", "slice", "slices")
+_register("stengel", 1.0, "stengel", "stengels", "stalk", "stalks")
+_register("snuifje", 1.0, "snuifje", "snuifjes", "snufje", "pinch")
+_register("scheutje", 1.0, "scheut", "scheutje", "scheutjes", "dash")
+
+
+def canonical_unit(unit) -> Tuple[str, float]:
+    """Canonical unit and conversion factor of a unit spelling"""
+    key = normalize_key(unit).rstrip(".")
+    return UNIT_CONVERSIONS.get(key, (key, 1.0))
+
+
+def to_canonical(amount, unit) -> Tuple[float, str]:
+    """Convert one amount to its canonical unit"""
+    canonical, factor = canonical_unit(unit)
+    return float(amount or 0) * factor, canonical
+
+
+def to_canonical_frame(amounts: pd.Series, units: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Vectorized conversion of amount/unit columns.
+    Each distinct unit spelling is resolved once and mapped over the column.
+    """
+    import pandas as pd
+
+    keys = units.map(normalize_key).str.rstrip(".")
+    resolved = {key: UNIT_CONVERSIONS.get(key, (key, 1.0)) for key in keys.unique()}
+    factors = keys.map({key: factor for key, (_, factor) in resolved.items()})
+    canonical_units = keys.map({key: unit for key, (unit, _) in resolved.items()})
+    canonical_amounts = pd.to_numeric(amounts, errors="coerce").fillna(0.0) * factors
+    return canonical_amounts, canonical_units
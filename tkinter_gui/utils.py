@@ -7,11 +7,24 @@ import re
 import time
 import csv
 import logging
+import unicodedata
 from typing import List
 from tkinter_gui.config import CSV_DELIMITER
 
 logger = logging.getLogger('CuisineCraft')
 
+def normalize_key(text) -> str:
+    """Casefold, strip diacritics and collapse whitespace for search and lookup keys"""
+    if text is None or text != text:  # None or NaN
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text).casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.split())
+
+def search_tokens(text) -> List[str]:
+    """Words of the normalized key, as indexed and matched by recipe search"""
+    return re.findall(r"\w+", normalize_key(text))
+
 def parse_cooking_time(cooking_time_str: str) -> int:
     """Parse cooking time string and convert to integer minutes"""
     if not cooking_time_str:
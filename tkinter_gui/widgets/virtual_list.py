@@ -0,0 +1,278 @@
+"""
+Virtual List Widget
+Canvas-based listbox that only draws the visible rows
+
+The rows come from a backing sequence (anything with len() and indexing) and
+are only looked up when they scroll into view. A fixed pool of canvas items,
+one per visible row, is reused while scrolling, so filling, scrolling and
+redrawing cost the same for ten recipes as for a hundred thousand. The common
+tk.Listbox methods (insert, delete, get, size, curselection, see, yview,
+<<ListboxSelect>>) are supported so it can replace a single-select Listbox.
+"""
+
+import math
+import tkinter as tk
+import tkinter.font as tkfont
+from typing import Callable, Iterable, Optional, Sequence
+
+from tkinter_gui.listdiff import DELETE, INSERT, Op
+from tkinter_gui.theme import ModernTheme
+
+
+class LazyRows(Sequence):
+    """Read-only sequence rendering keys to row texts only when indexed"""
+
+    def __init__(self, keys: Sequence, render: Callable[[object], str]):
+        self.keys = keys
+        self.render = render
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.render(key) for key in self.keys[index]]
+        return self.render(self.keys[index])
+
+
+class VirtualListbox(tk.Canvas):
+    """Single-select listbox drawing only its visible rows"""
+
+    def __init__(self, parent, font=None, fg=None, selectbackground=None,
+                 selectforeground=None, activestyle=None, yscrollcommand=None,
+                 row_padding: int = 4, **kwargs):
+        kwargs.setdefault("bg", ModernTheme.COLORS["surface"])
+        kwargs.setdefault("takefocus", True)
+        super().__init__(parent, **kwargs)
+
+        self.font = tkfont.Font(font=font or ModernTheme.FONTS["body"])
+        self.row_height = self.font.metrics("linespace") + row_padding
+        self.fg = fg or ModernTheme.COLORS["text_primary"]
+        self.select_bg = selectbackground or ModernTheme.COLORS["primary_light"]
+        self.select_fg = selectforeground or ModernTheme.COLORS["surface"]
+        self.yscrollcommand = yscrollcommand
+
+        self._items: Sequence[str] = []
+        self._top = 0  # index of the first visible row
+        self._selected: Optional[int] = None
+        self._rows = []  # pool of (background, text) canvas items
+
+        self.bind("<Configure>", lambda event: self._redraw())
+        self.bind("<Button-1>", self._on_click)
+        self.bind("<MouseWheel>", self._on_mousewheel)
+        self.bind("<Button-4>", lambda event: self.yview_scroll(-3, "units"))
+        self.bind("<Button-5>", lambda event: self.yview_scroll(3, "units"))
+        self.bind("<Up>", lambda event: self._move_selection(-1))
+        self.bind("<Down>", lambda event: self._move_selection(1))
+        self.bind("<Prior>", lambda event: self._move_selection(-self._visible_rows()))
+        self.bind("<Next>", lambda event: self._move_selection(self._visible_rows()))
+        self.bind("<Home>", lambda event: self._move_selection(-len(self._items)))
+        self.bind("<End>", lambda event: self._move_selection(len(self._items)))
+
+    # Configuration -------------------------------------------------------
+
+    def configure(self, cnf=None, **kwargs):
+        if "yscrollcommand" in kwargs:
+            self.yscrollcommand = kwargs.pop("yscrollcommand")
+            self._notify_scroll()
+            if not cnf and not kwargs:
+                return None
+        return super().configure(cnf, **kwargs)
+
+    config = configure
+
+    # Data model ----------------------------------------------------------
+
+    def set_items(self, items: Sequence[str]) -> None:
+        """Show a backing sequence as is (no copy); rows are read when visible"""
+        self._items = items
+        self._top = 0
+        self._selected = None
+        self._redraw()
+
+    def patch(self, ops: Iterable[Op], render: Optional[Callable[[object], str]] = None) -> None:
+        """
+        Apply listdiff ops in place, keeping the scroll position and selection.
+        A LazyRows model gets the keys, a plain list model render(key).
+        """
+        lazy = isinstance(self._items, LazyRows)
+        rows = self._items.keys if lazy else self._mutable_items()
+        for kind, index, key in ops:
+            if kind == DELETE:
+                del rows[index]
+                shift = -1
+                if self._selected == index:
+                    self._selected = None
+            else:
+                row = key if lazy else render(key)
+                if kind == INSERT:
+                    rows.insert(index, row)
+                    shift = 1
+                else:
+                    rows[index] = row
+                    continue
+            if self._selected is not None and self._selected >= index:
+                self._selected += shift
+            if self._top > index:
+                self._top += shift
+        self._top = max(0, min(self._top, self._max_top()))
+        self._redraw()
+
+    def _index(self, index) -> int:
+        if index == tk.END or index == "end":
+            return len(self._items)
+        if index == tk.ACTIVE or index == "active":
+            return self._selected if self._selected is not None else 0
+        return int(index)
+
+    def _mutable_items(self) -> list:
+        if not isinstance(self._items, list):
+            self._items = list(self._items)
+        return self._items
+
+    def size(self) -> int:
+        return len(self._items)
+
+    def get(self, first, last=None):
+        first = self._index(first)
+        if last is None:
+            return self._items[first]
+        last = len(self._items) - 1 if last in (tk.END, "end") else self._index(last)
+        return tuple(self._items[first:last + 1])
+
+    def insert(self, index, *elements) -> None:
+        index = self._index(index)
+        items = self._mutable_items()
+        items[index:index] = [str(element) for element in elements]
+        if self._selected is not None and self._selected >= index:
+            self._selected += len(elements)
+        self._redraw()
+
+    def delete(self, first, last=None) -> None:
+        first = self._index(first)
+        if last is None:
+            last = first
+        last = len(self._items) - 1 if last in (tk.END, "end") else self._index(last)
+        if first == 0 and last >= len(self._items) - 1:
+            self._items = []  # dropping everything must not copy a lazy model
+        else:
+            del self._mutable_items()[first:last + 1]
+        if self._selected is not None and self._selected >= first:
+            self._selected = None if self._selected <= last else self._selected - (last - first + 1)
+        self._top = min(self._top, self._max_top())
+        self._redraw()
+
+    # Selection -----------------------------------------------------------
+
+    def curselection(self) -> tuple:
+        return (self._selected,) if self._selected is not None else ()
+
+    def selection_clear(self, first=0, last=None) -> None:
+        self._selected = None
+        self._redraw()
+
+    def selection_set(self, first, last=None) -> None:
+        index = self._index(first)
+        self._selected = index if 0 <= index < len(self._items) else None
+        self._redraw()
+
+    def selection_includes(self, index) -> bool:
+        return self._selected == self._index(index)
+
+    def nearest(self, y) -> int:
+        return min(self._top + int(y) // self.row_height, max(len(self._items) - 1, 0))
+
+    def see(self, index) -> None:
+        index = self._index(index)
+        visible = self._visible_rows()
+        if index < self._top:
+            self._scroll_to(index)
+        elif index >= self._top + visible:
+            self._scroll_to(index - visible + 1)
+
+    def _select(self, index: int) -> None:
+        if not self._items:
+            return
+        index = max(0, min(index, len(self._items) - 1))
+        if index != self._selected:
+            self._selected = index
+            self.see(index)
+            self._redraw()
+            self.event_generate("<<ListboxSelect>>")
+
+    def _on_click(self, event) -> None:
+        self.focus_set()
+        index = self._top + event.y // self.row_height
+        if index < len(self._items):
+            self._select(index)
+
+    def _move_selection(self, delta: int) -> str:
+        self._select((self._selected if self._selected is not None else -1) + delta)
+        return "break"
+
+    # Scrolling -----------------------------------------------------------
+
+    def _visible_rows(self) -> int:
+        return max(1, self.winfo_height() // self.row_height)
+
+    def _max_top(self) -> int:
+        return max(len(self._items) - self._visible_rows(), 0)
+
+    def _scroll_to(self, top: int) -> None:
+        top = max(0, min(int(top), self._max_top()))
+        if top != self._top:
+            self._top = top
+            self._redraw()
+
+    def yview(self, *args):
+        """Scrollbar protocol: fractions without arguments, moveto/scroll otherwise"""
+        if not args:
+            total = len(self._items)
+            if not total:
+                return 0.0, 1.0
+            return self._top / total, min((self._top + self._visible_rows()) / total, 1.0)
+        if args[0] == "moveto":
+            self.yview_moveto(args[1])
+        elif args[0] == "scroll":
+            self.yview_scroll(args[1], args[2])
+
+    def yview_moveto(self, fraction) -> None:
+        self._scroll_to(round(float(fraction) * len(self._items)))
+
+    def yview_scroll(self, number, what) -> None:
+        step = self._visible_rows() if what == "pages" else 1
+        self._scroll_to(self._top + int(number) * step)
+
+    def _on_mousewheel(self, event) -> None:
+        self.yview_scroll(-3 if event.delta > 0 else 3, "units")
+
+    def _notify_scroll(self) -> None:
+        if self.yscrollcommand:
+            self.yscrollcommand(*self.yview())
+
+    # Drawing -------------------------------------------------------------
+
+    def _redraw(self) -> None:
+        """Reuse the row pool for the visible slice of the backing sequence"""
+        width = self.winfo_width()
+        needed = math.ceil(self.winfo_height() / self.row_height) + 1
+        while len(self._rows) < needed:
+            background = self.create_rectangle(0, 0, 0, 0, width=0, state="hidden")
+            text = self.create_text(0, 0, anchor="w", font=self.font, state="hidden")
+            self._rows.append((background, text))
+
+        for slot, (background, text) in enumerate(self._rows):
+            index = self._top + slot
+            if slot >= needed or index >= len(self._items):
+                self.itemconfigure(background, state="hidden")
+                self.itemconfigure(text, state="hidden")
+                continue
+            y = slot * self.row_height
+            selected = index == self._selected
+            self.coords(background, 0, y, width, y + self.row_height)
+            self.itemconfigure(background, fill=self.select_bg,
+                               state="normal" if selected else "hidden")
+            self.coords(text, 4, y + self.row_height / 2)
+            self.itemconfigure(text, text=self._items[index], state="normal",
+                               fill=self.select_fg if selected else self.fg)
+        self._notify_scroll()
@@ -0,0 +1,255 @@
+"""
+CuisineCraft Background Jobs Module
+Worker pool for slow handlers with results marshalled back to the Tk thread.
+
+Tk widgets may only be touched from the thread running the main loop, so jobs
+never call back into the GUI themselves. Finished futures and progress reports
+are put on a queue that the Tk thread drains with ``root.after`` polling; only
+then are the result, error and progress callbacks run. Thread jobs receive a
+JobContext to report determinate progress and to check a cancellation token;
+process jobs (for CPU-bound, picklable work) run without one.
+"""
+
+import concurrent.futures
+import queue
+import threading
+from typing import Any, Callable, List, Optional
+
+from tkinter_gui.logger import logger
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when its cancellation token was triggered"""
+
+
+class CancellationToken:
+    """Thread-safe cancellation flag with callbacks (e.g. interrupting SQLite)"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.debug(f"Cancellation callback failed: {str(e)}")
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        """Run callback on cancellation (immediately if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise JobCancelled()
+
+
+class JobContext:
+    """Handed to thread jobs: progress reporting and cancellation"""
+
+    def __init__(self, job: "Job", executor: "JobExecutor"):
+        self.token = job.token
+        self._job = job
+        self._executor = executor
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def check(self) -> None:
+        """Stop the job here if it was cancelled"""
+        self.token.raise_if_cancelled()
+
+    def progress(self, done: float, total: float, message: str = "") -> None:
+        """Report determinate progress, delivered on the Tk thread"""
+        self._executor._events.put(("progress", self._job, (done, total, message)))
+
+
+class Job:
+    """Handle of a submitted job"""
+
+    def __init__(self, name: str, on_result=None, on_error=None, on_progress=None,
+                 on_cancelled=None):
+        self.name = name
+        self.token = CancellationToken()
+        self.future: Optional[concurrent.futures.Future] = None
+        self.on_result = on_result
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancelled = on_cancelled
+
+    def cancel(self) -> None:
+        self.token.cancel()
+        if self.future is not None:
+            self.future.cancel()  # only succeeds if the job has not started yet
+
+    @property
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+
+class JobExecutor:
+    """Thread (or process) pool whose callbacks run on the Tk thread"""
+
+    POLL_INTERVAL_MS = 30
+
+    def __init__(self, root, max_workers: int = 4, max_processes: Optional[int] = None):
+        self.root = root
+        self.max_workers = max_workers
+        self.max_processes = max_processes
+        self._threads = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="cuisinecraft-job"
+        )
+        self._processes: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._events: queue.Queue = queue.Queue()
+        self._jobs: List[Job] = []
+        self._poll_id = None
+
+    def submit(self, fn: Callable[..., Any], *args, name: str = "",
+               on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_progress: Optional[Callable[[float, float, str], None]] = None,
+               on_cancelled: Optional[Callable[[], None]] = None,
+               process: bool = False) -> Job:
+        """
+        Run fn in the background. Thread jobs are called as fn(context, *args);
+        with process=True fn(*args) runs in a process pool and must be picklable.
+        Callbacks run on the Tk thread; a job that completes despite a cancel
+        request still has its result delivered.
+        """
+        job = Job(name or getattr(fn, "__name__", "job"), on_result, on_error, on_progress,
+                  on_cancelled)
+        if process:
+            if self._processes is None:
+                self._processes = concurrent.futures.ProcessPoolExecutor(self.max_processes)
+            job.future = self._processes.submit(fn, *args)
+        else:
+            job.future = self._threads.submit(self._run, fn, JobContext(job, self), args)
+        job.future.add_done_callback(lambda future: self._events.put(("done", job, None)))
+        self._jobs.append(job)
+        self._schedule_poll()
+        return job
+
+    @staticmethod
+    def _run(fn, context: JobContext, args):
+        context.check()
+        try:
+            return fn(context, *args)
+        except JobCancelled:
+            raise
+        except Exception as e:
+            # e.g. the interrupted SQLite query of a cancelled job
+            if context.cancelled:
+                raise JobCancelled() from e
+            raise
+
+    def _schedule_poll(self) -> None:
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self) -> None:
+        """Deliver progress and completions on the Tk thread"""
+        self._poll_id = None
+        while True:
+            try:
+                kind, job, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if job.on_progress and not job.token.cancelled:
+                    job.on_progress(*payload)
+            else:
+                self._jobs.remove(job)
+                self._deliver(job)
+        if self._jobs:
+            self._schedule_poll()
+
+    @staticmethod
+    def _deliver(job: Job) -> None:
+        """
+        Report a finished job. Only jobs that never started or stopped with
+        JobCancelled count as cancelled: a job that ran to completion may have
+        committed its work, so its result is always delivered.
+        """
+        future = job.future
+        error = None if future.cancelled() else future.exception()
+        if future.cancelled() or isinstance(error, JobCancelled):
+            logger.debug(f"Job '{job.name}' was cancelled.")
+            if job.on_cancelled:
+                job.on_cancelled()
+        elif error is not None:
+            logger.error(f"Job '{job.name}' failed: {str(error)}")
+            if job.on_error:
+                job.on_error(error)
+        elif job.on_result:
+            job.on_result(future.result())
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._jobs)
+
+    def cancel_all(self) -> None:
+        for job in list(self._jobs):
+            job.cancel()
+
+    def shutdown(self) -> None:
+        """Cancel everything and stop the pools without waiting for running jobs"""
+        self.cancel_all()
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+
+class ChangeLog:
+    """
+    Generation counter of an index that jobs rebuild from a database snapshot.
+    Workers never see the live index; changes the Tk thread makes to it while
+    a rebuild runs are recorded and replayed onto the rebuilt copy.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self._snapshot: Optional[int] = None  # generation the pending rebuild started at
+        self._changes: List[Any] = []
+
+    def begin(self) -> int:
+        """Start a rebuild, superseding any pending one"""
+        self._snapshot = self.generation
+        self._changes = []
+        return self.generation
+
+    def record(self, change: Any) -> None:
+        """Note a change made to the live index"""
+        self.generation += 1
+        if self._snapshot is not None:
+            self._changes.append(change)
+
+    def finish(self, generation: int) -> Optional[List[Any]]:
+        """
+        Changes to replay onto the rebuild started at generation, or None when
+        a newer rebuild has started since and this result must be discarded.
+        """
+        if generation != self._snapshot:
+            return None
+        changes = self._changes
+        self._snapshot = None
+        self._changes = []
+        return changes